@@ -0,0 +1,388 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from bootstrap_ci import bootstrap_caap_change, build_caap_blocks
+from chunked_cube import aggregate_store, pb_summary
+from data_store import STORE_DIRNAME, write_store
+from figure_cache import render_png
+from ingest import STATION_MAPPING, build_dataset
+from pipeline import POLLUTANTS_CAAP, build_compute_graph, build_metrics, load_dataset, load_station_frame
+from plots import (
+    plot_pb1_combined_dynamic, plot_pb2, plot_pb3_boxplot, plot_pb3_correlation_trend,
+    plot_pb4_boxplot_stagnation, plot_windrose_single_condition,
+)
+from quantile_sketch import merge_sketches
+from query_backend import CubeBackend
+from shared_data import enable_copy_on_write
+from timing import MB, current_rss, rss_mb
+from windrose_hist import CARDINAL16, PM25_CONDITIONS, windrose_table
+
+# =========================================================
+#     BENCHMARK HEADLESS DENGAN DATA SINTETIS (1x/10x/100x)
+# =========================================================
+# Menjalankan tahap-tahap dashboard tanpa server Streamlit: ingest CSV,
+# tulis store, load_data, agregasi PB 1-4, dan plot (hingga PNG), pada data
+# sintetis ber-skema PRSA_Data_*.csv. Skala memperbesar jumlah stasiun dan
+# rentang tahun. Setiap tahap dicatat: wall time, peak RSS, dan alokasi
+# (tracemalloc), lalu disimpan sebagai JSON yang dapat dibandingkan dengan baseline.
+
+RAW_COLUMNS = [
+    'No', 'year', 'month', 'day', 'hour', 'PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3',
+    'TEMP', 'PRES', 'DEWP', 'RAIN', 'wd', 'WSPM', 'station',
+]
+BASE_STATIONS = sorted(STATION_MAPPING)
+BASE_YEARS = 4
+START = pd.Timestamp('2013-03-01 00:00:00')
+
+# Skala -> (faktor jumlah stasiun, faktor rentang tahun); total baris ~ skala x data asli
+SCALE_PRESETS = {
+    1: (1, 1),      # 12 stasiun x 4 tahun   (~420 ribu baris)
+    10: (2.5, 4),   # 30 stasiun x 16 tahun  (~4.2 juta baris)
+    100: (10, 10),  # 120 stasiun x 40 tahun (~42 juta baris, butuh RAM besar)
+}
+DEFAULT_SCALES = [1, 10]
+
+# Tahap dianggap regresi jika wall time > baseline x ambang ini
+REGRESSION_THRESHOLD = 1.25
+
+
+# ---------------------------------------------------------
+# Data sintetis
+# ---------------------------------------------------------
+
+def synthetic_stations(n_stations):
+    """Nama stasiun sintetis dan pemetaan Tipe Area (mengikuti stasiun asli secara bergiliran)."""
+    mapping = {}
+    for i in range(n_stations):
+        base = BASE_STATIONS[i % len(BASE_STATIONS)]
+        name = base if i < len(BASE_STATIONS) else f"{base}{i // len(BASE_STATIONS) + 1}"
+        mapping[name] = STATION_MAPPING[base]
+    return mapping
+
+
+def generate_station(station, n_years, seed=0, missing_rate=0.01):
+    """
+    Data per jam satu stasiun dengan skema PRSA_Data_*.csv (pola musiman & harian sederhana).
+    Sebagian kecil nilai dikosongkan agar interpolasi di ingest ikut teruji.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(START, START + pd.DateOffset(years=n_years) - pd.Timedelta(hours=1), freq='h')
+    n = len(index)
+
+    day = 2 * np.pi * index.dayofyear.to_numpy() / 365.25
+    hour = 2 * np.pi * index.hour.to_numpy() / 24
+    winter = np.cos(day - 0.2)  # > 0 di musim dingin
+    daytime = -np.cos(hour - 0.5)
+
+    wspm = np.round(rng.gamma(2.0, 0.9, n), 1)
+    pm25 = np.round(rng.lognormal(4.0 + 0.4 * winter - 0.15 * wspm, 0.8), 0)
+    no2 = np.round(np.clip(rng.normal(50 + 10 * winter - 8 * daytime, 20), 2, None), 0)
+    o3 = np.round(np.clip(rng.normal(55 - 30 * winter + 25 * daytime - 0.3 * no2, 25), 0.5, None), 0)
+    years_elapsed = (index.year.to_numpy() - START.year)
+    so2 = np.round(np.clip(rng.lognormal(2.5 + 0.6 * winter - 0.1 * years_elapsed, 0.7), 1, None), 0)
+
+    df = pd.DataFrame({
+        'No': np.arange(1, n + 1),
+        'year': index.year,
+        'month': index.month,
+        'day': index.day,
+        'hour': index.hour,
+        'PM2.5': pm25,
+        'PM10': np.round(pm25 * rng.uniform(1.1, 1.6, n), 0),
+        'SO2': so2,
+        'NO2': no2,
+        'CO': np.round(pm25 * 12 + rng.normal(300, 100, n).clip(100), -2),
+        'O3': o3,
+        'TEMP': np.round(12 - 15 * winter + 4 * daytime + rng.normal(0, 2, n), 1),
+        'PRES': np.round(1012 + 10 * winter + rng.normal(0, 3, n), 1),
+        'DEWP': np.round(2 - 15 * winter + rng.normal(0, 3, n), 1),
+        'RAIN': np.round(np.where(rng.random(n) < 0.04, rng.exponential(1.5, n), 0.0), 1),
+        'wd': np.asarray(CARDINAL16, dtype=object)[rng.integers(0, len(CARDINAL16), n)],
+        'WSPM': wspm,
+        'station': station,
+    })
+
+    for col in ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3', 'wd', 'WSPM']:
+        df.loc[rng.random(n) < missing_rate, col] = np.nan
+    return df[RAW_COLUMNS]
+
+
+def write_synthetic_csvs(data_dir, station_mapping, n_years, seed=0):
+    """Menulis satu PRSA_Data_<stasiun>_<awal>-<akhir>.csv per stasiun sintetis."""
+    os.makedirs(data_dir, exist_ok=True)
+    end = START + pd.DateOffset(years=n_years) - pd.Timedelta(days=1)
+    n_rows = 0
+    for i, station in enumerate(station_mapping):
+        df = generate_station(station, n_years, seed=seed + i)
+        file_name = f"PRSA_Data_{station}_{START:%Y%m%d}-{end:%Y%m%d}.csv"
+        df.to_csv(os.path.join(data_dir, file_name), index=False)
+        n_rows += len(df)
+    return n_rows
+
+
+# ---------------------------------------------------------
+# Pengukuran
+# ---------------------------------------------------------
+
+class RssSampler(threading.Thread):
+    """Mencatat RSS maksimum selama sebuah tahap berjalan (sampling di thread terpisah)."""
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss() or 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, current_rss() or 0)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, current_rss() or 0)
+        return self.peak
+
+
+def measure(func, repeat=1, trace_alloc=True):
+    """
+    Menjalankan func() `repeat` kali (wall time & RSS), lalu sekali lagi di bawah
+    tracemalloc untuk alokasi bila trace_alloc. Mengembalikan (hasil, record).
+    """
+    times = []
+    rss_before = current_rss()
+    sampler = RssSampler()
+    sampler.start()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+    finally:
+        peak_rss = sampler.stop()
+
+    record = {
+        'wall_s': statistics.median(times),
+        'wall_min_s': min(times),
+        'repeat': repeat,
+        'peak_rss_mb': peak_rss / MB if peak_rss else None,
+        'rss_delta_mb': rss_mb(rss_before) if rss_before is not None else None,
+    }
+
+    if trace_alloc:
+        tracemalloc.start()
+        try:
+            result = func()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        record['alloc_peak_mb'] = peak / MB
+        record['alloc_net_mb'] = current / MB
+
+    return result, record
+
+
+# ---------------------------------------------------------
+# Tahap benchmark
+# ---------------------------------------------------------
+
+def aggregation_stages(metrics):
+    """Tahap agregasi PB 1-4 (graf komputasi baru per panggilan agar tidak ada memo)."""
+    sketches = metrics['quantile_sketches']
+    hist = metrics['windrose_hist']
+    filters_pb4 = {'Area_Type': 'Overall', 'year': None, 'Season': 'Winter'}
+
+    def evaluate(nodes, **widgets):
+        graph = build_compute_graph()
+        sources = {'backend': CubeBackend(metrics['cube']), 'area': 'Overall', **widgets}
+        return {node: graph.evaluate(node, sources) for node in nodes}
+
+    return {
+        'pb1_aggregations': lambda: evaluate(['annual_means_pb1', 'means_pb1'], season_pb1='Winter'),
+        'pb2_aggregations': lambda: evaluate(['annual_change']),
+        'pb3_aggregations': lambda: (
+            evaluate(['o3_no2_corr_summer', 'o3_summer_means'], year_pb3_boxplot=None),
+            merge_sketches(sketches, 'O3', {'Season': 'Summer'}, by='Area_Type'),
+        ),
+        'pb4_aggregations': lambda: (
+            evaluate(['pb4_impact'], year_pb4=None, season_pb4='Winter'),
+            merge_sketches(sketches, 'PM2.5', filters_pb4, by='Is_Stagnant'),
+            [windrose_table(hist, filters_pb4, *PM25_CONDITIONS[c]) for c in PM25_CONDITIONS],
+        ),
+    }
+
+
+def plot_stages(metrics):
+    """Tahap plot PB 1-4, termasuk rasterisasi ke PNG (setara st.pyplot)."""
+    graph = build_compute_graph()
+    sources = {
+        'backend': CubeBackend(metrics['cube']), 'area': 'Overall', 'season_pb1': 'Overall',
+        'year_pb3_boxplot': None, 'year_pb4': None, 'season_pb4': 'Winter',
+    }
+    annual_means_pb1 = graph.evaluate('annual_means_pb1', sources)
+    annual_change = graph.evaluate('annual_change', sources)
+    corr = graph.evaluate('o3_no2_corr_summer', sources)
+    sketches = metrics['quantile_sketches']
+    hist = metrics['windrose_hist']
+    filters_pb4 = {'Area_Type': 'Overall', 'year': None, 'Season': 'Winter'}
+    filter_title = "Area: Overall | Tahun: Overall | Musim: Winter"
+
+    return {
+        'plot_pb1': lambda: render_png(plot_pb1_combined_dynamic(annual_means_pb1)),
+        'plot_pb2': lambda: render_png(plot_pb2(annual_change)[0]),
+        'plot_pb3_correlation': lambda: render_png(plot_pb3_correlation_trend(corr)),
+        'plot_pb3_boxplot': lambda: render_png(plot_pb3_boxplot(sketches)),
+        'plot_pb4_boxplot': lambda: render_png(plot_pb4_boxplot_stagnation(sketches, filters_pb4)[0]),
+        'plot_pb4_windrose': lambda: [
+            render_png(plot_windrose_single_condition(hist, filters_pb4, condition, filter_title)[0])
+            for condition in PM25_CONDITIONS
+        ],
+    }
+
+
+def run_scale(scale, workdir, repeat=3, trace_alloc=True, workers=None, seed=0):
+    """Menjalankan semua tahap untuk satu skala. Mengembalikan ringkasan + record per tahap."""
+    station_factor, year_factor = SCALE_PRESETS[scale]
+    station_mapping = synthetic_stations(int(round(len(BASE_STATIONS) * station_factor)))
+    n_years = int(round(BASE_YEARS * year_factor))
+
+    data_dir = os.path.join(workdir, f'data_{scale}x')
+    base_path = os.path.join(workdir, f'dashboard_{scale}x')
+    os.makedirs(base_path, exist_ok=True)
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+
+    stages = {}
+
+    def run(name, func, n=1):
+        print(f"  [{scale}x] {name} ...", flush=True)
+        result, stages[name] = measure(func, repeat=n, trace_alloc=trace_alloc)
+        return result
+
+    # Tahap pipeline (sekali per skala; alokasi diukur dengan menjalankannya ulang)
+    n_rows = run('generate_csv', lambda: write_synthetic_csvs(data_dir, station_mapping, n_years, seed))
+    df_ingested = run('ingest', lambda: build_dataset(data_dir, workers, station_mapping))
+    run('write_store', lambda: write_store(df_ingested, store_path))
+    df_ingested = None  # Melepas data hasil ingest sebelum tahap load
+    # Agregasi PB 1-4 streaming dari store (memori terbatas, tanpa memuat seluruh data)
+    run('aggregate_store', lambda: pb_summary(aggregate_store(store_path)))
+    df_full, data_version = run('load_dataset', lambda: load_dataset(base_path))
+    metrics = run('build_metrics', lambda: build_metrics(df_full, data_version))
+
+    for name, func in aggregation_stages(metrics).items():
+        run(name, func, n=repeat)
+    # Interval kepercayaan bootstrap blok PB 2 (blok per stasiun + N_RESAMPLES resample)
+    station_frame = load_station_frame(base_path)
+    run('bootstrap_ci', lambda: bootstrap_caap_change(
+        build_caap_blocks(station_frame, POLLUTANTS_CAAP), POLLUTANTS_CAAP
+    ), n=repeat)
+    for name, func in plot_stages(metrics).items():
+        run(name, func, n=repeat)
+
+    return {
+        'stations': len(station_mapping),
+        'years': n_years,
+        'rows': int(n_rows),
+        'stages': stages,
+    }
+
+
+# ---------------------------------------------------------
+# Laporan & perbandingan baseline
+# ---------------------------------------------------------
+
+def environment_info():
+    import matplotlib as mpl
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': mpl.__version__,
+    }
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Membandingkan wall time per tahap dengan baseline.
+    Mengembalikan DataFrame (scale, stage, wall_s, baseline_s, ratio, regression).
+    """
+    rows = []
+    for scale, scale_result in results['scales'].items():
+        base_stages = baseline.get('scales', {}).get(scale, {}).get('stages', {})
+        for stage, record in scale_result['stages'].items():
+            base_wall = base_stages.get(stage, {}).get('wall_s')
+            ratio = record['wall_s'] / base_wall if base_wall else np.nan
+            rows.append({
+                'scale': scale,
+                'stage': stage,
+                'wall_s': record['wall_s'],
+                'baseline_s': base_wall,
+                'ratio': ratio,
+                'regression': bool(ratio > threshold),
+            })
+    return pd.DataFrame(rows)
+
+
+def summary_table(results):
+    """Tabel ringkas semua tahap (satu baris per skala x tahap)."""
+    rows = [
+        {'scale': scale, 'stage': stage, **record}
+        for scale, scale_result in results['scales'].items()
+        for stage, record in scale_result['stages'].items()
+    ]
+    return pd.DataFrame(rows).drop(columns=['repeat'])
+
+
+if __name__ == '__main__':
+    enable_copy_on_write()  # Sama dengan dashboard.py saat aplikasi dimulai
+    parser = argparse.ArgumentParser(description="Benchmark headless dashboard dengan data PRSA sintetis.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, choices=sorted(SCALE_PRESETS))
+    parser.add_argument('--repeat', type=int, default=3, help="Pengulangan untuk tahap agregasi & plot.")
+    parser.add_argument('--no-alloc', action='store_true', help="Lewati pengukuran alokasi (tracemalloc).")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses ingest (default: semua core).")
+    parser.add_argument('--workdir', default=None, help="Folder data sintetis (default: folder sementara).")
+    parser.add_argument('--output', default='benchmark_results.json', help="File JSON hasil benchmark.")
+    parser.add_argument('--baseline', default=None, help="File JSON baseline untuk perbandingan.")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    results = {'environment': environment_info(), 'scales': {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        workdir = args.workdir or tmp_dir
+        for scale in args.scales:
+            results['scales'][f'{scale}x'] = run_scale(
+                scale, workdir, repeat=args.repeat, trace_alloc=not args.no_alloc, workers=args.workers
+            )
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    with pd.option_context('display.width', 160, 'display.max_rows', None, 'display.float_format', '{:.3f}'.format):
+        print(summary_table(results).to_string(index=False))
+        print(f"\nHasil benchmark disimpan di: {args.output}")
+
+        if args.baseline:
+            with open(args.baseline) as f:
+                comparison = compare(results, json.load(f), args.threshold)
+            print("\nPerbandingan dengan baseline:")
+            print(comparison.to_string(index=False))
+            if args.fail_on_regression and comparison['regression'].any():
+                raise SystemExit(1)
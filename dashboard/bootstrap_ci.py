@@ -0,0 +1,142 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ingest import CAAP_START
+
+# =========================================================
+#    INTERVAL KEPERCAYAAN BOOTSTRAP BLOK UNTUK PERUBAHAN CAAP
+# =========================================================
+# Persentase perubahan PB 2 (rata-rata tahunan Pasca-CAAP vs. baseline Pra-CAAP)
+# dilengkapi interval kepercayaan bootstrap blok. Data per jam berautokorelasi,
+# sehingga yang di-resample adalah blok BLOCK_DAYS hari berurutan di dalam setiap
+# stasiun dan periode (Pra-CAAP, lalu setiap tahun Pasca-CAAP): jumlah & cacah
+# per blok dihitung sekali, lalu setiap resample hanya berupa indeks blok acak.
+# Resample diproses per batch sebagai array (gather + np.add.reduceat per
+# periode), tanpa loop Python per resample; batch dibagi ke beberapa thread
+# (kernel NumPy melepas GIL) dengan seed per batch sehingga hasil tidak
+# bergantung pada jumlah thread.
+
+BLOCK_DAYS = 7
+N_RESAMPLES = 2000
+CONFIDENCE = 0.95
+# Resample per batch (memori kerja ~ BATCH_RESAMPLES x jumlah blok x 8 byte per kolom)
+BATCH_RESAMPLES = 250
+SEED = 2013
+
+# Kode periode untuk blok Pra-CAAP (periode lain = tahun Pasca-CAAP)
+PRE_CAAP_PERIOD = 0
+
+
+def build_caap_blocks(station_frame, cols, block_days=BLOCK_DAYS):
+    """
+    Jumlah & cacah (format nama kolom cube: 'sum:<col>', 'n:<col>') per blok `block_days` hari
+    berurutan untuk setiap stasiun dan periode (PRE_CAAP_PERIOD atau tahun Pasca-CAAP).
+    station_frame: data per jam dengan index datetime serta kolom station & Area_Type.
+    Diurutkan per periode lalu stasiun (urutan yang dipakai bootstrap_caap_change).
+    """
+    index = station_frame.index
+    days = (index.normalize() - index.min().normalize()).days.to_numpy()
+    keys = pd.DataFrame({
+        'period': np.where(index < CAAP_START, PRE_CAAP_PERIOD, index.year),
+        'station': station_frame['station'].to_numpy(),
+        'block': days // block_days,
+    })
+    values = pd.DataFrame(station_frame[cols].to_numpy('float64'), columns=cols)
+
+    grouped = values.groupby([keys['period'], keys['station'], keys['block']], observed=True, sort=True)
+    stats = pd.concat([grouped.sum().add_prefix('sum:'), grouped.count().add_prefix('n:')], axis=1)
+    stats = stats.reset_index()
+
+    area = station_frame.groupby('station', observed=True)['Area_Type'].first()
+    stats.insert(2, 'Area_Type', stats['station'].map(area).astype(str))
+    return stats.drop(columns='block')
+
+
+def _resample_batch(values, start, size, boundaries, n_resamples, seed):
+    """Jumlah per periode untuk `n_resamples` resample: array (n_resamples, periode, kolom)."""
+    rng = np.random.default_rng(seed)
+    # Indeks blok acak di dalam strata (stasiun, periode) setiap slot blok
+    idx = start + (rng.random((n_resamples, len(start))) * size).astype(np.intp)
+    totals = np.empty((n_resamples, len(boundaries), values.shape[1]))
+    for k in range(values.shape[1]):
+        totals[:, :, k] = np.add.reduceat(values[idx, k], boundaries, axis=1)
+    return totals
+
+
+def bootstrap_caap_change(blocks, cols, area=None, n_resamples=N_RESAMPLES, confidence=CONFIDENCE,
+                          seed=SEED, workers=None):
+    """
+    Interval kepercayaan bootstrap (persentil) persentase perubahan rata-rata tahunan Pasca-CAAP
+    terhadap baseline Pra-CAAP untuk blok hasil build_caap_blocks (difilter Area_Type `area`).
+    Mengembalikan DataFrame index tahun, kolom MultiIndex ('lower'/'upper', polutan);
+    None jika baseline atau tahun Pasca-CAAP tidak tersedia.
+    """
+    if area is not None and area != 'Overall':
+        blocks = blocks[blocks['Area_Type'] == area]
+    periods = blocks['period'].to_numpy()
+    if len(blocks) == 0 or periods[0] != PRE_CAAP_PERIOD or periods[-1] == PRE_CAAP_PERIOD:
+        return None
+
+    values = blocks[[f'sum:{col}' for col in cols] + [f'n:{col}' for col in cols]].to_numpy('float64')
+
+    # Strata (periode, stasiun) berurutan: awal & ukuran strata untuk setiap slot blok
+    stations = blocks['station'].to_numpy()
+    new_stratum = np.r_[True, (periods[1:] != periods[:-1]) | (stations[1:] != stations[:-1])]
+    strata = np.cumsum(new_stratum) - 1
+    strata_start = np.flatnonzero(new_stratum)
+    strata_size = np.diff(np.r_[strata_start, len(strata)])
+    start = strata_start[strata]
+    size = strata_size[strata]
+    boundaries = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+    batches = [min(BATCH_RESAMPLES, n_resamples - i) for i in range(0, n_resamples, BATCH_RESAMPLES)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        totals = np.concatenate(list(executor.map(
+            lambda job: _resample_batch(values, start, size, boundaries, *job), zip(batches, seeds)
+        )))
+
+    n_cols = len(cols)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resampled_means = totals[:, :, :n_cols] / totals[:, :, n_cols:]
+        baseline = resampled_means[:, :1, :]
+        change = (resampled_means[:, 1:, :] - baseline) / baseline * 100
+
+    alpha = (1 - confidence) / 2 * 100
+    lower, upper = np.nanpercentile(change, [alpha, 100 - alpha], axis=0)
+    years = pd.Index(periods[boundaries[1:]], name='year')
+    return pd.concat({
+        'lower': pd.DataFrame(lower, index=years, columns=cols),
+        'upper': pd.DataFrame(upper, index=years, columns=cols),
+    }, axis=1)
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Interval kepercayaan bootstrap blok perubahan CAAP (PB 2).")
+    parser.add_argument('--area', default='Overall')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    from pipeline import POLLUTANTS_CAAP, load_station_frame
+
+    station_frame = load_station_frame(base_path)
+    if station_frame is None:
+        raise SystemExit("Bootstrap per stasiun membutuhkan store Parquet (main_data_store/).")
+
+    started = time.perf_counter()
+    blocks = build_caap_blocks(station_frame, POLLUTANTS_CAAP)
+    built = time.perf_counter()
+    ci = bootstrap_caap_change(blocks, POLLUTANTS_CAAP, args.area, args.resamples, workers=args.workers)
+    print(
+        f"{len(blocks):,} blok ({BLOCK_DAYS} hari) dalam {built - started:.2f} detik | "
+        f"{args.resamples:,} resample dalam {time.perf_counter() - built:.2f} detik"
+    )
+    print(ci.round(2).to_string())
@@ -0,0 +1,155 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from data_store import STORE_DIRNAME, normalize_frame
+from stats_cube import (
+    CUBE_COLS, CUBE_KEYS, annual_means, build_cube, caap_evaluation, correlation_by,
+    merge_cubes, select_cube, stagnation_means,
+)
+from timing import MB, rss_mb
+
+# =========================================================
+#      MESIN AGREGASI BERTAHAP (OUT-OF-CORE) UNTUK CUBE
+# =========================================================
+# Cube statistik (stats_cube.py) bersifat aditif, sehingga dapat dibangun per
+# potongan data: setiap potongan menghasilkan cube parsial yang langsung
+# digabung (merge_cubes) ke cube berjalan, lalu potongan dibuang. Ukuran potongan
+# diturunkan dari batas memori, sehingga puncak memori tidak bergantung pada
+# jumlah baris -- data jaringan stasiun nasional bertahun-tahun tidak perlu
+# muat di RAM. Sumbernya dapat berupa store Parquet (dibaca streaming per
+# batch) atau DataFrame yang sudah ada (diiris per baris).
+
+# Batas memori default untuk satu potongan (MB)
+DEFAULT_MEMORY_MB = 256
+# Perkiraan memori kerja build_cube per baris (byte; diukur dengan tracemalloc ~2,2 KB)
+CUBE_BYTES_PER_ROW = 2300
+MIN_CHUNK_ROWS = 10_000
+
+# Kolom store yang dibutuhkan cube (month diturunkan dari index datetime)
+CHUNK_COLUMNS = [key for key in CUBE_KEYS if key != 'month'] + CUBE_COLS
+
+
+def chunk_rows_for(memory_mb=DEFAULT_MEMORY_MB):
+    """Jumlah baris per potongan agar memori kerja build_cube tetap di bawah `memory_mb`."""
+    return max(int(memory_mb * MB // CUBE_BYTES_PER_ROW), MIN_CHUNK_ROWS)
+
+
+def iter_frame_chunks(df, chunk_rows):
+    """Potongan baris DataFrame (irisan, tanpa salinan data) berukuran paling banyak `chunk_rows`."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def iter_store_chunks(store_path, chunk_rows, columns=CHUNK_COLUMNS):
+    """
+    Membaca store Parquet secara streaming sebagai potongan DataFrame (dtype skema, index datetime)
+    berukuran kurang lebih `chunk_rows` baris. Hanya satu potongan yang berada di memori pada satu waktu.
+    """
+    if not os.path.isdir(store_path):
+        raise FileNotFoundError(f"Store Parquet tidak ditemukan: {store_path}")
+
+    dataset = ds.dataset(store_path, partitioning='hive')
+    read_columns = ['datetime'] + [col for col in columns if col in dataset.schema.names]
+
+    batches, n_rows = [], 0
+    for batch in dataset.to_batches(columns=read_columns, batch_size=chunk_rows):
+        batches.append(batch)
+        n_rows += batch.num_rows
+        if n_rows >= chunk_rows:
+            yield normalize_frame(pa.Table.from_batches(batches).to_pandas())
+            batches, n_rows = [], 0
+    if batches:
+        yield normalize_frame(pa.Table.from_batches(batches).to_pandas())
+
+
+def build_cube_chunked(chunks):
+    """
+    Membangun cube dari iterable potongan DataFrame: cube parsial setiap potongan
+    langsung digabung ke cube berjalan. Hasilnya sama dengan build_cube pada seluruh data.
+    """
+    cube = None
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        cube = merge_cubes([cube, build_cube(chunk)])
+    return cube
+
+
+def aggregate_store(store_path, memory_mb=DEFAULT_MEMORY_MB):
+    """Cube statistik dari store Parquet tanpa memuat seluruh data (puncak memori ~`memory_mb`)."""
+    return build_cube_chunked(iter_store_chunks(store_path, chunk_rows_for(memory_mb)))
+
+
+def pb_summary(cube, pollutants=('PM2.5', 'NO2', 'SO2'), filters=None):
+    """
+    Metrik utama PB 1-4 dari cube: rata-rata tahunan, baseline Pra-CAAP & perubahan persentase,
+    korelasi O3 vs NO2 musim panas per tahun, serta rata-rata & rasio PM2.5 saat stagnasi.
+    """
+    cube = select_cube(cube, filters)
+    pollutants = list(pollutants)
+    _, baseline, annual_change = caap_evaluation(cube, pollutants)
+    stagnation = stagnation_means(cube)
+    if True in stagnation.index and False in stagnation.index and stagnation.loc[False, 'PM2.5'] != 0:
+        ratio = stagnation.loc[True, 'PM2.5'] / stagnation.loc[False, 'PM2.5']
+    else:
+        ratio = np.nan
+
+    return {
+        'annual_means': annual_means(cube, pollutants),
+        'pre_caap_baseline': baseline,
+        'annual_change': annual_change,
+        'o3_no2_corr_summer': correlation_by(cube, 'O3', 'NO2', by=['year'], filters={'Season': 'Summer'}),
+        'stagnation_means': stagnation,
+        'stagnation_ratio': ratio,
+    }
+
+
+def max_abs_difference(summary, reference):
+    """Selisih absolut maksimum per metrik antara dua hasil pb_summary."""
+    diffs = {}
+    for name, value in summary.items():
+        diff = np.abs(np.asarray(value, dtype='float64') - np.asarray(reference[name], dtype='float64'))
+        diffs[name] = float(np.nanmax(diff)) if np.size(diff) else 0.0
+    return diffs
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Agregasi PB 1-4 bertahap (out-of-core) dari store Parquet.")
+    parser.add_argument('--store', default=os.path.join(base_path, STORE_DIRNAME))
+    parser.add_argument('--memory-mb', type=float, default=DEFAULT_MEMORY_MB,
+                        help="Batas memori kerja per potongan (MB).")
+    parser.add_argument('--verify', action='store_true',
+                        help="Bandingkan dengan cube in-memory (membutuhkan seluruh data muat di RAM).")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cube = aggregate_store(args.store, args.memory_mb)
+    summary = pb_summary(cube)
+    rss = rss_mb()
+    memory = '' if rss is None else f" | RSS {rss:.0f} MB"
+    try:
+        import resource  # Hanya POSIX: RSS puncak proses
+
+        memory += f" (puncak {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB)"
+    except ImportError:
+        pass
+    print(
+        f"Cube: {len(cube):,} sel | potongan {chunk_rows_for(args.memory_mb):,} baris | "
+        f"{time.perf_counter() - started:.2f} detik{memory}"
+    )
+    print(f"Rasio PM2.5 Stagnan/Normal: {summary['stagnation_ratio']:.3f}")
+    print(summary['annual_change'].round(2).to_string())
+
+    if args.verify:
+        from data_store import read_store
+
+        reference = pb_summary(build_cube(read_store(args.store, columns=CHUNK_COLUMNS)))
+        for name, diff in max_abs_difference(summary, reference).items():
+            print(f"{name:>20}: selisih maks {diff:.3e}")
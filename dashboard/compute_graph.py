@@ -0,0 +1,128 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from single_flight import SingleFlight
+from timing import row_count, span
+
+# =========================================================
+#       GRAF KOMPUTASI LAZY (PER HALAMAN) DENGAN MEMOISASI
+# =========================================================
+# Setiap tabel turunan adalah node bernama dengan input yang dideklarasikan
+# (node lain atau "source" seperti cube dan nilai widget). Node hanya dihitung
+# saat diminta halaman, dan hasilnya dimemo berdasarkan fingerprint input:
+# mengubah satu widget hanya menghitung ulang node di hilir widget tersebut.
+# Node yang sedang dihitung sesi lain tidak dihitung ulang: pemanggil serentak
+# dengan fingerprint yang sama menunggu satu komputasi (single_flight.py).
+# Hasil memo dibagi antar sesi, sehingga setiap pemanggil (termasuk node hilir)
+# menerima tampilan copy-on-write (shared_view), bukan objek memo itu sendiri:
+# perubahan in-place di satu sesi tidak merusak hasil yang dilihat sesi lain.
+
+
+def shared_view(value):
+    """
+    Tampilan aman untuk hasil memo bersama: DataFrame/Series sebagai salinan dangkal (lazy copy jika
+    pandas Copy-on-Write aktif, salinan penuh jika tidak), array NumPy sebagai view read-only,
+    tuple/list/dict diproses per elemen. Objek lain (skalar, backend query) dikembalikan apa adanya.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=not pd.get_option('mode.copy_on_write'))
+    if isinstance(value, np.ndarray):
+        view = value.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(value, (tuple, list)):
+        return type(value)(shared_view(item) for item in value)
+    if isinstance(value, dict):
+        return {key: shared_view(item) for key, item in value.items()}
+    return value
+
+
+class ComputeGraph:
+    """Graf dependensi node turunan dengan memo LRU thread-safe (dibagi antar sesi)."""
+
+    def __init__(self, max_entries=512):
+        self._nodes = {}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.flight = SingleFlight('compute_graph')
+        self.computed = 0
+        self.hits = 0
+
+    def add(self, name, func, inputs=()):
+        """Mendaftarkan node `name` = func(*inputs)."""
+        self._nodes[name] = (func, tuple(inputs))
+
+    def _fingerprint(self, name, sources, fingerprints, cache):
+        if name in cache:
+            return cache[name]
+
+        if name not in self._nodes:
+            if name not in sources:
+                raise KeyError(f"Input '{name}' tidak terdaftar sebagai node maupun source.")
+            # Source besar (mis. cube) memakai fingerprint eksplisit (versi data)
+            fingerprint = repr(fingerprints.get(name, sources[name]))
+        else:
+            _, inputs = self._nodes[name]
+            parts = [self._fingerprint(i, sources, fingerprints, cache) for i in inputs]
+            fingerprint = hashlib.sha1(repr((name, parts)).encode('utf-8')).hexdigest()
+
+        cache[name] = fingerprint
+        return fingerprint
+
+    def _value(self, name, sources, fingerprints, fp_cache):
+        if name not in self._nodes:
+            return sources[name]
+
+        fingerprint = self._fingerprint(name, sources, fingerprints, fp_cache)
+        found, value = self._memo_get(fingerprint)
+        if found:
+            return shared_view(value)
+
+        # Input dievaluasi lebih dulu (masing-masing lewat memo & single-flight sendiri)
+        func, inputs = self._nodes[name]
+        args = [self._value(i, sources, fingerprints, fp_cache) for i in inputs]
+        return shared_view(self.flight.do(fingerprint, lambda: self._compute(name, fingerprint, func, args)))
+
+    def _memo_get(self, fingerprint):
+        with self._lock:
+            if fingerprint in self._memo:
+                self._memo.move_to_end(fingerprint)
+                self.hits += 1
+                return True, self._memo[fingerprint]
+        return False, None
+
+    def _compute(self, name, fingerprint, func, args):
+        # Pemimpin single-flight: sesi lain mungkin baru saja selesai menghitung node ini
+        found, value = self._memo_get(fingerprint)
+        if found:
+            return value
+
+        with span('compute', node=name) as s:
+            value = func(*args)
+            s.set(rows=row_count(value))
+
+        with self._lock:
+            self.computed += 1
+            self._memo[fingerprint] = value
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return value
+
+    def evaluate(self, name, sources, fingerprints=None):
+        """
+        Menghitung (atau mengambil dari memo) node `name`. Hasil berupa shared_view: aman diubah pemanggil
+        tanpa memengaruhi memo bersama.
+        sources: {nama_source: nilai} untuk rerun ini (cube, nilai widget, dll.).
+        fingerprints: {nama_source: fingerprint} untuk source yang mahal di-repr.
+        """
+        return self._value(name, sources, fingerprints or {}, {})
+
+    def stats(self):
+        with self._lock:
+            stats = {'nodes': len(self._nodes), 'memo': len(self._memo), 'computed': self.computed, 'hits': self.hits}
+        return {**stats, **self.flight.stats()}
@@ -1,382 +1,144 @@
+import time
+script_started = time.perf_counter()  # Awal rerun, untuk time-to-first-paint
+
 import os
 import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import matplotlib.cm as cm
 import streamlit as st
-from windrose import WindroseAxes
-
-# =========================================================
-#                   HELPER FUNCTIONS (PB 4)
-# =========================================================
-
-def convert_cardinal_to_degree(wd_series):
-    """
-    PB 4 Helper: Mengkonversi arah angin (kardinal/string) menjadi derajat numerik (0-360).
-    Digunakan di plot_pb4_windrose.
-    """
-    
-    # 16 arah kardinal
-    cardinal16 = ['N','NNE','NE','ENE','E','ESE','SE','SSE','S','SSW','SW','WSW','W','WNW','NW','NNW']
-    # Mapping string kardinal ke nilai derajat tengah sektor
-    cardinal_to_deg = {d: i*(360/16) for i,d in enumerate(cardinal16)}
-
-    # map string kardinal
-    wd_deg = wd_series.map(cardinal_to_deg)
-    
-    # Mengisi nilai yang tersisa dengan mencoba konversi numerik langsung
-    wd_numeric = pd.to_numeric(wd_series, errors='coerce')
-    wd_deg = wd_deg.fillna(wd_numeric)
-    
-    # Menghapus NaN dan normalisasi range 0-360
-    wd_deg = wd_deg.dropna()
-    if not wd_deg.empty:
-        wd_deg = wd_deg.astype(float) % 360
-        
-    return wd_deg
 
+from episodes import (
+    EPISODE_HOURS_OPTIONS, EPISODE_MIN_HOURS, EPISODE_THRESHOLD, EPISODE_THRESHOLD_OPTIONS,
+    EpisodeIndex, summarize_episodes,
+)
+from figure_cache import PRERENDERED_DIRNAME, FigureCache, load_prerendered
+from filter_index import index_values
+from ingest import STAGNANT_WSPM
+from pipeline import (
+    MetricsHolder, build_compute_graph, load_backend, load_metrics, load_station_frame, metrics_frame,
+    refresh_metrics,
+)
+from render_executor import RenderExecutor, SharedArg
+from rolling_corr import ROLLING_COLS, ROLLING_WINDOWS
+from shared_data import copy_on_write_enabled, enable_copy_on_write
+from spatial_idw import GRID_OPTIONS, GRID_SHAPE, MAX_FRAMES, SpatialFields
+from stagnation_sweep import THRESHOLD_MAX, THRESHOLD_MIN, THRESHOLD_STEP
+from timing import TRACE_FILE, begin_rerun, end_rerun, span
+from ts_pyramid import MAX_POINTS, build_pyramid, query_pyramid
+from warm_start import first_paint_info, lazy_import, mark_first_paint
+
+# Copy-on-Write pandas (opsi global proses) diaktifkan sekali saat aplikasi dimulai: dataset & hasil
+# memo yang dibagi antar sesi diberikan sebagai lazy copy (lihat shared_data.py & compute_graph.py)
+if not copy_on_write_enabled():
+    enable_copy_on_write()
+
+# Modul plot (matplotlib, seaborn) baru diimpor saat grafik pertama dirender
+plots = lazy_import('plots')
 
 # =========================================================
-#                   VISUALIZATION FUNCTIONS
+#           MEMBACA DATA DAN AGREGASI STATIS
 # =========================================================
+# Fungsi visualisasi ada di plots.py, pipeline data & graf komputasi di pipeline.py.
 
-# --- PB 1: Line Plot Gabungan ---
-def plot_pb1_combined_dynamic(df_filtered):
-    """PB 1: Membuat Line Plot tren polutan tahunan (PM2.5, NO2, SO2)."""
-    df_plot = df_filtered.groupby('year')[['PM2.5', 'NO2', 'SO2']].mean()
-
-    fig, ax = plt.subplots(figsize=(10, 5))
-    df_plot.plot(
-        kind='line',
-        marker='o',
-        linewidth=2,
-        ax=ax,
-        color={'PM2.5': 'tab:red', 'NO2': 'darkorange', 'SO2': 'tab:blue'},
-    )
+# Resource per versi data yang disimpan: versi lama dibuang setelah data baru ditambahkan (incremental.py)
+VERSIONED_RESOURCES = 2
 
-    ax.set_title('Tren Konsentrasi Polutan Utama Tahunan', fontsize=14, fontweight='bold')
-    ax.set_ylabel('Konsentrasi Polutan (µg/m³)')
-    ax.set_xlabel('Tahun')
-    ax.set_xticks(df_plot.index.astype(int))
-    ax.legend(title='Polutan', frameon=False, loc='upper right')
-    ax.grid(axis='y', linestyle=':', alpha=0.7)
-
-    max_val = df_plot.max().max()
-    # Anotasi Tahun 2017
-    ax.axvline(x=2017, color='gray', linestyle='--', alpha=0.5)
-    ax.text(2017, max_val * 1.05, 'Bias Data 2017', color='gray', fontsize=9, ha='center')
-
-    plt.tight_layout()
-    return fig
-
-# --- PB 2: Bar Chart Persentase Perubahan ---
-def plot_pb2(df_change_filtered):
-    """PB 2: Membuat Bar Chart persentase perubahan polutan vs. Baseline Pra-CAAP."""
-    # Mengubah dari wide ke long format untuk plotting Seaborn
-    df_viz = df_change_filtered.reset_index().melt(
-        id_vars='year', var_name='Pollutant', value_name='Percentage_Change'
-    )
-    
-    df_viz = df_viz[df_viz['year'] >= 2014].copy()
-    df_viz['year'] = df_viz['year'].astype(str)
-    
-    n_pollutants = len(df_viz['Pollutant'].unique())
-    if n_pollutants == 0: return None, "Pilih minimal satu polutan untuk divisualisasikan."
 
-    fig, axes = plt.subplots(nrows=1, ncols=n_pollutants, figsize=(5 * n_pollutants, 5), sharey=False)
-    
-    if n_pollutants == 1: axes = [axes]
-    
-    plt.suptitle('Evaluasi Dampak CAAP: Persentase Perubahan Tahunan (vs. Baseline Pra-CAAP)', 
-                 fontsize=14, fontweight='bold')
-    
-    for i, pol in enumerate(df_viz['Pollutant'].unique()):
-        ax = axes[i]
-        df_pol = df_viz[df_viz['Pollutant'] == pol]
-        
-        # Penentuan warna: Hijau (perbaikan/penurunan), Merah (memburuk/kenaikan)
-        colors = ['green' if p < 0 else 'red' for p in df_pol['Percentage_Change']]
-
-        sns.barplot(ax=ax, data=df_pol, x='year', y='Percentage_Change', palette=colors, legend=False)
-        
-        ax.set_title(f'{pol} Change', fontsize=12)
-        ax.set_xlabel('Tahun')
-        ax.set_ylabel('Perubahan (%) vs. Pra-CAAP Baseline')
-        ax.axhline(0, color='black', linestyle='--', linewidth=1.5)
-        ax.grid(axis='y', linestyle=':', alpha=0.6)
-        
-        # Tambahkan data label
-        for container in ax.containers:
-            for bar in container:
-                yval = bar.get_height()
-                padding = 1.5 
-                y_text_pos = yval + padding if yval >= 0 else yval - padding 
-                va_align = 'bottom' if yval >= 0 else 'top'
-
-                ax.text(
-                    bar.get_x() + bar.get_width() / 2, 
-                    y_text_pos,
-                    f'{yval:+.1f}%', 
-                    ha='center', va=va_align, 
-                    fontsize=9, fontweight='bold', color='black'
-                )
-                
-    plt.tight_layout(rect=[0, 0, 1, 0.9])
-    return fig, None
-
-# --- PB 3: Line Plot Korelasi ---
-def plot_pb3_correlation_trend(corr_series):
-    """PB 3: Membuat Line Plot tren koefisien korelasi tahunan O3 vs NO2 Musim Panas."""
-    fig, ax = plt.subplots(figsize=(8, 4))
-    
-    corr_series.plot(kind='line', marker='o', ax=ax, linewidth=2, color='darkorange', markersize=8)
-
-    ax.set_title('Tren Koefisien Korelasi O₃ vs. NO₂ Musim Panas (2013–2017)', fontsize=14, fontweight='bold')
-    ax.set_xlabel('Tahun')
-    ax.set_ylabel('Koefisien Korelasi Pearson (r)')
-    ax.set_xticks(corr_series.index.astype(int))
-    ax.axhline(0, color='gray', linestyle='--', alpha=0.7)
-    ax.grid(axis='both', linestyle=':', alpha=0.6)
-    
-    # Anotasi hasil Korelasi
-    for year, r_val in corr_series.items():
-        ax.annotate(
-            f'r={r_val:.3f}', 
-            (year, r_val), 
-            textcoords="offset points", 
-            xytext=(0, 10 if r_val < 0 else -15), 
-            ha='center', 
-            fontsize=10, 
-            fontweight='bold', 
-            color='darkorange'
-        )
-
-    plt.tight_layout()
-    return fig
-
-# --- PB 3: Box Plot Ozon per Area Type ---
-def plot_pb3_boxplot(df_full):
-    """PB 3: Membuat Box Plot distribusi Ozon Musim Panas berdasarkan Tipe Area."""
-    # Note: df_full di sini sudah difilter berdasarkan tahun, tetapi tidak berdasarkan Area Global
-    df_viz = df_full[df_full['Season'] == 'Summer'].copy()
-    
-    fig, ax = plt.subplots(figsize=(8, 4))
-    sns.boxplot(
-        data=df_viz,
-        x='Area_Type',
-        y='O3',
-        order=['Urban', 'Suburban', 'Rural'],
-        palette='pastel',
-        ax=ax
-    )
-    # Tambahkan informasi tahun ke judul
-    years = df_viz['year'].unique()
-    year_title = f"Tahun: {', '.join(map(str, sorted(years))) if len(years) < 5 else 'Overall'}"
-    
-    ax.set_title(f'Distribusi Ozon Musim Panas Berdasarkan Tipe Area\n({year_title})', fontsize=14, fontweight='bold')
-    ax.set_xlabel('Tipe Area')
-    ax.set_ylabel(r'O₃ Konsentrasi ($\mu g/m^3$)')
-    ax.grid(axis='y', linestyle='--', alpha=0.6)
-    plt.tight_layout()
-    return fig
-
-# --- PB 4: Box Plot Stagnasi PM2.5 ---
-def plot_pb4_boxplot_stagnation(df_filtered):
-    """PB 4: Membuat Box Plot perbandingan PM2.5 saat Stagnan vs. Normal."""
-
-    if df_filtered.empty:
-        return None, "Data tidak cukup untuk Box Plot."
-
-    df_plot = df_filtered.copy()
-    df_plot['Is_Stagnant_label'] = df_plot['Is_Stagnant'].apply(
-        lambda x: 'Stagnant' if x is True else 'Normal' if x is False else str(x)
-    )
-
-    unique_labels = df_plot['Is_Stagnant_label'].unique().tolist()
-    if not any(l in ('Stagnant', 'Normal') for l in unique_labels):
-        return None, "Kolom 'Is_Stagnant' tidak berisi nilai yang dikenali (Stagnant/Normal)."
-
-    order = ['Normal', 'Stagnant']
-    palette = {'Stagnant': '#B71C1C', 'Normal': '#1565C0'}
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-    sns.boxplot(
-        data=df_plot,
-        x='Is_Stagnant_label',
-        y='PM2.5',
-        order=order,
-        palette=palette,
-        ax=ax
-    )
-
-    ax.set_title(
-        r'Distribusi $\text{PM2.5}$ Saat Stagnasi Udara (WSPM < 3.2 m/s)',
-        fontsize=14, fontweight='bold'
-    )
-    ax.set_xlabel('Kondisi Udara', fontsize=12)
-    ax.set_xticklabels(['Angin Normal', 'Stagnan (WSPM < 3.2 m/s)'])
-    ax.set_ylabel(r'$\text{PM2.5}$ Konsentrasi ($\mu g/m^3$)')
-    ax.grid(axis='y', linestyle='--', alpha=0.6)
-    plt.tight_layout()
+@st.cache_resource
+def load_data():
+    """
+    Memuat data, melakukan Feature Engineering, dan menghitung metrik statis (atau langsung dari
+    snapshot hangat jika versinya cocok, lihat warm_start.py). Di-cache sebagai resource: satu dataset read-only per proses yang dibagi ke semua sesi.
+    Mengembalikan MetricsHolder: metrik versi terbaru ditukar utuh saat data bertambah (lihat pipeline.refresh_metrics).
+    """
+    try:
+        return MetricsHolder(load_metrics(os.path.dirname(__file__)))
 
-    return fig, None
+    except FileNotFoundError:
+        st.error("Error: Pastikan file data (main_data.csv atau main_data_store/) ada di folder yang benar.")
+        st.stop()
+    except Exception as e:
+        st.error(f"Terjadi kesalahan fatal saat memuat data: {e}")
+        st.stop()
 
 
-# --- PB 4: Wind Rose Plot ---
-def plot_windrose_single_condition(df_filtered_raw, pm25_condition, filter_title):
+@st.cache_resource(max_entries=VERSIONED_RESOURCES)
+def get_figure_cache(data_version):
     """
-    PB 4: Membuat plot windrose untuk satu kondisi PM2.5 tertentu.
-    pm25_condition: 'Normal' (PM2.5 < 75) atau 'Extreme' (PM2.5 > 200).
+    Cache PNG hasil render (satu per proses & versi data, lihat figure_cache.py).
+    Jika folder prerendered/ (render_batch.py) dibuat dari versi data yang sama, asetnya disajikan langsung.
     """
+    prerendered_dir = os.path.join(os.path.dirname(__file__), PRERENDERED_DIRNAME)
+    return FigureCache(prerendered=load_prerendered(prerendered_dir, data_version))
 
-    # Menerapkan Filter Kondisi PM2.5
-    if pm25_condition == 'Normal':
-        df_filtered = df_filtered_raw[df_filtered_raw['PM2.5'] < 75].copy()
-        plot_title = f"Wind Rose: Kondisi Normal (< 75) | {filter_title}"
-    elif pm25_condition == 'Extreme':
-        df_filtered = df_filtered_raw[df_filtered_raw['PM2.5'] > 200].copy()
-        plot_title = f"Wind Rose: Kondisi Ekstrem (> 200) | {filter_title}"
-    else:
-        return None, "Kondisi PM2.5 tidak valid."
 
-    # Menghapus NA pada kolom krusial
-    df_plot = df_filtered[['WSPM', 'wd']].dropna().copy()
-    
-    if df_plot.empty:
-        return None, f"Data {pm25_condition} tidak cukup setelah pemfilteran."
+@st.cache_resource(max_entries=VERSIONED_RESOURCES)
+def get_station_frame(data_version):
+    """Data per jam per stasiun untuk korelasi bergulir PB 3 & eksplorasi deret waktu (sekali per versi data, hanya dari store)."""
+    return load_station_frame(os.path.dirname(__file__))
 
-    if df_plot.index.has_duplicates:
-          df_plot = df_plot[~df_plot.index.duplicated(keep='first')]
 
-    wd_deg = convert_cardinal_to_degree(df_plot['wd'])
-    
-    if wd_deg.index.has_duplicates:
-          wd_deg = wd_deg[~wd_deg.index.duplicated(keep='first')]
+@st.cache_resource(max_entries=VERSIONED_RESOURCES)
+def get_ts_pyramid(data_version):
+    """Piramida multi-resolusi per stasiun & variabel untuk eksplorasi deret waktu (lihat ts_pyramid.py)."""
+    station_frame = get_station_frame(data_version)
+    if station_frame is None:
+        return None
+    with span('build_pyramid', rows=len(station_frame)):
+        return build_pyramid(station_frame, ROLLING_COLS)
 
-    # Sinkronisasi data WSPM dan wd_deg menggunakan concat
-    df_plot = pd.concat([df_plot[['WSPM']], wd_deg.rename('wd_deg')], axis=1, join='inner')
-    df_plot = df_plot.dropna(subset=['WSPM', 'wd_deg']).copy()
-    
-    if df_plot.empty:
-        return None, f"Data angin untuk kondisi {pm25_condition} tidak valid ({len(df_filtered)} baris)."
-    
-    # PLOTTING
-    speed_bins = np.arange(0, 10, 1)
-
-    fig = plt.figure(figsize=(6, 6))
-    ax = WindroseAxes.from_ax(fig=fig)
-    cmap_object = cm.get_cmap('viridis') 
-
-    ax.bar(
-        df_plot['wd_deg'], 
-        df_plot['WSPM'], 
-        normed=True,
-        opening=0.8,
-        edgecolor='white',
-        bins=speed_bins,
-        cmap=cmap_object
-    )
 
-    ax.set_title(plot_title, fontsize=10, fontweight='bold')
-    ax.set_legend(title='WSPM (m/s)', loc='lower left', bbox_to_anchor=(-0.1, -0.1))
+@st.cache_resource(max_entries=VERSIONED_RESOURCES * len(EPISODE_THRESHOLD_OPTIONS))
+def get_episode_index(data_version, threshold, min_hours):
+    """Indeks interval episode PM2.5 berkelanjutan untuk semua stasiun & tahun (lihat episodes.py)."""
+    station_frame = get_station_frame(data_version)
+    if station_frame is None:
+        return None
+    with span('detect_episodes', threshold=threshold, min_hours=min_hours) as s:
+        index = EpisodeIndex.build(station_frame, 'PM2.5', threshold, min_hours)
+        s.set(episodes=len(index))
+    return index
 
-    plt.tight_layout()
-    return fig, None
 
-# --- PB 4: Perhitungan Dampak Stagnasi ---
-def calculate_pb4_impact(df_filtered):
-    """PB 4: Menghitung perbandingan PM2.5 rata-rata saat Stagnan vs. Normal (untuk Metrik)."""
-    
-    if df_filtered.empty:
-        return None, "Data tidak cukup untuk analisis dampak stagnasi."
+@st.cache_resource(max_entries=VERSIONED_RESOURCES * len(GRID_OPTIONS))
+def get_spatial_fields(data_version, grid_shape):
+    """Grid IDW (bobot dihitung sekali) + cache medan per jam untuk peta polusi (lihat spatial_idw.py)."""
+    station_frame = get_station_frame(data_version)
+    if station_frame is None:
+        return None
+    with span('build_idw_grid', shape=grid_shape):
+        return SpatialFields(station_frame, shape=grid_shape)
 
-    stagnation_analysis = df_filtered.groupby('Is_Stagnant')[['PM2.5', 'WSPM']].mean()
-    
-    if True not in stagnation_analysis.index or False not in stagnation_analysis.index:
-        return None, "Hanya ada data Stagnan atau data Normal. Perbandingan tidak mungkin."
-        
-    pm25_stagnant = stagnation_analysis.loc[True, 'PM2.5']
-    pm25_normal = stagnation_analysis.loc[False, 'PM2.5']
-    
-    if pm25_normal == 0:
-        return None, "Rata-rata PM2.5 saat Normal adalah nol, perbandingan rasio tidak valid."
 
-    ratio_pm25 = (pm25_stagnant / pm25_normal)
-    
-    return ratio_pm25, None
+@st.cache_resource(max_entries=VERSIONED_RESOURCES)
+def get_query_backend(data_version, _metrics):
+    """Backend query PB 1-4 untuk metrik versi `data_version`: cube in-memory (default) atau DuckDB jika DASHBOARD_BACKEND=duckdb."""
+    return load_backend(os.path.dirname(__file__), _metrics)
 
-# =========================================================
-#           MEMBACA DATA DAN AGREGASI STATIS
-# =========================================================
-
-@st.cache_data
-def load_data():
-    """Memuat data, melakukan Feature Engineering, dan menghitung metrik statis yang di-cache."""
-    try:
-        # --- Path & Load CSV ---
-        base_path = os.path.dirname(__file__)
-        file_path = os.path.join(base_path, 'main_data.csv')
-
-        df_full = pd.read_csv(
-            file_path,
-            parse_dates=True,
-            infer_datetime_format=True
-        )
 
-        # --- Parsing kolom datetime ---
-        if 'datetime' in df_full.columns:
-            df_full['datetime'] = pd.to_datetime(df_full['datetime'], errors='coerce')
-            df_full.set_index('datetime', inplace=True)
-        else:
-            try:
-                df_full.index = pd.to_datetime(df_full.index, errors='coerce')
-            except Exception as e:
-                raise ValueError(f"Gagal mengubah index menjadi datetime: {e}")
-
-        if not isinstance(df_full.index, pd.DatetimeIndex):
-            raise TypeError("Index df_full bukan DatetimeIndex setelah parsing.")
-
-        # --- Feature Engineering Kritis ---
-        if 'year' not in df_full.columns:
-            df_full['year'] = df_full.index.year
-        df_full['Is_Stagnant'] = (df_full['WSPM'] < 3.2) # Stagnasi untuk PB 4
-        df_full['Area_Type'] = df_full['Area_Type'].astype('category')
-        df_full['Season'] = df_full['Season'].astype('category')
-        
-        pollutants_caap = ['PM2.5', 'NO2', 'SO2']
+@st.cache_resource(max_entries=VERSIONED_RESOURCES * 3)
+def get_filter_values(data_version, col, _metrics):
+    """Opsi filter `col` menurut urutan kemunculan di data: dari indeks filter, atau query SQL jika data per baris tidak dimuat."""
+    if _metrics['filter_index'] is None:
+        return get_query_backend(data_version, _metrics).first_seen_values(col)
+    return index_values(_metrics['filter_index'], col)
 
-        # PB 4: Stagnasi Udara (Overall) - HANYA METRIK GLOBAL AWAL
-        stagnation_analysis_overall = df_full.groupby('Is_Stagnant')[['PM2.5', 'WSPM']].mean()
-        if False in stagnation_analysis_overall.index and stagnation_analysis_overall.loc[False, 'PM2.5'] != 0:
-             ratio_pm25_overall = stagnation_analysis_overall.loc[True, 'PM2.5'] / stagnation_analysis_overall.loc[False, 'PM2.5']
-        else:
-             ratio_pm25_overall = np.nan
 
+@st.cache_resource
+def get_render_executor():
+    """Process pool untuk merender grafik independen satu halaman secara paralel (lihat render_executor.py)."""
+    return RenderExecutor()
 
-        # --- Kompilasi Semua Hasil ---
-        metrics = {
-            'df_full': df_full, # Ini adalah df_full_raw
-            'pb4_stagnation': stagnation_analysis_overall,
-            'pb4_ratio': ratio_pm25_overall,
-        }
-        return metrics
 
-    except FileNotFoundError:
-        st.error("Error: Pastikan file data (main_data.csv) ada di folder yang benar.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Terjadi kesalahan fatal saat memuat data: {e}")
-        st.stop()
+@st.cache_resource
+def get_compute_graph():
+    """Graf komputasi tabel turunan PB 1-4 (satu per proses, lihat pipeline.py)."""
+    return build_compute_graph()
 
 
 # =========================================================
 #           EKSTRAK HASIL DAN KONFIGURASI APLIKASI
 # =========================================================
-metrics = load_data()
-df_full_raw = metrics['df_full'] 
-stagnation_analysis_overall = metrics['pb4_stagnation']
-ratio_pm25_overall = metrics['pb4_ratio']
+begin_rerun()  # Span timing per rerun (aktif jika DASHBOARD_TRACE=1, lihat timing.py)
 
 # Konfigurasi Streamlit
 st.set_page_config(
@@ -388,6 +150,33 @@ st.set_page_config(
 st.title("Analisis Kualitas Udara Beijing (2013-2017): Evaluasi Dampak Clean Air Action Plan (CAAP) dan Tantangan Diagnostik")
 st.caption("Proyek Analisis Data oleh Gina Melinia")
 
+# Judul tampil sebelum data dimuat: time-to-first-paint tidak menunggu load_data()
+first_paint = mark_first_paint(script_started)
+
+with span('load_data'):
+    metrics_holder = load_data()
+    # Observasi baru yang ditambahkan lewat incremental.py: agregasi diperbarui dengan delta (tanpa cold reload)
+    refreshed = refresh_metrics(metrics_holder, os.path.dirname(__file__))
+    # Diambil sekali per rerun: seluruh rerun memakai dict metrik dari satu versi data
+    metrics = metrics_holder.current
+    if refreshed:
+        st.toast(f"Data baru dimuat (versi {metrics['version']}).")
+# Backend SQL (DASHBOARD_BACKEND=duckdb): data per baris & indeks filter tidak dimuat (None)
+df_full_raw = metrics_frame(metrics)
+data_version = metrics['version']
+figure_cache = get_figure_cache(data_version)
+render_executor = get_render_executor()
+compute_graph = get_compute_graph()
+query_backend = get_query_backend(data_version, metrics)
+filter_index = metrics['filter_index']
+windrose_hist = metrics['windrose_hist']
+quantile_sketches = metrics['quantile_sketches']
+# Sketch & histogram dimuat sekali per worker render; job PB 3 & PB 4 hanya mengirim filternya
+render_executor.share(data_version, {'quantile_sketches': quantile_sketches, 'windrose_hist': windrose_hist})
+stagnation_analysis_overall = metrics['pb4_stagnation']
+ratio_pm25_overall = metrics['pb4_ratio']
+
+
 # =========================================================
 #                   GLOBAL FILTER (AREA)
 # =========================================================
@@ -399,13 +188,15 @@ analysis_page = st.sidebar.radio(
         "2. Evaluasi Dampak CAAP (PB 2)",
         "3. Dinamika Ozon vs. NO₂ (PB 3)",
         "4. Peran Stagnasi Udara (PB 4)",
+        "5. Eksplorasi Deret Waktu Per Jam",
+        "6. Peta Polusi (Interpolasi Spasial)",
     ),
 )
 st.sidebar.markdown("---")
 st.sidebar.header("Filter Global")
 
 #  Filter Global Area
-area_options = ['Overall'] + list(df_full_raw['Area_Type'].unique())
+area_options = ['Overall'] + get_filter_values(data_version, 'Area_Type', metrics)
 selected_area_global = st.sidebar.selectbox(
     "Filter Berdasarkan Tipe Area:",
     options=area_options,
@@ -413,44 +204,23 @@ selected_area_global = st.sidebar.selectbox(
     help="Memfilter semua visualisasi berdasarkan Urban, Suburban, Rural, atau Keseluruhan (Overall).",
 )
 
-# Menerapkan Filter Area Global
-df_full_filtered = df_full_raw.copy()
-if selected_area_global != 'Overall':
-    df_full_filtered = df_full_filtered[df_full_filtered['Area_Type'] == selected_area_global]
-
-# Mengganti nama variabel df_full di seluruh kode menjadi df_full_filtered untuk konsistensi
-df_full = df_full_filtered 
+# Filter Area Global diterapkan pada backend query (node 'source_area'). Data per baris
+# hanya diambil (satu take lewat filter_index) di halaman yang membutuhkannya.
 
 
 # =========================================================
-#   PERHITUNGAN DINAMIS PASCA-FILTER GLOBAL (PB 1, 2, 3)
+#   PERHITUNGAN DINAMIS PASCA-FILTER GLOBAL (LAZY, PER HALAMAN)
 # =========================================================
+# Tabel turunan (PB 1-4) adalah node di compute_graph: hanya dihitung saat halaman
+# memintanya, dan dimemo berdasarkan fingerprint input (versi data + nilai widget).
+graph_sources = {'backend': query_backend, 'frame': df_full_raw, 'filter_index': filter_index, 'area': selected_area_global}
+graph_fingerprints = {
+    'backend': data_version, 'frame': data_version, 'filter_index': data_version, 'station_frame': data_version,
+}
 
-# PB 1 & 2: Tren & Perubahan Tahunan
-pollutants_caap = ['PM2.5', 'NO2', 'SO2']
-
-# Rata-rata Pasca-CAAP (Pasca-September 2013)
-df_post_caap_annual = (
-    df_full[df_full['Pre_CAAP'] == False].groupby('year')[pollutants_caap].mean()
-)
-# Baseline Pra-CAAP (Hingga September 2013)
-df_pre_caap_baseline = (
-    df_full[df_full['Pre_CAAP'] == True][pollutants_caap].mean().to_frame().T
-)
-df_pre_caap_baseline.index = [2013]
-df_viz_pb1 = pd.concat([df_pre_caap_baseline, df_post_caap_annual])
-df_viz_pb1.index.name = 'year'
-baseline_values = df_pre_caap_baseline.iloc[0]
-
-# Perubahan Persentase Tahunan (PB 2)
-df_annual_change = ((df_post_caap_annual - baseline_values) / baseline_values) * 100
-df_annual_change.index.name = 'year'
-
-# PB 3: Korelasi O3 vs NO2 Musim Panas
-df_summer = df_full[df_full['Season'] == 'Summer'].copy()
-ozone_nitro_corr = df_summer.groupby('year')[['O3', 'NO2']].corr().unstack()
-ozone_nitro_corr_summer = ozone_nitro_corr[('O3', 'NO2')]
-ozone_nitro_corr_summer.name = 'O3_NO2_Correlation_Summer'
+def compute(node_name):
+    """Mengevaluasi node graf komputasi dengan source rerun ini."""
+    return compute_graph.evaluate(node_name, graph_sources, graph_fingerprints)
 
 
 # =========================================================
@@ -469,27 +239,29 @@ if analysis_page == "1. Tren Tahunan Polutan (PB 1)":
     with col_filter_1:
         selected_season = st.selectbox(
             "Filter Berdasarkan Musim:",
-            options=['Overall'] + list(df_full['Season'].unique()),
+            options=['Overall'] + get_filter_values(data_version, 'Season', metrics),
             help="Memfilter tren hanya untuk musim tertentu (e.g., Winter).",
         )
 
-    # Logika Pemfilteran Dinamis
-    df_filtered_pb1 = df_full.copy()
-    if selected_season != 'Overall':
-        df_filtered_pb1 = df_filtered_pb1[df_filtered_pb1['Season'] == selected_season]
+    # Logika Pemfilteran Dinamis (reduksi lewat backend query)
+    graph_sources['season_pb1'] = selected_season
 
     # Visualisasi & Metrik
     col_viz_1, col_viz_2 = st.columns([3, 1])
     with col_viz_1:
         st.subheader("Tren Polutan Gabungan")
-        fig_pb1 = plot_pb1_combined_dynamic(df_filtered_pb1)
-        st.pyplot(fig_pb1)
+        png_pb1, _ = figure_cache.get_or_render(
+            ('plot_pb1_combined_dynamic', selected_area_global, selected_season, data_version),
+            lambda: plots.plot_pb1_combined_dynamic(compute('annual_means_pb1')),
+        )
+        st.image(png_pb1, width='stretch')
 
     with col_viz_2:
         st.subheader("Rata-Rata Terfilter")
-        pm25_mean = df_filtered_pb1['PM2.5'].mean()
-        no2_mean = df_filtered_pb1['NO2'].mean() 
-        so2_mean = df_filtered_pb1['SO2'].mean()
+        pb1_means = compute('means_pb1')
+        pm25_mean = pb1_means['PM2.5']
+        no2_mean = pb1_means['NO2'] 
+        so2_mean = pb1_means['SO2']
         
         # Metrik PM2.5
         st.metric(label=f"PM2.5 Rata-Rata ({selected_area_global})", value=f"{pm25_mean:.2f} µg/m³")
@@ -520,15 +292,29 @@ elif analysis_page == "2. Evaluasi Dampak CAAP (PB 2)":
     )
     
     # Memfilter DataFrame yang sudah dihitung dinamis
+    df_annual_change = compute('annual_change')
     df_filtered_change = df_annual_change[selected_pollutants] if selected_pollutants else df_annual_change.iloc[:,0:0]
 
+    # Interval kepercayaan bootstrap blok (butuh data per stasiun dari store Parquet)
+    station_frame = get_station_frame(data_version)
+    if station_frame is not None:
+        graph_sources['station_frame'] = station_frame
+        caap_ci = compute('caap_ci')
+    else:
+        caap_ci = None
+
     # --- BARIS 1: VISUALISASI GRAFIK ---
     st.subheader("Bar Chart Perubahan Persentase Tahunan (vs. Baseline Pra-CAAP)")
     
     if selected_pollutants:
-        fig_pb2, error_msg = plot_pb2(df_filtered_change)
-        if fig_pb2:
-            st.pyplot(fig_pb2)
+        png_pb2, error_msg = figure_cache.get_or_render(
+            ('plot_pb2', selected_area_global, tuple(selected_pollutants), data_version),
+            lambda: plots.plot_pb2(df_filtered_change, caap_ci),
+        )
+        if png_pb2:
+            st.image(png_pb2, width='stretch')
+            if caap_ci is None:
+                st.caption("Interval kepercayaan bootstrap tidak tersedia (membutuhkan data per stasiun dari main_data_store/).")
         else:
             st.warning(error_msg)
     else:
@@ -581,12 +367,11 @@ elif analysis_page == "3. Dinamika Ozon vs. NO₂ (PB 3)":
     # === BARIS 1: TREN KORELASI ===
     st.subheader("A. Tren Korelasi Tahunan (Dinamika)")
     
-    # Plot Korelasi (menggunakan data yang sudah difilter Area Global)
-    fig_corr = plot_pb3_correlation_trend(ozone_nitro_corr_summer)
-    st.pyplot(fig_corr)
+    # Plot Korelasi (menggunakan data yang sudah difilter Area Global); diisi setelah filter Box Plot dibaca
+    slot_corr = st.empty()
     
     # Metrik Korelasi Kunci
-    r_2014 = ozone_nitro_corr_summer.get(2014, np.nan)
+    r_2014 = compute('o3_no2_corr_summer').get(2014, np.nan)
     st.metric(label="Korelasi Terkuat Negatif (2014)", value=f"r = {r_2014:.3f}", delta="Hubungan Titrasi NOₓ terkuat", delta_color="off")
     
     st.markdown("---") # Separator visual
@@ -595,7 +380,7 @@ elif analysis_page == "3. Dinamika Ozon vs. NO₂ (PB 3)":
     st.subheader("B. Distribusi $\text{O}_3$ Berdasarkan Tipe Area (Diagnosis)")
     
     # Menambahkan Filter Lokal Tahun untuk Box Plot
-    available_years_raw = sorted(df_full_raw['year'].unique().astype(str).tolist())
+    available_years_raw = [str(year) for year in sorted(get_filter_values(data_version, 'year', metrics))]
     col_filter_bp, _ = st.columns([1, 3])
     with col_filter_bp:
         selected_year_pb3_boxplot = st.selectbox(
@@ -605,17 +390,29 @@ elif analysis_page == "3. Dinamika Ozon vs. NO₂ (PB 3)":
             help="Memfilter Box Plot O₃ berdasarkan tahun. (Menggunakan data Area keseluruhan/RAW)."
         )
     
-    # Memfilter data untuk Box Plot (Menggunakan data RAW/UNFILTERED Area, tetapi difilter Tahun)
-    df_filtered_boxplot = df_full_raw.copy()
-    if selected_year_pb3_boxplot != 'Overall':
-        df_filtered_boxplot = df_filtered_boxplot[df_filtered_boxplot['year'].astype(str) == selected_year_pb3_boxplot]
+    # Memfilter data untuk Box Plot (Menggunakan data RAW/UNFILTERED Area, tetapi difilter Tahun & Musim Panas)
+    year_pb3_boxplot = None if selected_year_pb3_boxplot == 'Overall' else int(selected_year_pb3_boxplot)
 
     # Plot Box Plot
-    fig_boxplot = plot_pb3_boxplot(df_filtered_boxplot)
-    st.pyplot(fig_boxplot)
-    
-    # Menghitung Rata-rata O3 untuk Metrik (Menggunakan data box plot yang sudah difilter tahun)
-    df_summer_mean = df_filtered_boxplot[df_filtered_boxplot['Season'] == 'Summer'].groupby('Area_Type')['O3'].mean()
+    slot_boxplot = st.empty()
+
+    # Tren korelasi & box plot dirender paralel; masing-masing tampil begitu selesai
+    slots_pb3 = {'corr': slot_corr, 'boxplot': slot_boxplot}
+    for slot, png, _ in render_executor.render(figure_cache, {
+        'corr': (
+            ('plot_pb3_correlation_trend', selected_area_global, data_version),
+            'plot_pb3_correlation_trend', (compute('o3_no2_corr_summer'),),
+        ),
+        'boxplot': (
+            ('plot_pb3_boxplot', selected_year_pb3_boxplot, data_version),
+            'plot_pb3_boxplot', (SharedArg('quantile_sketches'), year_pb3_boxplot),
+        ),
+    }):
+        slots_pb3[slot].image(png, width='stretch')
+    
+    # Menghitung Rata-rata O3 untuk Metrik (reduksi lewat backend query, difilter tahun & musim panas)
+    graph_sources['year_pb3_boxplot'] = year_pb3_boxplot
+    df_summer_mean = compute('o3_summer_means')
     
     col_metric_bp_1, col_metric_bp_2, _ = st.columns(3)
     with col_metric_bp_1:
@@ -623,6 +420,58 @@ elif analysis_page == "3. Dinamika Ozon vs. NO₂ (PB 3)":
     with col_metric_bp_2:
         st.metric(label="O₃ Rata-rata di Urban (Tertekan)", value=f"{df_summer_mean.get('Urban', np.nan):.2f} µg/m³")
 
+    st.markdown("---")
+
+    # === BARIS 3: KORELASI BERGULIR (ROLLING) ===
+    st.subheader("C. Korelasi Bergulir Antar Variabel (Per Stasiun)")
+    station_frame = get_station_frame(data_version)
+
+    if station_frame is None:
+        st.info("Korelasi bergulir membutuhkan data per stasiun dari store Parquet (jalankan `python ingest.py`).")
+    else:
+        rolling_cols = [col for col in ROLLING_COLS if col in station_frame.columns]
+        col_x, col_y, col_window, col_station = st.columns(4)
+        with col_x:
+            rolling_x = st.selectbox("Variabel X:", options=rolling_cols, index=rolling_cols.index('O3') if 'O3' in rolling_cols else 0, key='rolling_x')
+        with col_y:
+            rolling_y = st.selectbox("Variabel Y:", options=rolling_cols, index=rolling_cols.index('NO2') if 'NO2' in rolling_cols else 1, key='rolling_y')
+        with col_window:
+            rolling_window_label = st.select_slider("Panjang Jendela:", options=list(ROLLING_WINDOWS), value='1 Minggu', key='rolling_window')
+        with col_station:
+            stations_area = sorted(
+                station_frame['station'].unique().tolist() if selected_area_global == 'Overall'
+                else station_frame.loc[station_frame['Area_Type'] == selected_area_global, 'station'].unique().tolist()
+            )
+            rolling_station = st.selectbox(
+                "Stasiun:",
+                options=['Overall'] + stations_area,
+                key='rolling_station',
+                help="Overall: median & IQR antar stasiun di Area terpilih.",
+            )
+
+        if rolling_x == rolling_y:
+            st.warning("Pilih dua variabel yang berbeda untuk korelasi bergulir.")
+        else:
+            graph_sources.update({
+                'station_frame': station_frame,
+                'rolling_x': rolling_x,
+                'rolling_y': rolling_y,
+                'rolling_window': ROLLING_WINDOWS[rolling_window_label],
+                'rolling_station': rolling_station,
+            })
+            scope_label = f"Stasiun: {rolling_station}" if rolling_station != 'Overall' else f"Area: {selected_area_global}"
+            png_rolling, error_rolling = figure_cache.get_or_render(
+                ('plot_pb3_rolling_correlation', selected_area_global, rolling_x, rolling_y,
+                 rolling_window_label, rolling_station, data_version),
+                lambda: plots.plot_pb3_rolling_correlation(
+                    compute('rolling_summary'), rolling_x, rolling_y, rolling_window_label, scope_label
+                ),
+            )
+            if error_rolling:
+                st.warning(error_rolling)
+            elif png_rolling:
+                st.image(png_rolling, width='stretch')
+
     st.markdown("---")
     with st.expander("Diagnosis: Apakah terjadi Ozone Paradox?", expanded=False):
         st.markdown(
@@ -644,7 +493,7 @@ elif analysis_page == "4. Peran Stagnasi Udara (PB 4)":
     col_filter_4b, col_filter_4c = st.columns(2)
     
     with col_filter_4b:
-        available_years = sorted(df_full['year'].unique().astype(str).tolist())
+        available_years = [str(year) for year in compute('years_area')]
         selected_year_pb4 = st.selectbox(
             "Filter Berdasarkan Tahun:",
             options=['Overall'] + available_years,
@@ -652,7 +501,7 @@ elif analysis_page == "4. Peran Stagnasi Udara (PB 4)":
             help="Memfilter analisis pada tahun tertentu."
         )
     with col_filter_4c: 
-        available_seasons = sorted(df_full['Season'].unique().tolist())
+        available_seasons = compute('seasons_area')
         selected_season_pb4 = st.selectbox(
             "Filter Berdasarkan Musim:",
             options=['Overall'] + available_seasons,
@@ -660,61 +509,166 @@ elif analysis_page == "4. Peran Stagnasi Udara (PB 4)":
             help="Memfilter Wind Rose pada musim tertentu."
         )
 
-    # Logika Pemfilteran Dinamis
-    df_filtered_pb4 = df_full.copy()
-    
-    if selected_year_pb4 != 'Overall':
-        df_filtered_pb4 = df_filtered_pb4[df_filtered_pb4['year'].astype(str) == selected_year_pb4]
-    if selected_season_pb4 != 'Overall':
-        df_filtered_pb4 = df_filtered_pb4[df_filtered_pb4['Season'] == selected_season_pb4]
+    # Logika Pemfilteran Dinamis (filter diterapkan pada backend query, sketch, dan histogram pra-hitung)
+    year_pb4 = None if selected_year_pb4 == 'Overall' else int(selected_year_pb4)
+    filters_pb4 = {'Area_Type': selected_area_global, 'year': year_pb4, 'Season': selected_season_pb4}
+    key_pb4 = (selected_area_global, selected_year_pb4, selected_season_pb4, data_version)
 
-    # Perhitungan Dampak Stagnasi Dinamis
-    ratio_pm25_dynamic, error_ratio = calculate_pb4_impact(df_filtered_pb4)
+    # Perhitungan Dampak Stagnasi Dinamis (reduksi lewat backend query)
+    graph_sources.update({'year_pb4': year_pb4, 'season_pb4': selected_season_pb4})
+    ratio_pm25_dynamic, error_ratio = compute('pb4_impact')
 
     # --- Layout Bagian 1: Box Plot Stagnasi ---
     st.subheader("A. Perbandingan **PM2.5** vs. Stagnasi")
 
     col_viz_1 = st.columns(1)[0] # Ambil 1 kolom penuh
     with col_viz_1:
-        fig_boxplot_pb4, error_boxplot_pb4 = plot_pb4_boxplot_stagnation(df_filtered_pb4)
-        
-        if error_boxplot_pb4:
-            st.warning(error_boxplot_pb4)
-        elif fig_boxplot_pb4:
-            st.pyplot(fig_boxplot_pb4)
+        slot_boxplot_pb4 = st.empty()
 
     st.markdown("---") # Garis pemisah visual
 
     # --- Layout Bagian 2: Wind Rose Normal vs. Ekstrem ---
     st.subheader("B. Analisis Pola Angin Berdasarkan Kondisi **PM2.5**")
     col_viz_2, col_viz_3 = st.columns(2) # Dua kolom terpisah untuk Wind Rose
+    with col_viz_2:
+        slot_normal = st.empty()
+    with col_viz_3:
+        slot_extreme = st.empty()
 
     filter_title = f"Area: {selected_area_global} | Tahun: {selected_year_pb4} | Musim: {selected_season_pb4}"
 
-    # Wind Rose Kiri: Normal
-    with col_viz_2:
-        fig_normal, error_normal = plot_windrose_single_condition(
-            df_filtered_pb4, 
-            'Normal', # Kondisi Normal
-            filter_title
+    # Box plot & kedua Wind Rose dirender paralel; setiap grafik mengisi kolomnya begitu selesai
+    slots_pb4 = {
+        'boxplot': (slot_boxplot_pb4, "{}"),
+        'Normal': (slot_normal, "Normal Wind Rose Error: {}"),  # Wind Rose Kiri: Normal
+        'Extreme': (slot_extreme, "Ekstrem Wind Rose Error: {}"),  # Wind Rose Kanan: Ekstrem
+    }
+    jobs_pb4 = {
+        'boxplot': (
+            ('plot_pb4_boxplot_stagnation',) + key_pb4,
+            'plot_pb4_boxplot_stagnation', (SharedArg('quantile_sketches'), filters_pb4),
+        ),
+    }
+    for condition in ('Normal', 'Extreme'):
+        jobs_pb4[condition] = (
+            ('plot_windrose_single_condition', condition) + key_pb4,
+            'plot_windrose_single_condition', (SharedArg('windrose_hist'), filters_pb4, condition, filter_title),
         )
-        if error_normal:
-            st.warning(f"Normal Wind Rose Error: {error_normal}")
-        elif fig_normal:
-            st.pyplot(fig_normal)
 
-    # Wind Rose Kanan: Ekstrem
-    with col_viz_3:
-        fig_extreme, error_extreme = plot_windrose_single_condition(
-            df_filtered_pb4, 
-            'Extreme', # Kondisi Ekstrem
-            filter_title
+    for slot, png, error_msg in render_executor.render(figure_cache, jobs_pb4):
+        placeholder, error_format = slots_pb4[slot]
+        if error_msg:
+            placeholder.warning(error_format.format(error_msg))
+        elif png:
+            placeholder.image(png, width='stretch')
+
+    st.markdown("---")
+
+    # --- Layout Bagian 3: Sensitivitas Ambang Stagnasi ---
+    st.subheader("C. Sensitivitas Ambang Stagnasi (WSPM)")
+    st.caption(f"Definisi stagnasi di atas memakai WSPM < {STAGNANT_WSPM} m/s. Kurva menunjukkan rasio PM2.5 Stagnan/Normal untuk semua ambang sekaligus (data terfilter diurutkan sekali menurut WSPM).")
+
+    threshold_pb4 = st.slider(
+        "Ambang Stagnasi WSPM (m/s):",
+        min_value=THRESHOLD_MIN,
+        max_value=THRESHOLD_MAX,
+        value=STAGNANT_WSPM,
+        step=THRESHOLD_STEP,
+        format="%.1f",
+        key='stagnation_threshold',
+    )
+    sweep_pb4 = compute('stagnation_sweep')
+
+    png_sweep, error_sweep = figure_cache.get_or_render(
+        ('plot_pb4_threshold_sweep', threshold_pb4) + key_pb4,
+        lambda: plots.plot_pb4_threshold_sweep(sweep_pb4, threshold_pb4, STAGNANT_WSPM),
+    )
+    if error_sweep:
+        st.warning(error_sweep)
+    else:
+        st.image(png_sweep, width='stretch')
+
+        sweep_row = sweep_pb4.loc[round(threshold_pb4, 2)]
+        col_sweep_1, col_sweep_2, col_sweep_3, col_sweep_4 = st.columns(4)
+        with col_sweep_1:
+            st.metric(label="Rasio PM2.5 Stagnan/Normal", value=f"{sweep_row['ratio']:.2f}x")
+        with col_sweep_2:
+            st.metric(label="PM2.5 Rata-rata Saat Stagnan", value=f"{sweep_row['pm25_stagnant']:.1f}")
+        with col_sweep_3:
+            st.metric(label="PM2.5 Rata-rata Saat Normal", value=f"{sweep_row['pm25_normal']:.1f}")
+        with col_sweep_4:
+            st.metric(
+                label="Jam Stagnan",
+                value=f"{sweep_row['share_stagnant'] * 100:.1f}%",
+                delta=f"{int(sweep_row['n_stagnant']):,} vs {int(sweep_row['n_normal']):,} jam Normal",
+                delta_color="off",
+            )
+
+    st.markdown("---")
+
+    # --- Layout Bagian 4: Episode Polusi Berkelanjutan ---
+    st.subheader("D. Episode **PM2.5** Berkelanjutan")
+    st.caption("Episode adalah jam berurutan di satu stasiun dengan PM2.5 di atas ambang selama minimal durasi terpilih. Filter Area, Tahun, dan Musim di atas membatasi stasiun, jendela waktu, dan musim awal episode.")
+
+    if get_station_frame(data_version) is None:
+        st.info("Deteksi episode membutuhkan data per stasiun dari store Parquet (jalankan `python ingest.py`).")
+    else:
+        col_episode_1, col_episode_2 = st.columns(2)
+        with col_episode_1:
+            threshold_episode = st.selectbox(
+                "Ambang PM2.5 (µg/m³):", options=EPISODE_THRESHOLD_OPTIONS,
+                index=EPISODE_THRESHOLD_OPTIONS.index(EPISODE_THRESHOLD), key='episode_threshold',
+            )
+        with col_episode_2:
+            min_hours_episode = st.selectbox(
+                "Durasi Minimum (jam):", options=EPISODE_HOURS_OPTIONS,
+                index=EPISODE_HOURS_OPTIONS.index(EPISODE_MIN_HOURS), key='episode_min_hours',
+            )
+
+        episode_index = get_episode_index(data_version, threshold_episode, min_hours_episode)
+        stations_episode = None
+        if selected_area_global != 'Overall':
+            station_areas = get_station_frame(data_version).groupby('station', observed=True)['Area_Type'].first()
+            stations_episode = station_areas.index[station_areas == selected_area_global].astype(str).tolist()
+        window_episode = (
+            (None, None) if year_pb4 is None
+            else (pd.Timestamp(year_pb4, 1, 1), pd.Timestamp(year_pb4, 12, 31, 23))
         )
-        if error_extreme:
-            st.warning(f"Ekstrem Wind Rose Error: {error_extreme}")
-        elif fig_extreme:
-            st.pyplot(fig_extreme)
-    
+        episodes_pb4 = episode_index.query(*window_episode, stations=stations_episode)
+        if selected_season_pb4 != 'Overall':
+            episodes_pb4 = episodes_pb4[episodes_pb4['Season'] == selected_season_pb4]
+
+        png_episode, error_episode = figure_cache.get_or_render(
+            ('plot_pb4_episodes', threshold_episode, min_hours_episode) + key_pb4,
+            lambda: plots.plot_pb4_episodes(episodes_pb4, 'PM2.5', threshold_episode, min_hours_episode),
+        )
+        if error_episode:
+            st.warning(error_episode)
+        else:
+            st.image(png_episode, width='stretch')
+
+            summary_episode = summarize_episodes(episodes_pb4)
+            col_ep_1, col_ep_2, col_ep_3, col_ep_4 = st.columns(4)
+            with col_ep_1:
+                st.metric(label="Jumlah Episode", value=f"{summary_episode['count']:,}")
+            with col_ep_2:
+                st.metric(label="Total Jam Episode", value=f"{summary_episode['hours']:,}")
+            with col_ep_3:
+                st.metric(label="Durasi Rata-rata", value=f"{summary_episode['mean_hours']:.1f} jam")
+            with col_ep_4:
+                st.metric(label="Episode Terpanjang", value=f"{summary_episode['longest_hours']:,} jam")
+
+            st.dataframe(
+                episodes_pb4.sort_values('peak', ascending=False).rename(columns={
+                    'station': 'Stasiun', 'start': 'Mulai', 'end': 'Selesai', 'hours': 'Durasi (jam)',
+                    'peak': 'Puncak', 'peak_time': 'Waktu Puncak', 'mean': 'Rata-rata',
+                    'wd_dominant': 'Arah Angin Dominan', 'wspm_mean': 'WSPM Rata-rata',
+                })[['Stasiun', 'Mulai', 'Selesai', 'Durasi (jam)', 'Puncak', 'Waktu Puncak',
+                    'Rata-rata', 'Arah Angin Dominan', 'WSPM Rata-rata']],
+                hide_index=True,
+                width='stretch',
+            )
+
     st.markdown("---")
     
     # Metrik Kunci
@@ -736,4 +690,197 @@ elif analysis_page == "4. Peran Stagnasi Udara (PB 4)":
         Timur Laut (N-E) mendominasi pada saat kondisi ekstrem.</p>
         """, unsafe_allow_html=True)
     else:
-        st.warning("Metrik Dampak Stagnasi tidak dapat dihitung karena data yang difilter terlalu sedikit atau tidak seimbang.")
\ No newline at end of file
+        st.warning("Metrik Dampak Stagnasi tidak dapat dihitung karena data yang difilter terlalu sedikit atau tidak seimbang.")
+
+
+# ---------------------------------------------------------
+# Eksplorasi: Deret Waktu Per Jam
+# ---------------------------------------------------------
+elif analysis_page == "5. Eksplorasi Deret Waktu Per Jam":
+    st.header(f"5. Eksplorasi Deret Waktu Per Jam (Area: {selected_area_global})")
+    st.info(f"Zoom ke episode per jam di stasiun tertentu. Tampilan memakai piramida multi-resolusi (per jam/harian/mingguan/bulanan) dan downsampling LTTB, sehingga paling banyak ~{MAX_POINTS:,} titik digambar untuk rentang apa pun.")
+
+    station_frame = get_station_frame(data_version)
+    if station_frame is None:
+        st.info("Eksplorasi deret waktu membutuhkan data per stasiun dari store Parquet (jalankan `python ingest.py`).")
+    else:
+        ts_pyramid = get_ts_pyramid(data_version)
+        ts_cols = [col for col in ROLLING_COLS if col in station_frame.columns]
+
+        col_station_ts, col_var_ts = st.columns(2)
+        with col_station_ts:
+            stations_area = sorted(
+                station_frame['station'].unique().tolist() if selected_area_global == 'Overall'
+                else station_frame.loc[station_frame['Area_Type'] == selected_area_global, 'station'].unique().tolist()
+            )
+            selected_station_ts = st.selectbox("Stasiun:", options=stations_area, key='ts_station')
+        with col_var_ts:
+            selected_col_ts = st.selectbox("Variabel:", options=ts_cols, key='ts_variable')
+
+        # Rentang waktu (zoom & geser) dengan resolusi per jam
+        time_min = station_frame.index.min().to_pydatetime()
+        time_max = station_frame.index.max().to_pydatetime()
+        ts_start, ts_end = st.slider(
+            "Rentang Waktu (geser ujung untuk zoom, geser rentang untuk pan):",
+            min_value=time_min,
+            max_value=time_max,
+            value=(time_min, time_max),
+            step=pd.Timedelta(hours=1).to_pytimedelta(),
+            format="YYYY-MM-DD HH:mm",
+            key='ts_range',
+        )
+
+        with span('query_pyramid', station=selected_station_ts, variable=selected_col_ts) as s:
+            ts_line, ts_envelope, ts_level = query_pyramid(
+                ts_pyramid, selected_station_ts, selected_col_ts, ts_start, ts_end
+            )
+            s.set(rows=len(ts_line), level=ts_level)
+
+        png_ts, error_ts = figure_cache.get_or_render(
+            ('plot_timeseries_explorer', selected_station_ts, selected_col_ts, ts_start, ts_end, data_version),
+            lambda: plots.plot_timeseries_explorer(ts_line, ts_envelope, selected_station_ts, selected_col_ts, ts_level),
+        )
+        if error_ts:
+            st.warning(error_ts)
+        elif png_ts:
+            st.image(png_ts, width='stretch')
+
+        col_metric_ts_1, col_metric_ts_2, col_metric_ts_3 = st.columns(3)
+        with col_metric_ts_1:
+            st.metric(label="Resolusi Data", value=ts_level)
+        with col_metric_ts_2:
+            st.metric(label="Titik Digambar", value=f"{len(ts_line):,}")
+        with col_metric_ts_3:
+            st.metric(label=f"{selected_col_ts} Rata-rata (Rentang)", value=f"{ts_line.mean():.2f}")
+
+# ---------------------------------------------------------
+# Eksplorasi: Peta Polusi (Interpolasi IDW)
+# ---------------------------------------------------------
+elif analysis_page == "6. Peta Polusi (Interpolasi Spasial)":
+    st.header(f"6. Peta Polusi Kontinu Antar Stasiun (Area: {selected_area_global})")
+    st.info("Nilai stasiun diinterpolasi ke grid lintang/bujur dengan Inverse Distance Weighting (IDW). Filter Tipe Area membatasi stasiun yang dipakai; stasiun lain digambar kosong.")
+
+    station_frame = get_station_frame(data_version)
+    if station_frame is None:
+        st.info("Peta polusi membutuhkan data per stasiun dari store Parquet (jalankan `python ingest.py`).")
+    else:
+        col_var_map, col_window_map, col_mode_map, col_grid_map = st.columns(4)
+        with col_var_map:
+            map_cols = [col for col in ROLLING_COLS if col in station_frame.columns]
+            selected_col_map = st.selectbox("Variabel:", options=map_cols, key='map_variable')
+        with col_window_map:
+            window_options = {'1 jam': 1, '6 jam': 6, '24 jam': 24, '3 hari': 72, '7 hari': MAX_FRAMES}
+            window_label_map = st.selectbox("Panjang Jendela:", options=list(window_options), index=2, key='map_window')
+            window_hours_map = window_options[window_label_map]
+        with col_mode_map:
+            map_mode = st.radio("Tampilan:", options=['Rata-rata jendela', 'Animasi per jam'], key='map_mode')
+        with col_grid_map:
+            grid_labels = list(GRID_OPTIONS)
+            grid_label_map = st.selectbox(
+                "Resolusi Grid:", options=grid_labels,
+                index=list(GRID_OPTIONS.values()).index(GRID_SHAPE), key='map_grid',
+            )
+
+        time_min = station_frame.index.min().to_pydatetime()
+        time_max = station_frame.index.max().to_pydatetime()
+        map_start = st.slider(
+            "Awal Jendela:",
+            min_value=time_min,
+            max_value=time_max,
+            value=max(time_min, time_max - pd.Timedelta(hours=window_hours_map).to_pytimedelta()),
+            step=pd.Timedelta(hours=1).to_pytimedelta(),
+            format="YYYY-MM-DD HH:mm",
+            key='map_start',
+        )
+
+        spatial_fields = get_spatial_fields(data_version, GRID_OPTIONS[grid_label_map])
+        coords = spatial_fields.grid.coords
+        stations_map = (
+            None if selected_area_global == 'Overall'
+            else coords.index[coords['Area_Type'] == selected_area_global].tolist()
+        )
+        hourly_map = map_mode == 'Animasi per jam'
+        frame_times, fields_map, station_values_map = spatial_fields.window(
+            selected_col_map, map_start, window_hours_map, hourly=hourly_map, stations=stations_map
+        )
+
+        if len(fields_map) == 0 or np.isnan(fields_map).all():
+            st.warning("Tidak ada data stasiun pada jendela waktu terpilih.")
+        else:
+            # Skala warna sama untuk semua frame jendela (animasi dapat dibandingkan antar jam)
+            vmin_map, vmax_map = float(np.nanmin(fields_map)), float(np.nanmax(fields_map))
+            key_map = (selected_col_map, map_start, window_hours_map, selected_area_global, grid_label_map, data_version)
+
+            def map_frame_job(i):
+                """Job render satu frame peta: (kunci cache, nama fungsi plot, args), lihat render_executor.py."""
+                if hourly_map:
+                    title = f"{selected_col_map} Pukul {frame_times[i]:%Y-%m-%d %H:%M}"
+                else:
+                    title = f"{selected_col_map} Rata-rata {window_label_map} Sejak {map_start:%Y-%m-%d %H:%M}"
+                return ('plot_idw_map', hourly_map, i) + key_map, 'plot_idw_map', (
+                    fields_map[i], spatial_fields.grid, station_values_map.iloc[i], selected_col_map,
+                    title, vmin_map, vmax_map,
+                )
+
+            map_placeholder = st.empty()
+            frame_map = 0
+            if hourly_map and len(fields_map) > 1:
+                frame_map = st.slider("Jam ke-", min_value=0, max_value=len(fields_map) - 1, value=0, key='map_frame')
+                if st.button("▶ Putar Animasi", key='map_play'):
+                    # Frame dirender paralel lewat process pool (yang sudah ada di cache langsung dipakai).
+                    # Mengubah pilihan apa pun memicu rerun yang menghentikan render ini.
+                    n_frames = len(fields_map)
+                    progress_map = st.progress(0.0, text=f"Merender {n_frames} frame...")
+                    frames_png = {}
+                    jobs_map = {i: map_frame_job(i) for i in range(n_frames)}
+                    for i, png_frame, _ in render_executor.render(figure_cache, jobs_map):
+                        frames_png[i] = png_frame
+                        progress_map.progress(
+                            len(frames_png) / n_frames, text=f"Merender frame {len(frames_png)}/{n_frames}...",
+                        )
+                    progress_map.empty()
+                    for i in range(n_frames):
+                        if frames_png[i] is not None:
+                            map_placeholder.image(frames_png[i], width='stretch')
+
+            key_frame, _, args_frame = map_frame_job(frame_map)
+            png_map, error_map = figure_cache.get_or_render(key_frame, lambda: plots.plot_idw_map(*args_frame))
+            if error_map:
+                map_placeholder.warning(error_map)
+            else:
+                map_placeholder.image(png_map, width='stretch')
+
+            col_metric_map_1, col_metric_map_2, col_metric_map_3 = st.columns(3)
+            with col_metric_map_1:
+                st.metric(label="Stasiun Dipakai", value=int(station_values_map.notna().any().sum()))
+            with col_metric_map_2:
+                st.metric(label=f"{selected_col_map} Minimum Medan", value=f"{vmin_map:.1f}")
+            with col_metric_map_3:
+                st.metric(label=f"{selected_col_map} Maksimum Medan", value=f"{vmax_map:.1f}")
+
+# =========================================================
+#            PANEL DEBUG TIMING (DASHBOARD_TRACE=1)
+# =========================================================
+# Record rerun ini juga ditulis ke file JSON-lines (TRACE_FILE) untuk agregasi.
+trace_record = end_rerun(
+    page=analysis_page, area=selected_area_global,
+    first_paint_ms=first_paint['rerun_ms'], process_first_paint_s=first_paint.get('process_s'),
+)
+if trace_record is not None:
+    with st.sidebar.expander("⏱️ Debug: Timing Rerun", expanded=False):
+        rss_caption = (
+            "RSS: tidak tersedia" if trace_record['rss_mb'] is None
+            else f"RSS: {trace_record['rss_mb']:.0f} MB (Δ {trace_record['rss_delta_mb']:+.1f} MB)"
+        )
+        st.caption(f"Total: {trace_record['total_ms']:.1f} ms | {rss_caption}")
+        st.caption(
+            f"First paint: {first_paint['rerun_ms']:.1f} ms sejak awal rerun | "
+            f"{first_paint_info().get('process_s', float('nan')):.2f} s sejak proses dimulai (paint pertama proses)"
+        )
+        df_spans = pd.DataFrame(trace_record['spans'])
+        if not df_spans.empty:
+            # Indentasi nama span sesuai kedalaman (span bersarang)
+            df_spans['name'] = df_spans['depth'].map(lambda d: '· ' * d) + df_spans['name']
+            st.dataframe(df_spans.drop(columns=['depth']), hide_index=True)
+        st.json({'figure_cache': figure_cache.stats(), 'compute_graph': compute_graph.stats()}, expanded=False)
+        st.caption(f"Log: {TRACE_FILE}")
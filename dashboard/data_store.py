@@ -0,0 +1,228 @@
+import hashlib
+import os
+import shutil
+import uuid
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from windrose_hist import encode_wd
+
+# =========================================================
+#       PENYIMPANAN KOLUMNAR (PARQUET) UNTUK DASHBOARD
+# =========================================================
+# Menggantikan cold load main_data.csv: data yang sudah disiapkan disimpan
+# sekali sebagai Parquet dengan dtype eksplisit, dipartisi per stasiun & tahun,
+# sehingga dashboard cukup membaca kolom dan partisi yang dibutuhkan.
+# Skema yang sama (COLUMN_DTYPES) juga dipaksakan saat membaca main_data.csv,
+# sehingga representasi di memori ringkas apa pun sumbernya.
+
+STORE_DIRNAME = 'main_data_store'
+# Ambang stagnasi PB 4 (WSPM < ambang, m/s); satu definisi untuk store dan fitur (ingest/pipeline)
+STAGNANT_WSPM = 3.2
+PARTITION_COLS = ['station', 'year']
+# Ukuran blok saat menghitung hash isi file Parquet
+HASH_BLOCK_BYTES = 1 << 20
+
+# Dtype eksplisit (ringkas) untuk setiap kolom yang mungkin ada di dataset
+COLUMN_DTYPES = {
+    'PM2.5': 'float32',
+    'PM10': 'float32',
+    'SO2': 'float32',
+    'NO2': 'float32',
+    'CO': 'float32',
+    'O3': 'float32',
+    'TEMP': 'float32',
+    'PRES': 'float32',
+    'DEWP': 'float32',
+    'RAIN': 'float32',
+    'WSPM': 'float32',
+    'wd': 'category',
+    'wd_sector': 'uint8',
+    'station': 'category',
+    'Area_Type': 'category',
+    'Season': 'category',
+    'Pre_CAAP': 'bool',
+    'Is_Stagnant': 'bool',
+    'year': 'int16',
+    'month': 'uint8',
+    'day': 'uint8',
+    'hour': 'uint8',
+}
+
+
+def apply_schema(df):
+    """Menerapkan dtype ringkas dari COLUMN_DTYPES pada kolom yang tersedia."""
+    dtypes = {col: dtype for col, dtype in COLUMN_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+def write_store(df, store_path):
+    """
+    Menulis DataFrame (index datetime) ke dataset Parquet terpartisi.
+    Partisi: station/year (hanya kolom partisi yang tersedia di data).
+    """
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise TypeError("Index DataFrame harus DatetimeIndex sebelum ditulis ke store.")
+
+    df_store = df.copy()
+    if 'year' not in df_store.columns:
+        df_store['year'] = df_store.index.year
+    if 'Is_Stagnant' not in df_store.columns and 'WSPM' in df_store.columns:
+        df_store['Is_Stagnant'] = df_store['WSPM'] < STAGNANT_WSPM
+    if 'wd_sector' not in df_store.columns and 'wd' in df_store.columns:
+        df_store['wd_sector'] = encode_wd(df_store['wd'])
+
+    df_store = apply_schema(df_store)
+    df_store.index.name = 'datetime'
+    df_store = df_store.reset_index()
+
+    partition_cols = [col for col in PARTITION_COLS if col in df_store.columns]
+
+    # Menulis ulang store dari nol agar tidak ada file partisi lama yang tertinggal
+    if os.path.isdir(store_path):
+        shutil.rmtree(store_path)
+
+    df_store.to_parquet(
+        store_path,
+        engine='pyarrow',
+        index=False,
+        partition_cols=partition_cols,
+    )
+    return store_path
+
+
+def write_partitions(df, store_path):
+    """
+    Menulis ulang hanya partisi station/year yang ada di `df` (index datetime, skema store lengkap);
+    partisi lain tidak disentuh. Setiap partisi menjadi satu file Parquet baru menggantikan file lamanya.
+    """
+    df_store = apply_schema(df)
+    df_store.index.name = 'datetime'
+    for (station, year), part in df_store.groupby(PARTITION_COLS, observed=True, sort=True):
+        part_dir = os.path.join(store_path, f'station={station}', f'year={int(year)}')
+        os.makedirs(part_dir, exist_ok=True)
+        old_files = os.listdir(part_dir)
+
+        # Ditulis dengan prefiks '.' (diabaikan pembaca dataset) lalu di-rename
+        name = f'{uuid.uuid4().hex}-0.parquet'
+        tmp_path = os.path.join(part_dir, f'.{name}')
+        part.drop(columns=PARTITION_COLS).sort_index().reset_index().to_parquet(tmp_path, engine='pyarrow', index=False)
+        for old_name in old_files:
+            os.remove(os.path.join(part_dir, old_name))
+        os.replace(tmp_path, os.path.join(part_dir, name))
+
+
+# Hash isi per file, dengan kunci (path, ukuran, mtime): file yang tidak berubah tidak dibaca ulang
+_file_digests = {}
+
+
+def _file_digest(path, stat):
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    digest = _file_digests.get(key)
+    if digest is None:
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+                h.update(block)
+        digest = _file_digests[key] = h.hexdigest()
+    return digest
+
+
+def store_version(store_path):
+    """
+    Versi data store dari isi partisinya: hash atas (folder partisi, ukuran, hash isi) setiap file Parquet.
+    Tidak bergantung pada nama file & waktu modifikasi, sehingga tetap sama setelah clone/salin/touch
+    (DuckDB, snapshot hangat, dan aset pra-render tetap valid), dan berubah setiap kali isi data berubah.
+    File berawalan '.' atau '_' (jurnal append, file sementara) tidak dihitung, sama seperti pembaca dataset.
+    """
+    files = []
+    for root, dirs, names in os.walk(store_path):
+        dirs[:] = [name for name in dirs if not name.startswith(('.', '_'))]
+        for name in names:
+            if name.startswith(('.', '_')) or not name.endswith('.parquet'):
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            partition = os.path.relpath(root, store_path).replace(os.sep, '/')
+            files.append(f"{partition}:{stat.st_size}:{_file_digest(path, stat)}")
+
+    h = hashlib.sha1()
+    for entry in sorted(files):
+        h.update(entry.encode('utf-8') + b'\n')
+    return f"store:{h.hexdigest()[:16]}"
+
+
+def csv_version(csv_path):
+    """Versi main_data.csv dari isinya (hash), bukan waktu modifikasi."""
+    return f"csv:{_file_digest(csv_path, os.stat(csv_path))[:16]}"
+
+
+def read_store(store_path, columns=None, stations=None, years=None):
+    """
+    Membaca dataset Parquet terpartisi dengan proyeksi kolom dan pruning partisi.
+    columns: daftar kolom yang dibutuhkan (None = semua kolom).
+    stations / years: daftar nilai partisi yang dibaca (None = semua).
+    """
+    if not os.path.isdir(store_path):
+        raise FileNotFoundError(f"Store Parquet tidak ditemukan: {store_path}")
+
+    filters = []
+    if stations is not None:
+        filters.append(('station', 'in', list(stations)))
+    if years is not None:
+        filters.append(('year', 'in', [int(y) for y in years]))
+
+    read_columns = None
+    if columns is not None:
+        # Kolom yang belum ada di store lama dilewati (dapat dihitung ulang oleh pemanggil)
+        available = set(ds.dataset(store_path, partitioning='hive').schema.names)
+        read_columns = ['datetime'] + [col for col in columns if col != 'datetime' and col in available]
+
+    df = pd.read_parquet(
+        store_path,
+        engine='pyarrow',
+        columns=read_columns,
+        filters=filters or None,
+    )
+    return normalize_frame(df)
+
+
+def normalize_frame(df):
+    """Mengembalikan DataFrame hasil baca Parquet (kolom 'datetime') ke dtype skema dengan index datetime."""
+    # Kolom partisi dibaca kembali sebagai kategori/string -> kembalikan ke dtype skema
+    if 'year' in df.columns:
+        df['year'] = df['year'].astype('int64').astype(COLUMN_DTYPES['year'])
+    if 'station' in df.columns:
+        df['station'] = df['station'].astype(str).astype('category')
+
+    df = apply_schema(df)
+    df['datetime'] = pd.to_datetime(df['datetime'])
+    return df.set_index('datetime')
+
+
+def read_csv_frame(csv_path, columns=None):
+    """
+    Membaca main_data.csv langsung ke dtype skema (float32, kategori, int kecil) dengan index datetime,
+    tanpa perantara float64/object. columns: daftar kolom yang dibaca (None = semua kolom).
+    """
+    header = pd.read_csv(csv_path, nrows=0).columns
+    usecols = [col for col in header if col == 'datetime' or columns is None or col in columns]
+    dtypes = {col: COLUMN_DTYPES[col] for col in usecols if col in COLUMN_DTYPES}
+    df = pd.read_csv(csv_path, usecols=usecols, dtype=dtypes)
+    df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
+    return df.set_index('datetime')
+
+
+def build_store_from_csv(csv_path, store_path):
+    """Mengonversi main_data.csv (output notebook) menjadi store Parquet."""
+    return write_store(read_csv_frame(csv_path), store_path)
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.join(base_path, 'main_data.csv')
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+
+    build_store_from_csv(csv_path, store_path)
+    print(f"Store Parquet berhasil disimpan di: {store_path}")
@@ -0,0 +1,223 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingest import SEASON_BY_MONTH
+from windrose_hist import CARDINAL16, N_SECTORS, WD_NA_CODE
+
+# =========================================================
+#     EPISODE POLUSI BERKELANJUTAN (RUN-LENGTH ENCODING)
+# =========================================================
+# PB 4 mengelompokkan setiap jam secara terpisah (Normal < 75, Ekstrem > 200)
+# sehingga tidak terlihat berapa lama polusi tinggi bertahan. Episode adalah
+# run jam berurutan di satu stasiun dengan polutan > ambang selama minimal
+# EPISODE_MIN_HOURS jam. Seluruh stasiun & tahun diproses dalam satu pass NumPy:
+# data diurutkan (stasiun, waktu) sekali, batas run dicari dengan np.diff pada
+# mask yang dipecah di pergantian stasiun / celah waktu, dan statistik setiap
+# episode (puncak, rata-rata, arah angin dominan, rata-rata WSPM) dihitung
+# dengan reduceat / bincount -- tanpa loop Python per baris atau per episode.
+# EpisodeIndex menyimpan episode terurut menurut waktu mulai beserta maksimum
+# kumulatif waktu selesai, sehingga query "episode yang beririsan dengan
+# jendela waktu / sekumpulan stasiun" cukup dua searchsorted + satu mask.
+
+# Ambang default: batas atas kondisi Normal PB 4 (µg/m³) dan durasi minimum (jam)
+EPISODE_THRESHOLD = 75.0
+EPISODE_MIN_HOURS = 24
+
+# Pilihan ambang & durasi untuk dashboard
+EPISODE_THRESHOLD_OPTIONS = [75, 115, 150, 200, 250]
+EPISODE_HOURS_OPTIONS = [6, 12, 24, 48, 72]
+
+EPISODE_COLUMNS = [
+    'station', 'Area_Type', 'start', 'end', 'hours', 'peak', 'peak_time',
+    'mean', 'wd_dominant', 'wspm_mean', 'year', 'Season',
+]
+
+
+def run_bounds(mask, breaks=None):
+    """
+    Batas run True pada `mask` (bool 1D): (awal, akhir eksklusif) sebagai array posisi.
+    breaks: bool 1D, True pada posisi yang selalu memulai run baru (mis. pergantian stasiun).
+    """
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(np.concatenate([[False], mask, [False]]).astype('int8'))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if breaks is not None:
+        # Titik putus di dalam run: akhiri run sebelumnya dan mulai run baru di posisi itu
+        cuts = np.flatnonzero(np.asarray(breaks, dtype=bool) & mask & np.concatenate([[False], mask[:-1]]))
+        starts = np.sort(np.concatenate([starts, cuts]))
+        ends = np.sort(np.concatenate([ends, cuts]))
+    return starts, ends
+
+
+def detect_episodes(station_frame, col='PM2.5', threshold=EPISODE_THRESHOLD, min_hours=EPISODE_MIN_HOURS):
+    """
+    Episode `col` > threshold selama >= min_hours jam berturut-turut per stasiun (satu pass untuk semua data).
+    station_frame: data per jam dengan index datetime serta kolom station, Area_Type, col, WSPM (dan wd_sector).
+    Jam yang hilang (celah waktu) atau nilai kosong memutus episode.
+    Mengembalikan DataFrame EPISODE_COLUMNS (satu baris per episode; end = jam terakhir episode).
+    """
+    times = station_frame.index.to_numpy('datetime64[ns]')
+    station_codes, stations = pd.factorize(station_frame['station'].astype(str), sort=True)
+    order = np.lexsort((times, station_codes))
+
+    times = times[order]
+    station_codes = station_codes[order]
+    values = station_frame[col].to_numpy('float64')[order]
+    wspm = station_frame['WSPM'].to_numpy('float64')[order]
+    if 'wd_sector' in station_frame.columns:
+        sectors = station_frame['wd_sector'].to_numpy('uint8')[order]
+    else:
+        sectors = np.full(len(order), WD_NA_CODE, dtype='uint8')
+
+    # Run baru di pergantian stasiun atau jika jarak ke baris sebelumnya bukan tepat 1 jam
+    breaks = np.ones(len(order), dtype=bool)
+    breaks[1:] = (station_codes[1:] != station_codes[:-1]) | (np.diff(times) != np.timedelta64(1, 'h'))
+    with np.errstate(invalid='ignore'):
+        above = values > threshold
+    starts, ends = run_bounds(above, breaks)
+    keep = (ends - starts) >= min_hours
+    starts, ends = starts[keep], ends[keep]
+    n_episodes = len(starts)
+    if n_episodes == 0:
+        return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+    # Nomor episode & posisi baris (urutan terurut) untuk setiap jam di dalam episode
+    lengths = ends - starts
+    boundaries = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    ids = np.repeat(np.arange(n_episodes), lengths)
+    rows = starts[ids] + np.arange(lengths.sum()) - boundaries[ids]
+
+    episode_values = values[rows]
+    peak = np.maximum.reduceat(episode_values, boundaries)
+    mean = np.add.reduceat(episode_values, boundaries) / lengths
+    # Posisi puncak pertama setiap episode
+    is_peak = episode_values == peak[ids]
+    _, first_peak = np.unique(ids[is_peak], return_index=True)
+    peak_time = times[rows[is_peak][first_peak]]
+
+    episode_wspm = wspm[rows]
+    wspm_valid = ~np.isnan(episode_wspm)
+    wspm_sum = np.bincount(ids, weights=np.where(wspm_valid, episode_wspm, 0.0), minlength=n_episodes)
+    wspm_n = np.bincount(ids, weights=wspm_valid, minlength=n_episodes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wspm_mean = wspm_sum / wspm_n
+
+    # Arah angin dominan: histogram sektor per episode (sektor NA diabaikan)
+    episode_sectors = sectors[rows].astype('int64')
+    valid_sector = episode_sectors < N_SECTORS
+    counts = np.bincount(
+        ids[valid_sector] * N_SECTORS + episode_sectors[valid_sector], minlength=n_episodes * N_SECTORS
+    ).reshape(n_episodes, N_SECTORS)
+    labels = np.append(np.asarray(CARDINAL16, dtype=object), None)
+    wd_dominant = labels[np.where(counts.sum(axis=1) > 0, counts.argmax(axis=1), N_SECTORS)]
+
+    start_time = pd.DatetimeIndex(times[starts])
+    area = station_frame.groupby(station_frame['station'].astype(str), observed=True)['Area_Type'].first()
+    station_names = np.asarray(stations, dtype=object)[station_codes[starts]]
+    return pd.DataFrame({
+        'station': station_names,
+        'Area_Type': area.reindex(station_names).astype(str).to_numpy(),
+        'start': start_time,
+        'end': times[ends - 1],
+        'hours': lengths,
+        'peak': peak.astype('float32'),
+        'peak_time': peak_time,
+        'mean': mean.astype('float32'),
+        'wd_dominant': wd_dominant,
+        'wspm_mean': wspm_mean.astype('float32'),
+        'year': start_time.year,
+        'Season': SEASON_BY_MONTH[start_time.month],
+    })
+
+
+class EpisodeIndex:
+    """
+    Indeks interval episode: episode diurutkan menurut waktu mulai, dengan maksimum kumulatif
+    waktu selesai, sehingga episode yang beririsan dengan jendela [start, end] dicari dengan searchsorted.
+    """
+
+    def __init__(self, episodes, col='PM2.5', threshold=EPISODE_THRESHOLD, min_hours=EPISODE_MIN_HOURS):
+        self.col = col
+        self.threshold = threshold
+        self.min_hours = min_hours
+        self.episodes = episodes.sort_values(['start', 'station'], kind='stable').reset_index(drop=True)
+        self._starts = self.episodes['start'].to_numpy('datetime64[ns]')
+        self._ends_max = np.maximum.accumulate(self.episodes['end'].to_numpy('datetime64[ns]'))
+        self._ends = self.episodes['end'].to_numpy('datetime64[ns]')
+        self._stations = self.episodes['station'].to_numpy()
+
+    @classmethod
+    def build(cls, station_frame, col='PM2.5', threshold=EPISODE_THRESHOLD, min_hours=EPISODE_MIN_HOURS):
+        return cls(detect_episodes(station_frame, col, threshold, min_hours), col, threshold, min_hours)
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def query(self, start=None, end=None, stations=None):
+        """
+        Episode yang beririsan dengan jendela [start, end] (inklusif; None = tanpa batas)
+        dan berada di salah satu `stations` (None = semua), terurut menurut waktu mulai.
+        """
+        lo, hi = 0, len(self.episodes)
+        if end is not None:
+            # Episode yang mulai setelah jendela berakhir tidak mungkin beririsan
+            hi = np.searchsorted(self._starts, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+        if start is not None:
+            # Sebelum lo, semua episode sudah selesai sebelum jendela dimulai
+            start = np.datetime64(pd.Timestamp(start), 'ns')
+            lo = np.searchsorted(self._ends_max, start, side='left')
+        if lo >= hi:
+            return self.episodes.iloc[0:0]
+
+        mask = np.ones(hi - lo, dtype=bool)
+        if start is not None:
+            mask &= self._ends[lo:hi] >= start
+        if stations is not None:
+            mask &= np.isin(self._stations[lo:hi], list(stations))
+        return self.episodes.iloc[lo + np.flatnonzero(mask)]
+
+
+def summarize_episodes(episodes):
+    """Ringkasan episode: jumlah, total jam, durasi rata-rata & terpanjang, puncak tertinggi."""
+    if episodes.empty:
+        return {'count': 0, 'hours': 0, 'mean_hours': np.nan, 'longest_hours': 0, 'peak': np.nan}
+    return {
+        'count': len(episodes),
+        'hours': int(episodes['hours'].sum()),
+        'mean_hours': float(episodes['hours'].mean()),
+        'longest_hours': int(episodes['hours'].max()),
+        'peak': float(episodes['peak'].max()),
+    }
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Deteksi episode polusi berkelanjutan untuk semua stasiun & tahun.")
+    parser.add_argument('--variable', default='PM2.5')
+    parser.add_argument('--threshold', type=float, default=EPISODE_THRESHOLD)
+    parser.add_argument('--min-hours', type=int, default=EPISODE_MIN_HOURS)
+    args = parser.parse_args()
+
+    from pipeline import load_station_frame
+
+    station_frame = load_station_frame(base_path)
+    if station_frame is None:
+        raise SystemExit("Deteksi episode membutuhkan store Parquet (main_data_store/).")
+
+    started = time.perf_counter()
+    index = EpisodeIndex.build(station_frame, args.variable, args.threshold, args.min_hours)
+    built = time.perf_counter()
+    window = index.query('2016-12-15', '2017-01-15')
+    queried = time.perf_counter()
+
+    print(f"{len(index):,} episode {args.variable} > {args.threshold:g} selama >= {args.min_hours} jam "
+          f"dari {len(station_frame):,} baris dalam {(built - started) * 1000:.1f} ms")
+    print(index.episodes.groupby('year')['hours'].agg(['count', 'sum', 'max']).to_string())
+    print(f"\nQuery 2016-12-15 s.d. 2017-01-15: {len(window)} episode ({(queried - built) * 1000:.2f} ms)")
+    print(window.sort_values('peak', ascending=False).head(10).to_string(index=False))
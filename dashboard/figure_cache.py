@@ -0,0 +1,245 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from single_flight import SingleFlight
+from timing import span
+
+# =========================================================
+#        CACHE GAMBAR (PNG) HASIL RENDER MATPLOTLIB
+# =========================================================
+# Kunci: (nama fungsi plot, tuple filter, versi data). Nilai: byte PNG final.
+# Eviction LRU berdasarkan anggaran memori (MB), dengan opsi spill ke disk.
+# Folder spill juga dibatasi ukurannya (LRU): PNG yang paling lama tidak
+# dipakai dihapus, termasuk PNG versi data lama yang tidak akan diminta lagi.
+# Kunjungan ulang dengan kombinasi filter yang sama tidak menyentuh matplotlib.
+# Aset pra-render (render_batch.py) dapat dipakai sebagai sumber tambahan.
+# Sesi yang meminta grafik yang sedang dirender sesi lain menunggu hasil render
+# tersebut (single_flight.py), bukan merender ulang.
+
+DEFAULT_BUDGET_MB = float(os.environ.get('FIGURE_CACHE_MB', 64))
+DEFAULT_SPILL_DIR = os.environ.get('FIGURE_CACHE_DIR') or None
+DEFAULT_SPILL_MB = float(os.environ.get('FIGURE_CACHE_SPILL_MB', 256))
+
+# Aset pra-render (render_batch.py): folder & manifest
+PRERENDERED_DIRNAME = 'prerendered'
+MANIFEST_NAME = 'manifest.json'
+
+# Sama dengan opsi savefig yang digunakan st.pyplot
+SAVEFIG_OPTIONS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+
+
+def render_png(fig):
+    """Merasterisasi figure menjadi byte PNG lalu menutup figure (mencegah kebocoran)."""
+    import matplotlib.pyplot as plt  # Ditunda: matplotlib hanya dimuat saat figure pertama dirender
+
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, **SAVEFIG_OPTIONS)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureCache:
+    """Cache LRU thread-safe untuk byte PNG, dibatasi anggaran memori (dan anggaran disk untuk spill)."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, spill_dir=DEFAULT_SPILL_DIR, prerendered=None,
+                 spill_mb=DEFAULT_SPILL_MB):
+        self.budget_bytes = int(budget_mb * 1024 ** 2)
+        self.spill_dir = spill_dir
+        self.spill_budget_bytes = int(spill_mb * 1024 ** 2)
+        # {kunci: path PNG} hasil render_batch.py, dibaca saat kunci belum ada di memori
+        self.prerendered = prerendered or {}
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        # {path PNG spill: ukuran byte}, urutan LRU (paling lama di depan)
+        self._spilled = OrderedDict()
+        self._spill_nbytes = 0
+        self._lock = threading.Lock()
+        self.flight = SingleFlight('figure_cache')
+        self.hits = 0
+        self.misses = 0
+
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            # PNG dari proses sebelumnya ikut dihitung (urut mtime) lalu dipangkas ke anggaran
+            with os.scandir(self.spill_dir) as entries:
+                files = sorted(
+                    (entry.stat().st_mtime, entry.path, entry.stat().st_size)
+                    for entry in entries if entry.name.endswith('.png')
+                )
+            for _, path, nbytes in files:
+                self._spilled[path] = nbytes
+                self._spill_nbytes += nbytes
+            self._remove_files(self._trim_spill())
+
+    def _spill_path(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.spill_dir, f'{digest}.png')
+
+    def _trim_spill(self):
+        """Mengeluarkan PNG spill paling lama dari indeks hingga sesuai anggaran (panggil di bawah lock)."""
+        removed = []
+        while self._spill_nbytes > self.spill_budget_bytes and self._spilled:
+            path, nbytes = self._spilled.popitem(last=False)
+            self._spill_nbytes -= nbytes
+            removed.append(path)
+        return removed
+
+    @staticmethod
+    def _remove_files(paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _take_spilled(self, key):
+        """Membaca PNG spill untuk `key` dan menghapusnya dari disk (kembali ke memori), None jika tidak ada."""
+        path = self._spill_path(key)
+        with self._lock:
+            nbytes = self._spilled.pop(path, None)
+            if nbytes is None:
+                return None
+            self._spill_nbytes -= nbytes
+        try:
+            with open(path, 'rb') as f:
+                png = f.read()
+        except FileNotFoundError:
+            return None
+        self._remove_files([path])
+        return png
+
+    def _spill(self, evicted):
+        """Menulis entri yang dikeluarkan dari memori ke disk, lalu memangkas folder spill (LRU)."""
+        for key, png in evicted:
+            path = self._spill_path(key)
+            with open(path, 'wb') as f:
+                f.write(png)
+            with self._lock:
+                self._spill_nbytes += len(png) - self._spilled.pop(path, 0)
+                self._spilled[path] = len(png)
+                removed = self._trim_spill()
+            self._remove_files(removed)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        png = self._take_spilled(key) if self.spill_dir else None
+        if png is None and key in self.prerendered and os.path.exists(self.prerendered[key]):
+            with open(self.prerendered[key], 'rb') as f:
+                png = f.read()
+
+        if png is not None:
+            self.put(key, png)
+            with self._lock:
+                self.hits += 1
+            return png
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, png):
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= len(self._entries.pop(key))
+            self._entries[key] = png
+            self._nbytes += len(png)
+
+            while self._nbytes > self.budget_bytes and len(self._entries) > 1:
+                old_key, old_png = self._entries.popitem(last=False)
+                self._nbytes -= len(old_png)
+                evicted.append((old_key, old_png))
+
+        if self.spill_dir:
+            self._spill(evicted)
+
+    def get_or_render(self, key, render):
+        """
+        Mengembalikan (png, error_msg) untuk `key`.
+        `render` dipanggil hanya saat cache miss dan boleh mengembalikan
+        figure atau tuple (figure, error_msg) seperti fungsi plot PB.
+        Pemanggil serentak dengan `key` yang sama menunggu satu render (single-flight).
+        """
+        plot_name = key[0] if isinstance(key, tuple) and key else key
+        png = self.get(key)
+        if png is not None:
+            with span('figure_cache_hit', plot=plot_name):
+                return png, None
+        return self.flight.do(key, lambda: self.render_now(key, render))
+
+    def peek(self, key):
+        """PNG di memori untuk `key` (tanpa disk & tanpa mengubah statistik), None jika tidak ada."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def render_now(self, key, render):
+        """
+        Merender `key` lalu menyimpannya, tanpa single-flight: untuk pemimpin yang sudah memegang call
+        (lihat get_or_render & RenderExecutor). Mengembalikan (png, error_msg).
+        """
+        plot_name = key[0] if isinstance(key, tuple) and key else key
+        # Sesi lain mungkin baru saja selesai merender grafik ini
+        png = self.peek(key)
+        if png is not None:
+            return png, None
+
+        with span('plot', plot=plot_name):
+            result = render()
+        fig, error_msg = result if isinstance(result, tuple) else (result, None)
+        if fig is None:
+            return None, error_msg
+
+        with span('rasterize', plot=plot_name) as s:
+            png = render_png(fig)
+            s.set(png_kb=round(len(png) / 1024, 1))
+        self.put(key, png)
+        return png, None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'MB': round(self._nbytes / 1024 ** 2, 2),
+                'hits': self.hits,
+                'misses': self.misses,
+                'prerendered': len(self.prerendered),
+                'spilled': len(self._spilled),
+                'spill_MB': round(self._spill_nbytes / 1024 ** 2, 2),
+                **self.flight.stats(),
+            }
+
+
+def _as_key(value):
+    """Mengembalikan list JSON menjadi tuple kunci (list bersarang -> tuple)."""
+    return tuple(_as_key(v) if isinstance(v, list) else v for v in value)
+
+
+def load_prerendered(output_dir, data_version, fmt='png'):
+    """
+    Memetakan kunci FigureCache (termasuk versi data) ke path file pra-render.
+    Kosong jika manifest tidak ada atau dibuat dari versi data yang berbeda.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('data_version') != data_version:
+        return {}
+
+    return {
+        _as_key(entry['key']) + (data_version,): os.path.join(output_dir, entry['files'][fmt])
+        for entry in manifest['charts']
+        if fmt in entry['files']
+    }
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#       INDEKS POSISI BARIS (INVERTED INDEX) UNTUK FILTER
+# =========================================================
+# Untuk setiap nilai Area_Type, Season, year, station, Pre_CAAP, dan
+# Is_Stagnant disimpan array posisi baris (terurut). Kombinasi filter
+# dihitung dengan irisan array posisi, lalu subset diambil dengan satu
+# take -- tanpa perbandingan boolean atas seluruh baris per klik.
+# Posisi disimpan sebagai int32 (cukup untuk < 2^31 baris). Kolom boolean
+# (Pre_CAAP, Is_Stagnant) disimpan sebagai bitmask terpaket (1 bit per baris)
+# karena setiap barisnya masuk ke salah satu nilai: array posisinya akan
+# sebesar seluruh data.
+
+INDEX_COLUMNS = ['Area_Type', 'Season', 'year', 'station', 'Pre_CAAP', 'Is_Stagnant']
+
+
+class PackedMask:
+    """Himpunan baris sebagai bitmask terpaket (np.packbits) untuk nilai kolom boolean."""
+
+    def __init__(self, bits, n_rows):
+        self.bits = bits
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_mask(cls, mask):
+        return cls(np.packbits(mask), len(mask))
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def union(self, other):
+        return PackedMask(self.bits | other.bits, self.n_rows)
+
+    def positions(self):
+        """Posisi baris (terurut) di dalam himpunan."""
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.n_rows)).astype(position_dtype(self.n_rows))
+
+    def contains(self, positions):
+        """Mask boolean: apakah setiap posisi ada di dalam himpunan."""
+        return ((self.bits[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+
+def position_dtype(n_rows):
+    """Dtype array posisi terkecil untuk `n_rows` baris."""
+    return np.int32 if n_rows < 2 ** 31 else np.int64
+
+
+def build_filter_index(df, columns=INDEX_COLUMNS, compact=True):
+    """
+    Membangun indeks {kolom: {nilai: array posisi baris}} untuk kolom yang tersedia.
+    Nilai disimpan sesuai urutan kemunculan pertama di data. compact=False: posisi int64 dan tanpa
+    bitmask (representasi lama, untuk perbandingan memori).
+    """
+    index = {}
+    dtype = position_dtype(len(df)) if compact else np.int64
+    for col in columns:
+        if col not in df.columns:
+            continue
+
+        if compact and df[col].dtype == bool:
+            mask = df[col].to_numpy()
+            values = pd.unique(mask).tolist()
+            index[col] = {value: PackedMask.from_mask(mask == value) for value in values}
+            continue
+
+        codes, uniques = pd.factorize(df[col], sort=False)
+        order = np.argsort(codes, kind='stable').astype(dtype)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        # Baris dengan nilai NA (code -1) berada di awal `order`, lewati
+        offset = int((codes < 0).sum())
+
+        index[col] = {
+            value: order[offset + starts[i]: offset + starts[i + 1]]
+            for i, value in enumerate(uniques.tolist())
+        }
+    return index
+
+
+def index_values(index, col):
+    """Daftar nilai unik kolom (urutan kemunculan) dari indeks."""
+    return list(index[col].keys())
+
+
+def _intersect_sorted(a, b):
+    """Irisan dua array posisi terurut (mencari elemen array kecil di array besar)."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return a
+    pos = np.searchsorted(b, a)
+    pos[pos == len(b)] = 0
+    return a[b[pos] == a]
+
+
+def select_positions(index, filters):
+    """
+    Posisi baris yang lolos semua filter {kolom: nilai atau list nilai}.
+    Nilai None atau 'Overall' diabaikan. Mengembalikan None jika tidak ada filter aktif.
+    """
+    selections = []
+    masks = []
+    for col, val in filters.items():
+        if val is None or (isinstance(val, str) and val == 'Overall'):
+            continue
+        col_index = index[col]
+        values = val if isinstance(val, (list, tuple, set)) else [val]
+        parts = [col_index[v] for v in values if v in col_index]
+        if not parts:
+            return np.array([], dtype=np.intp)
+        if isinstance(parts[0], PackedMask):
+            mask = parts[0]
+            for other in parts[1:]:
+                mask = mask.union(other)
+            masks.append(mask)
+        else:
+            selections.append(parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts)))
+
+    if not selections and not masks:
+        return None
+
+    if selections:
+        # Mulai dari himpunan terkecil agar irisan secepat mungkin
+        selections.sort(key=len)
+        positions = selections[0]
+        for other in selections[1:]:
+            positions = _intersect_sorted(positions, other)
+    else:
+        positions = masks.pop().positions()
+
+    # Bitmask cukup diuji pada posisi yang tersisa (tanpa irisan array)
+    for mask in masks:
+        positions = positions[mask.contains(positions)]
+    return positions
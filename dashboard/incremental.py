@@ -0,0 +1,252 @@
+import argparse
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_store import STORE_DIRNAME, read_store, store_version, write_partitions
+from ingest import NON_NUMERIC_COLS, STATION_MAPPING, add_features, interpolate_linear, parse_prsa
+
+# =========================================================
+#     INGEST INKREMENTAL: TAMBAH OBSERVASI PER JAM TANPA REBUILD
+# =========================================================
+# Stasiun melapor setiap jam. append_observations menerima baris baru skema PRSA
+# untuk satu atau beberapa stasiun dan hanya menyentuh ekor data stasiun itu:
+# - Interpolasi linier hanya pada jendela ekor (TAIL_HOURS jam terakhir + jam di
+#   ujung yang sebelumnya hanya diisi nilai terdekat, dicatat di TAIL_STATE_NAME)
+#   ditambah baris baru. Hasilnya sama dengan interpolasi ulang seluruh riwayat.
+# - Hanya partisi station/year yang berubah yang ditulis ulang (versi store ikut
+#   berubah karena dihitung dari isi partisi) dan perubahan dicatat di jurnal (JOURNAL_NAME).
+# Dashboard yang sedang berjalan membaca jurnal saat versi store berubah dan
+# memperbarui agregasi aditif (cube, histogram, sketch) dengan delta baris yang
+# berubah (lihat pipeline.refresh_metrics) -- tanpa cold reload.
+
+TAIL_HOURS = 48
+# Berkas pendamping di folder store (prefiks '_' diabaikan pembaca dataset Parquet)
+JOURNAL_NAME = '_appends.jsonl'
+TAIL_STATE_NAME = '_tail_state.json'
+
+_append_lock = threading.Lock()
+
+
+def _read_json(path, default):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _station_years(store_path, station):
+    """Tahun partisi yang tersedia untuk stasiun (kosong jika stasiun belum ada di store)."""
+    station_dir = os.path.join(store_path, f'station={station}')
+    if not os.path.isdir(station_dir):
+        return []
+    return sorted(int(name.split('=', 1)[1]) for name in os.listdir(station_dir) if name.startswith('year='))
+
+
+def _trailing_nan_counts(values, cols):
+    """Jumlah NaN berurutan di ujung setiap kolom (jam yang hanya diisi nilai terdekat)."""
+    isnan = np.isnan(values)
+    trailing = np.argmin(isnan[::-1], axis=0)
+    trailing[isnan.all(axis=0)] = len(values)
+    return {col: int(n) for col, n in zip(cols, trailing) if n > 0}
+
+
+def append_station(store_path, station, new_rows, pending=None, station_mapping=None):
+    """
+    Menambahkan baris baru (hasil parse_prsa, satu stasiun) ke store. Baris pada/sebelum jam terakhir yang
+    tersimpan diabaikan; jam yang hilang di antara keduanya diisi baris kosong lalu diinterpolasi.
+    pending: {kolom: jumlah jam ujung yang hanya diisi nilai terdekat} dari append sebelumnya.
+    Mengembalikan (waktu baris pertama yang berubah atau None, jumlah baris baru, pending baru).
+    """
+    pending = dict(pending or {})
+    station_mapping = station_mapping or STATION_MAPPING
+    cols = list(new_rows.columns.drop(NON_NUMERIC_COLS, errors='ignore'))
+    years = _station_years(store_path, station)
+
+    if years:
+        # Jendela ekor: TAIL_HOURS jam + jam pending (jangkar = observasi valid terakhir setiap kolom)
+        window_hours = TAIL_HOURS + max(pending.values(), default=0)
+        stored = read_store(store_path, stations=[station], years=years[-1:])
+        window_start = stored.index.max() - pd.Timedelta(hours=window_hours)
+        if window_start.year < years[-1]:
+            stored = read_store(store_path, stations=[station], years=[y for y in years if y >= window_start.year])
+        last_time = stored.index.max()
+        new_rows = new_rows[new_rows.index > last_time]
+        if new_rows.empty:
+            return None, 0, pending
+        grid = pd.date_range(last_time + pd.Timedelta(hours=1), new_rows.index.max(), freq='h')
+        tail = stored[stored.index > window_start]
+    else:
+        stored = tail = None
+        grid = pd.date_range(new_rows.index.min(), new_rows.index.max(), freq='h')
+
+    new_rows = new_rows.reindex(grid)
+    new_rows['station'] = station
+
+    # Interpolasi hanya pada jendela ekor + baris baru
+    raw_tail = tail[cols].to_numpy('float64') if tail is not None else np.empty((0, len(cols)))
+    for j, col in enumerate(cols):
+        if pending.get(col):
+            raw_tail[-pending[col]:, j] = np.nan
+    window = np.vstack([raw_tail, new_rows[cols].to_numpy('float64')])
+    pending = _trailing_nan_counts(window, cols)
+    window = interpolate_linear(window)
+
+    new_rows[cols] = window[len(raw_tail):]
+    new_rows = add_features(new_rows, station_mapping)
+    if tail is None:
+        write_partitions(new_rows, store_path)
+        return new_rows.index.min(), len(new_rows), pending
+
+    # Ekor yang nilainya berubah karena interpolasi ulang ikut ditulis (fitur turunan dihitung ulang)
+    updated_tail = tail.copy()
+    updated_tail[cols] = window[:len(raw_tail)]
+    changed = ~np.isclose(tail[cols].to_numpy('float64'), updated_tail[cols].to_numpy('float64'), equal_nan=True).all(axis=1)
+    updated_tail = add_features(updated_tail, station_mapping)
+
+    affected_years = set(new_rows.index.year) | set(updated_tail.index[changed].year)
+    stored = stored[stored.index.year.isin(affected_years)]
+    stored = pd.concat([stored[~stored.index.isin(updated_tail.index)], updated_tail[updated_tail.index.year.isin(affected_years)], new_rows])
+    write_partitions(stored, store_path)
+
+    first_changed = updated_tail.index[changed].min() if changed.any() else new_rows.index.min()
+    return first_changed, len(new_rows), pending
+
+
+def append_observations(store_path, new_rows, station_mapping=None):
+    """
+    Menambahkan baris skema PRSA (satu atau beberapa stasiun) ke store Parquet tanpa rebuild penuh.
+    Versi store dinaikkan dan perubahan dicatat di jurnal. Mengembalikan entri jurnal (None jika tidak ada baris baru).
+    """
+    if not os.path.isdir(store_path):
+        raise FileNotFoundError(f"Store Parquet tidak ditemukan: {store_path}")
+
+    parsed = parse_prsa(new_rows.copy())
+    with _append_lock:
+        base_version = store_version(store_path)
+        state_path = os.path.join(store_path, TAIL_STATE_NAME)
+        tail_state = _read_json(state_path, {})
+
+        changes, n_rows = {}, 0
+        for station, rows in parsed.groupby('station', sort=True):
+            first_changed, n_new, tail_state[station] = append_station(
+                store_path, station, rows, tail_state.get(station), station_mapping
+            )
+            if first_changed is not None:
+                changes[station] = first_changed.isoformat()
+                n_rows += n_new
+        if not changes:
+            return None
+
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump(tail_state, f, indent=1)
+        # Versi store mengikuti isi partisi yang baru ditulis (jurnal & state tidak ikut dihitung)
+        journal_path = os.path.join(store_path, JOURNAL_NAME)
+        entry = {
+            'base_version': base_version,
+            'version': store_version(store_path),
+            'changes': changes,
+            'rows': n_rows,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+    return entry
+
+
+def read_journal(store_path):
+    """Entri jurnal append (urut waktu)."""
+    try:
+        with open(os.path.join(store_path, JOURNAL_NAME), encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def pending_changes(store_path, version):
+    """
+    Perubahan sejak `version`: {stasiun: Timestamp baris pertama yang berubah} (gabungan semua append
+    setelah versi tersebut). {} jika tidak ada; None jika versi tidak tersambung ke versi store
+    saat ini lewat jurnal (mis. store ditulis ulang penuh) -- pemanggil harus memuat ulang penuh.
+    """
+    current = store_version(store_path)
+    by_base = {entry['base_version']: entry for entry in read_journal(store_path)}
+    changes = {}
+    while version != current:
+        entry = by_base.get(version)
+        if entry is None:
+            return None
+        for station, since in entry['changes'].items():
+            since = pd.Timestamp(since)
+            changes[station] = min(changes.get(station, since), since)
+        version = entry['version']
+    return changes
+
+
+def read_changed_rows(store_path, changes, columns=None):
+    """Baris store untuk setiap stasiun sejak waktu perubahannya (hanya partisi tahun yang terdampak)."""
+    frames = []
+    for station, since in changes.items():
+        years = [year for year in _station_years(store_path, station) if year >= since.year]
+        rows = read_store(store_path, columns=columns, stations=[station], years=years)
+        frames.append(rows[rows.index >= since])
+    return pd.concat(frames) if frames else None
+
+
+def merge_keyed_counts(parts):
+    """
+    Menggabungkan struktur {'keys': DataFrame grup, 'counts': array atau {kolom: array}} (histogram wind rose,
+    sketch kuantil) dengan tanda: parts = [(struktur, +1/-1), ...]. Grup yang kosong setelah pengurangan dibuang.
+    """
+    parts = [(part, sign) for part, sign in parts if part is not None and len(part['keys'])]
+    keys = pd.concat([part['keys'] for part, _ in parts], ignore_index=True)
+    grouped = keys.groupby(list(keys.columns), observed=True, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    merged_keys = grouped.size().index.to_frame(index=False)
+
+    def combine(arrays):
+        total = np.zeros((len(merged_keys),) + arrays[0].shape[1:], dtype='int64')
+        offset = 0
+        for (part, sign), array in zip(parts, arrays):
+            np.add.at(total, codes[offset:offset + len(array)], sign * array.astype('int64'))
+            offset += len(array)
+        return total
+
+    first = parts[0][0]['counts']
+    if isinstance(first, dict):
+        counts = {col: combine([part['counts'][col] for part, _ in parts]) for col in first}
+        nonempty = np.any([c.reshape(len(merged_keys), -1).any(axis=1) for c in counts.values()], axis=0)
+        counts = {col: c[nonempty] for col, c in counts.items()}
+    else:
+        counts = combine([part['counts'] for part, _ in parts])
+        nonempty = counts.reshape(len(counts), -1).any(axis=1)
+        counts = counts[nonempty]
+
+    def compact(array):
+        return array.astype(np.min_scalar_type(max(int(array.max(initial=0)), 1)))
+
+    counts = {col: compact(c) for col, c in counts.items()} if isinstance(counts, dict) else compact(counts)
+    return {'keys': merged_keys[nonempty].reset_index(drop=True), 'counts': counts}
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Menambahkan observasi baru (CSV skema PRSA) ke store Parquet.")
+    parser.add_argument('csv', nargs='+', help="File CSV skema PRSA (No, year, month, day, hour, ..., station).")
+    parser.add_argument('--store', default=os.path.join(base_path, STORE_DIRNAME))
+    args = parser.parse_args()
+
+    new_rows = pd.concat([pd.read_csv(path) for path in args.csv], ignore_index=True)
+    entry = append_observations(args.store, new_rows)
+    if entry is None:
+        print("Tidak ada baris baru (semua sudah tersimpan).")
+    else:
+        print(f"{entry['rows']} baris baru | versi {entry['base_version']} -> {entry['version']}")
+        for station, since in entry['changes'].items():
+            print(f"  {station}: berubah sejak {since}")
@@ -0,0 +1,150 @@
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from data_store import STAGNANT_WSPM, STORE_DIRNAME, write_store
+from windrose_hist import encode_wd
+
+# =========================================================
+#        PIPELINE INGEST PARALEL PER STASIUN (PRSA)
+# =========================================================
+# Versi reusable dari tahap Data Wrangling di notebook: setiap file
+# PRSA_Data_*.csv diproses (parse, dedupe, datetime, interpolasi linier,
+# feature engineering) di process pool, lalu digabung menjadi satu dataset.
+
+KEY_COLS = ['year', 'month', 'day', 'hour', 'station']
+NON_NUMERIC_COLS = ['station', 'wd']
+
+# Pemetaan stasiun ke Tipe Area (sesuai kesepakatan Urban/Suburban/Rural)
+STATION_MAPPING = {
+    # Rural
+    'Dingling': 'Rural',
+    'Huairou': 'Rural',
+
+    # Suburban
+    'Changping': 'Suburban',
+    'Shunyi': 'Suburban',
+
+    # Urban
+    'Aotizhongxin': 'Urban',
+    'Dongsi': 'Urban',
+    'Gucheng': 'Urban',
+    'Guanyuan': 'Urban',
+    'Nongzhanguan': 'Urban',
+    'Tiantan': 'Urban',
+    'Wanliu': 'Urban',
+    'Wanshouxigong': 'Urban'
+}
+
+# Lookup musim berdasarkan bulan (index 1-12, Hemisphere Utara)
+SEASON_BY_MONTH = np.array([
+    None,
+    'Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+    'Summer', 'Summer', 'Autumn', 'Autumn', 'Autumn', 'Winter',
+], dtype=object)
+
+# CAAP dianggap efektif pasca 1 Oktober 2013
+CAAP_START = pd.Timestamp('2013-10-01 00:00:00')
+
+# Kolom yang disimpan ke main_data.csv (sama dengan output notebook)
+MAIN_DATA_COLS = [
+    'PM2.5', 'NO2', 'SO2', 'O3',
+    'WSPM', 'wd', 'Area_Type', 'Season',
+    'Pre_CAAP', 'year'
+]
+
+
+def interpolate_linear(values):
+    """
+    Interpolasi linier berbasis NumPy untuk array 2D (baris = waktu, kolom = variabel).
+    Setara dengan interpolate(method='linear', limit_direction='both'):
+    NA di tengah diisi linier, NA di awal/akhir diisi nilai valid terdekat.
+    """
+    values = np.array(values, dtype='float64', copy=True)
+    positions = np.arange(values.shape[0])
+
+    for j in range(values.shape[1]):
+        col = values[:, j]
+        valid = ~np.isnan(col)
+        if valid.all() or not valid.any():
+            continue
+        col[~valid] = np.interp(positions[~valid], positions[valid], col[valid])
+
+    return values
+
+
+def add_features(df, station_mapping=None):
+    """
+    Menambahkan kolom Area_Type, Season, Pre_CAAP, Is_Stagnant, year, dan wd_sector (index datetime).
+    station_mapping: pemetaan stasiun -> Tipe Area (default STATION_MAPPING).
+    """
+    df['Area_Type'] = df['station'].map(station_mapping or STATION_MAPPING)
+    df['Season'] = SEASON_BY_MONTH[df.index.month]
+    df['Pre_CAAP'] = df.index < CAAP_START
+    df['Is_Stagnant'] = df['WSPM'] < STAGNANT_WSPM
+    df['year'] = df.index.year
+    df['wd_sector'] = encode_wd(df['wd'])
+    return df
+
+
+def parse_prsa(df):
+    """Baris skema PRSA (No, year, month, day, hour, ..., station) -> DataFrame unik per jam, index datetime terurut."""
+    df = df.drop(columns=['No'], errors='ignore')
+    df = df.drop_duplicates(subset=KEY_COLS, keep='first')
+
+    df['datetime'] = pd.to_datetime(df[['year', 'month', 'day', 'hour']])
+    df = df.drop(columns=['year', 'month', 'day', 'hour'])
+    return df.sort_values('datetime', kind='stable').set_index('datetime')
+
+
+def prepare_station(file_path, station_mapping=None):
+    """Memproses satu file PRSA_Data_*.csv menjadi DataFrame siap analisis (index datetime)."""
+    df = parse_prsa(pd.read_csv(file_path))
+
+    cols_to_interpolate = df.columns.drop(NON_NUMERIC_COLS)
+    df[cols_to_interpolate] = interpolate_linear(df[cols_to_interpolate].to_numpy(dtype='float64'))
+
+    return add_features(df, station_mapping)
+
+
+def build_dataset(data_dir, max_workers=None, station_mapping=None):
+    """Memproses semua file stasiun secara paralel dan menggabungkannya (urut per stasiun)."""
+    all_files = sorted(glob.glob(os.path.join(data_dir, "PRSA_Data_*.csv")))
+    if not all_files:
+        raise FileNotFoundError(f"Tidak ada file PRSA_Data_*.csv di folder: {data_dir}")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        df_list = list(executor.map(partial(prepare_station, station_mapping=station_mapping), all_files))
+
+    df_full = pd.concat(df_list)
+    # Urutan sama dengan notebook: berdasarkan stasiun, lalu datetime
+    df_full = df_full.sort_values('station', kind='stable')
+    return df_full
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Ingest paralel data PRSA untuk dashboard.")
+    parser.add_argument('--data-dir', default=os.path.join(base_path, '..', 'data'))
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: semua core).")
+    parser.add_argument('--csv', action='store_true', help="Juga menulis main_data.csv.")
+    args = parser.parse_args()
+
+    df_full = build_dataset(args.data_dir, max_workers=args.workers)
+    print(f"Total baris data: {len(df_full)} dari {df_full['station'].nunique()} stasiun.")
+
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+    write_store(df_full, store_path)
+    print(f"Store Parquet berhasil disimpan di: {store_path}")
+
+    if args.csv:
+        df_full[MAIN_DATA_COLS].to_csv(
+            os.path.join(base_path, 'main_data.csv'), index=True, index_label='datetime'
+        )
+        print("main_data.csv berhasil disimpan.")
@@ -0,0 +1,156 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_csv_frame
+from filter_index import PackedMask, build_filter_index
+from ingest import STAGNANT_WSPM
+from pipeline import DASHBOARD_COLUMNS, POLLUTANTS_CAAP, build_metrics, complete_features, stagnation_sweep_scope
+from quantile_sketch import box_stats, merge_sketches
+from query_backend import CubeBackend, pb_results
+from windrose_hist import PM25_CONDITIONS, encode_wd, windrose_table
+
+# =========================================================
+#     FOOTPRINT MEMORI REPRESENTASI RINGKAS & CEK AKURASI
+# =========================================================
+# Membandingkan representasi lama dataset dashboard (read_csv tanpa dtype:
+# float64, string object, int64; indeks filter berisi posisi int64) dengan
+# representasi ringkas (skema data_store.COLUMN_DTYPES: float32, kategori,
+# int kecil; indeks filter int32 + bitmask terpaket untuk flag boolean).
+# Laporan footprint dihitung per komponen dict metrik, lalu hasil PB 1-4 dari
+# kedua representasi dibandingkan: selisih relatif harus di bawah RTOL.
+
+# Toleransi relatif (terhadap nilai absolut maksimum setiap hasil); float32 ~ 7 digit
+RTOL = 1e-4
+
+# Komponen dict metrik yang dilaporkan (selain frame)
+AGGREGATE_COMPONENTS = {
+    'filter_index': 'Indeks filter',
+    'cube': 'Cube statistik',
+    'windrose_hist': 'Histogram wind rose',
+    'quantile_sketches': 'Sketch kuantil',
+}
+
+
+def read_csv_legacy(csv_path):
+    """main_data.csv dengan dtype hasil inferensi read_csv (float64, object, int64): representasi lama."""
+    df = pd.read_csv(csv_path, parse_dates=['datetime']).set_index('datetime')
+    df['Is_Stagnant'] = df['WSPM'] < STAGNANT_WSPM
+    df['wd_sector'] = encode_wd(df['wd'])
+    return df
+
+
+def read_csv_compact(csv_path):
+    """main_data.csv dalam representasi ringkas (sama dengan pipeline.load_dataset)."""
+    return complete_features(read_csv_frame(csv_path, DASHBOARD_COLUMNS))
+
+
+def nbytes_deep(obj):
+    """Ukuran (byte) data array di dalam struktur metrik (DataFrame, array, bitmask, dict/list bersarang)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, (np.ndarray, PackedMask)):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(nbytes_deep(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes_deep(value) for value in obj)
+    return 0
+
+
+def footprint(metrics):
+    """Memori (MB) per kolom frame dan per komponen agregat dari dict metrik."""
+    frame = metrics['dataset'].frame
+    usage = frame.memory_usage(deep=True)
+    sizes = {f'Frame: {"index datetime" if name == "Index" else name}': size for name, size in usage.items()}
+    for name, label in AGGREGATE_COMPONENTS.items():
+        sizes[label] = nbytes_deep(metrics[name])
+    return pd.Series(sizes, dtype='float64') / 1024 ** 2
+
+
+def footprint_report(legacy, compact):
+    """Tabel footprint representasi lama vs. ringkas (MB) beserta total frame dan total keseluruhan."""
+    report = pd.DataFrame({'Lama (MB)': footprint(legacy), 'Ringkas (MB)': footprint(compact)})
+    total_frame = report[report.index.str.startswith('Frame: ')].sum()
+    total = report.sum()
+    report.loc['Total frame'] = total_frame
+    report.loc['Total'] = total
+    report['Rasio'] = report['Lama (MB)'] / report['Ringkas (MB)']
+    return report.round(2)
+
+
+def pb_outputs(metrics):
+    """Hasil PB 1-4 dari satu representasi: metrik cube, kurva sapuan stagnasi, box plot sketch, wind rose."""
+    frame = metrics['dataset'].frame
+    sketches = metrics['quantile_sketches']
+    filters_pb4 = {'Area_Type': 'Overall', 'year': None, 'Season': 'Winter'}
+    outputs = {
+        name: np.asarray(value, dtype='float64')
+        for name, value in pb_results(CubeBackend(metrics['cube']), POLLUTANTS_CAAP).items()
+    }
+
+    sweep = stagnation_sweep_scope(CubeBackend(metrics['cube']), frame, metrics['filter_index'], filters_pb4)
+    outputs['stagnation_sweep'] = sweep[['n_stagnant', 'pm25_stagnant', 'pm25_normal', 'ratio']].to_numpy('float64')
+
+    # Box plot PB 3 (O3 Musim Panas per Tipe Area) & PB 4 (PM2.5 Stagnan vs. Normal)
+    for name, col, filters, by in (
+        ('boxplot_pb3', 'O3', {'Season': 'Summer'}, 'Area_Type'),
+        ('boxplot_pb4', 'PM2.5', filters_pb4, 'Is_Stagnant'),
+    ):
+        merged = merge_sketches(sketches, col, filters, by=by)
+        outputs[name] = np.array([
+            [stats[key] for key in ('q1', 'med', 'q3', 'whislo', 'whishi')]
+            for stats in (box_stats(merged[value], str(value)) for value in sorted(merged))
+        ])
+
+    # Wind rose PB 4: distribusi frekuensi (persen) per kondisi PM2.5
+    for condition, (lower, upper) in PM25_CONDITIONS.items():
+        table = windrose_table(metrics['windrose_hist'], filters_pb4, lower, upper)
+        outputs[f'windrose_{condition.lower()}'] = table / max(table.sum(), 1) * 100
+    return outputs
+
+
+def build_representations(csv_path):
+    """Dict metrik dari main_data.csv dalam representasi lama (indeks filter int64) dan ringkas: (legacy, compact)."""
+    legacy = build_metrics(read_csv_legacy(csv_path))
+    legacy['filter_index'] = build_filter_index(legacy['dataset'].frame, compact=False)
+    compact = build_metrics(read_csv_compact(csv_path))
+    return legacy, compact
+
+
+def accuracy_report(legacy, compact, rtol=RTOL):
+    """Selisih maksimum (absolut & relatif terhadap skala hasil) setiap hasil PB 1-4 antar representasi."""
+    legacy_outputs, compact_outputs = pb_outputs(legacy), pb_outputs(compact)
+    rows = {}
+    for name, expected in legacy_outputs.items():
+        actual = compact_outputs[name]
+        if expected.shape != actual.shape or not np.array_equal(np.isnan(expected), np.isnan(actual)):
+            rows[name] = (np.inf, np.inf, False)
+            continue
+        diff = np.nanmax(np.abs(actual - expected), initial=0.0)
+        scale = np.nanmax(np.abs(expected), initial=0.0) or 1.0
+        rows[name] = (diff, diff / scale, diff / scale <= rtol)
+    return pd.DataFrame.from_dict(rows, orient='index', columns=['selisih_maks', 'selisih_relatif', 'lolos'])
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Footprint memori representasi ringkas & cek akurasi PB 1-4.")
+    parser.add_argument('--csv', default=os.path.join(base_path, 'main_data.csv'))
+    parser.add_argument('--rtol', type=float, default=RTOL)
+    args = parser.parse_args()
+
+    legacy, compact = build_representations(args.csv)
+
+    print(footprint_report(legacy, compact).to_string())
+    print()
+    accuracy = accuracy_report(legacy, compact, args.rtol)
+    print(accuracy.to_string(float_format=lambda value: f'{value:.3e}'))
+    if not accuracy['lolos'].all():
+        raise SystemExit(f"Hasil PB 1-4 berbeda melebihi toleransi relatif {args.rtol:g}.")
+    print(f"\nSemua hasil PB 1-4 sama dalam toleransi relatif {args.rtol:g}.")
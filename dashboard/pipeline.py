@@ -0,0 +1,450 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+from bootstrap_ci import bootstrap_caap_change, build_caap_blocks
+from chunked_cube import build_cube_chunked, chunk_rows_for, iter_frame_chunks
+from compute_graph import ComputeGraph
+from data_store import STORE_DIRNAME, apply_schema, csv_version, read_csv_frame, read_store, store_version
+from filter_index import build_filter_index, select_positions
+from incremental import merge_keyed_counts, pending_changes, read_changed_rows
+from ingest import STAGNANT_WSPM
+from quantile_sketch import build_sketches
+from query_backend import CubeBackend, open_sql_backend
+from rolling_corr import ROLLING_COLS, rolling_correlation, summarize_rolling
+from shared_data import SharedDataset
+from stagnation_sweep import stagnation_sweep, stagnation_sweep_totals, threshold_grid
+from timing import span
+from warm_start import ENABLED as SNAPSHOT_ENABLED, SNAPSHOT_DIRNAME, load_snapshot, save_snapshot
+from windrose_hist import build_windrose_hist, encode_wd
+from stats_cube import build_cube, drop_empty_cells, merge_cubes, negate_cube
+
+# =========================================================
+#        PIPELINE DATA DASHBOARD (TANPA STREAMLIT)
+# =========================================================
+# Membaca data, feature engineering, agregasi statis (cube, indeks filter,
+# histogram wind rose, sketch kuantil), dan graf komputasi tabel turunan PB 1-4.
+# dashboard.py membungkus fungsi-fungsi ini dengan st.cache_resource; benchmark
+# dan skrip lain dapat memanggilnya langsung. Dengan DASHBOARD_BACKEND=duckdb
+# (lihat query_backend.py) data per baris, cube, dan indeks filter tidak dimuat:
+# agregasi dihitung oleh DuckDB.
+
+# Kolom yang dibaca dari store Parquet (proyeksi kolom)
+DASHBOARD_COLUMNS = [
+    'PM2.5', 'NO2', 'SO2', 'O3', 'WSPM', 'wd',
+    'Area_Type', 'Season', 'Pre_CAAP', 'Is_Stagnant', 'year', 'wd_sector',
+    # Stasiun: lokasi baris yang diganti saat data baru ditambahkan (lihat incremental.py)
+    'station',
+]
+
+POLLUTANTS_CAAP = ['PM2.5', 'NO2', 'SO2']
+
+_refresh_lock = threading.Lock()
+
+
+def dataset_version(base_path):
+    """Versi data di folder `base_path` tanpa membaca datanya (store Parquet jika ada, jika tidak main_data.csv)."""
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+    if os.path.isdir(store_path):
+        return store_version(store_path)
+    return csv_version(os.path.join(base_path, 'main_data.csv'))
+
+
+def load_dataset(base_path):
+    """
+    Membaca dataset dashboard dari folder `base_path` (store Parquet jika ada, jika tidak main_data.csv)
+    dan melengkapi kolom turunan. Mengembalikan (df_full dengan index datetime, data_version).
+    """
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+    file_path = os.path.join(base_path, 'main_data.csv')
+
+    with span('read_data') as s:
+        data_version = dataset_version(base_path)
+        if os.path.isdir(store_path):
+            # Store Parquet (lihat data_store.py): hanya kolom yang dibutuhkan dashboard
+            df_full = read_store(store_path, columns=DASHBOARD_COLUMNS).reset_index()
+        else:
+            # Dibaca langsung ke dtype skema ringkas (lihat data_store.COLUMN_DTYPES)
+            df_full = read_csv_frame(file_path, DASHBOARD_COLUMNS).reset_index()
+        s.set(source=data_version.split(':')[0], rows=len(df_full))
+
+    # --- Parsing kolom datetime ---
+    if 'datetime' in df_full.columns:
+        df_full['datetime'] = pd.to_datetime(df_full['datetime'], errors='coerce')
+        df_full.set_index('datetime', inplace=True)
+    else:
+        try:
+            df_full.index = pd.to_datetime(df_full.index, errors='coerce')
+        except Exception as e:
+            raise ValueError(f"Gagal mengubah index menjadi datetime: {e}")
+
+    if not isinstance(df_full.index, pd.DatetimeIndex):
+        raise TypeError("Index df_full bukan DatetimeIndex setelah parsing.")
+
+    return complete_features(df_full), data_version
+
+
+def complete_features(df_full):
+    """Feature engineering kritis: kolom turunan yang belum ada dan dtype skema ringkas (data baca penuh maupun inkremental)."""
+    if 'year' not in df_full.columns:
+        df_full['year'] = df_full.index.year
+    if 'Is_Stagnant' not in df_full.columns:
+        df_full['Is_Stagnant'] = (df_full['WSPM'] < STAGNANT_WSPM) # Stagnasi untuk PB 4
+    if 'wd_sector' not in df_full.columns:
+        df_full['wd_sector'] = encode_wd(df_full['wd']) # Kode sektor arah angin (uint8) untuk PB 4
+    return apply_schema(df_full)
+
+
+def load_station_frame(base_path):
+    """
+    Data per jam per stasiun (stasiun, Tipe Area, sektor arah angin, kolom ROLLING_COLS) untuk korelasi bergulir PB 3,
+    eksplorasi deret waktu, peta polusi, dan episode PB 4. Hanya tersedia dari store Parquet (main_data.csv tidak memiliki
+    kolom stasiun); None jika tidak ada.
+    """
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+    if not os.path.isdir(store_path):
+        return None
+
+    with span('read_station_frame') as s:
+        df = read_store(store_path, columns=['station', 'Area_Type', 'wd_sector'] + ROLLING_COLS)
+        s.set(rows=len(df))
+    if 'station' not in df.columns:
+        return None
+    return df
+
+
+def summarize_rolling_scope(r, frame, area, station):
+    """Ringkasan harian r bergulir: satu stasiun, atau median & IQR antar stasiun di Tipe Area terpilih."""
+    if station is not None and station != 'Overall':
+        return summarize_rolling(r[(frame['station'] == station).to_numpy()])
+    if area is not None and area != 'Overall':
+        mask = (frame['Area_Type'] == area).to_numpy()
+        return summarize_rolling(r[mask], frame['station'].to_numpy()[mask])
+    return summarize_rolling(r, frame['station'].to_numpy())
+
+
+def overall_stagnation(backend):
+    """PB 4: Rata-rata PM2.5 & WSPM per kondisi stagnasi (seluruh data) dan rasio PM2.5 Stagnan/Normal."""
+    stagnation_analysis_overall = backend.stagnation_means()
+    if False in stagnation_analysis_overall.index and stagnation_analysis_overall.loc[False, 'PM2.5'] != 0:
+         ratio_pm25_overall = stagnation_analysis_overall.loc[True, 'PM2.5'] / stagnation_analysis_overall.loc[False, 'PM2.5']
+    else:
+         ratio_pm25_overall = np.nan
+    return stagnation_analysis_overall, ratio_pm25_overall
+
+
+def build_metrics(df_full, data_version=None):
+    """Menghitung semua agregasi statis dashboard dari df_full (dict metrik yang di-cache per proses)."""
+    rows = len(df_full)
+
+    # Cube statistik aditif untuk semua metrik PB 1-4 (lihat stats_cube.py), dibangun per
+    # potongan baris agar memori kerjanya terbatas (lihat chunked_cube.py)
+    with span('build_cube', rows=rows) as s:
+        cube = build_cube_chunked(iter_frame_chunks(df_full, chunk_rows_for()))
+        s.set(cells=len(cube))
+
+    # Indeks posisi baris untuk filter Area_Type/Season/year/station/Pre_CAAP/Is_Stagnant
+    with span('build_filter_index', rows=rows):
+        filter_index = build_filter_index(df_full)
+
+    # Histogram wind rose (grup x bin PM2.5 x sektor x kecepatan) untuk PB 4
+    with span('build_windrose_hist', rows=rows):
+        windrose_hist = build_windrose_hist(df_full)
+
+    # Sketch kuantil PM2.5 & O3 (grup x bucket) untuk box plot PB 3 & PB 4
+    with span('build_sketches', rows=rows):
+        quantile_sketches = build_sketches(df_full)
+
+    # PB 4: Stagnasi Udara (Overall) - HANYA METRIK GLOBAL AWAL
+    stagnation_analysis_overall, ratio_pm25_overall = overall_stagnation(CubeBackend(cube))
+
+    # --- Kompilasi Semua Hasil ---
+    return {
+        'version': data_version,
+        'dataset': SharedDataset(df_full, version=data_version), # Ini adalah df_full_raw (read-only, dibagi antar sesi)
+        'cube': cube,
+        'filter_index': filter_index,
+        'windrose_hist': windrose_hist,
+        'quantile_sketches': quantile_sketches,
+        'pb4_stagnation': stagnation_analysis_overall,
+        'pb4_ratio': ratio_pm25_overall,
+    }
+
+
+def build_sql_metrics(backend, data_version):
+    """
+    Metrik dashboard dari backend SQL (DASHBOARD_BACKEND=duckdb): histogram wind rose, sketch kuantil,
+    dan stagnasi PB 4 dihitung dengan GROUP BY di DuckDB. Data per baris, cube, dan indeks filter
+    tidak dimuat (None); halaman dashboard memakai backend untuk opsi filter dan sapuan stagnasi.
+    """
+    with span('build_sql_metrics'):
+        stagnation_analysis_overall, ratio_pm25_overall = overall_stagnation(backend)
+        return {
+            'version': data_version,
+            'dataset': None,
+            'backend': backend,
+            'cube': None,
+            'filter_index': None,
+            'windrose_hist': backend.windrose_hist(),
+            'quantile_sketches': backend.sketches(),
+            'pb4_stagnation': stagnation_analysis_overall,
+            'pb4_ratio': ratio_pm25_overall,
+        }
+
+
+def load_metrics(base_path):
+    """
+    Metrik dashboard untuk data di `base_path`: dari DuckDB jika DASHBOARD_BACKEND=duckdb dan databasenya
+    dibuat dari versi data yang sama, dari snapshot hangat jika versinya cocok (lihat warm_start.py),
+    jika tidak load_dataset + build_metrics lalu snapshot disimpan.
+    """
+    data_version = dataset_version(base_path)
+    backend = open_sql_backend(base_path, data_version)
+    if backend is not None:
+        return build_sql_metrics(backend, data_version)
+
+    snapshot_dir = os.path.join(base_path, SNAPSHOT_DIRNAME)
+    if SNAPSHOT_ENABLED:
+        with span('load_snapshot') as s:
+            snapshot = load_snapshot(snapshot_dir, data_version)
+            s.set(hit=snapshot is not None)
+        if snapshot is not None:
+            df_full, aggregates = snapshot
+            return {'dataset': SharedDataset(df_full, version=data_version), **aggregates}
+
+    df_full, data_version = load_dataset(base_path)
+    metrics = build_metrics(df_full, data_version)
+    if SNAPSHOT_ENABLED:
+        try:
+            with span('save_snapshot'):
+                save_snapshot(metrics, snapshot_dir)
+        except OSError:
+            # Folder tidak dapat ditulis (mis. deploy read-only): dashboard tetap jalan tanpa snapshot
+            pass
+    return metrics
+
+
+def metrics_frame(metrics):
+    """Data per baris (df_full_raw) dari dict metrik; None jika metrik berasal dari backend SQL."""
+    dataset = metrics['dataset']
+    return None if dataset is None else dataset.frame
+
+
+class MetricsHolder:
+    """
+    Pemegang dict metrik (load_metrics) versi terkini yang dibagi antar sesi. Dict yang sudah dipasang
+    tidak pernah diubah: refresh membangun dict baru lalu menukar referensi `current` dalam satu assignment.
+    Pembaca mengambil `current` sekali per rerun, sehingga dataset, cube, dan indeks selalu dari versi yang sama.
+    """
+
+    def __init__(self, metrics):
+        self.current = metrics
+
+    @property
+    def version(self):
+        return self.current['version']
+
+
+def refresh_metrics(holder, base_path):
+    """
+    Memasang metrik baru di `holder` (MetricsHolder) jika store berubah lewat append inkremental
+    (incremental.py): baris yang berubah dibaca dari store dan agregasi diperbarui dengan delta.
+    Jika perubahan tidak tercatat di jurnal, metrik dimuat ulang penuh. True jika diperbarui.
+    """
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+    if not os.path.isdir(store_path) or holder.version == dataset_version(base_path):
+        return False
+
+    with _refresh_lock:
+        data_version = dataset_version(base_path)
+        metrics = holder.current
+        if metrics['version'] == data_version:
+            return False  # Sudah diperbarui oleh sesi lain
+
+        with span('refresh_metrics') as s:
+            changes = pending_changes(store_path, metrics['version'])
+            df_full = metrics_frame(metrics)
+            # Metrik dari backend SQL: database DuckDB tidak diperbarui inkremental, dimuat ulang penuh
+            if changes is None or df_full is None or 'station' not in df_full.columns:
+                s.set(mode='reload')
+                holder.current = load_metrics(base_path)
+                return True
+
+            added = complete_features(read_changed_rows(store_path, changes, DASHBOARD_COLUMNS))
+            removed = np.zeros(len(df_full), dtype=bool)
+            station = df_full['station'].to_numpy()
+            for name, since in changes.items():
+                removed |= (station == name) & (df_full.index >= since)
+            s.set(mode='delta', stations=len(changes), removed=int(removed.sum()), added=len(added))
+            refreshed = apply_delta(metrics, removed, added, data_version)
+            holder.current = refreshed  # Satu assignment: pembaca melihat versi lama atau baru, tidak campuran
+
+        if SNAPSHOT_ENABLED:
+            try:
+                save_snapshot(refreshed, os.path.join(base_path, SNAPSHOT_DIRNAME))
+            except OSError:
+                pass
+    return True
+
+
+def apply_delta(metrics, removed, added, data_version):
+    """
+    Dict metrik baru (`metrics` tidak diubah) setelah baris df_full bermask `removed` diganti baris `added`: cube,
+    histogram wind rose, dan sketch kuantil diperbarui dengan delta (tambah `added`, kurangi baris lama);
+    indeks filter dibangun ulang.
+    """
+    df_full = metrics['dataset'].frame
+    df_removed = df_full[removed]
+
+    df_new = pd.concat([df_full[~removed], added])
+    for col in df_full.columns:
+        if isinstance(df_full[col].dtype, pd.CategoricalDtype):
+            df_new[col] = df_new[col].astype('category')
+
+    cube = metrics['cube']
+    windrose_hist = metrics['windrose_hist']
+    quantile_sketches = metrics['quantile_sketches']
+    with span('apply_delta', removed=len(df_removed), added=len(added)):
+        for part, sign in ((added, 1), (df_removed, -1)):
+            if len(part) == 0:
+                continue
+            part_cube = build_cube(part)
+            cube = merge_cubes([cube, part_cube if sign > 0 else negate_cube(part_cube)])
+            windrose_hist = merge_keyed_counts([(windrose_hist, 1), (build_windrose_hist(part), sign)])
+            quantile_sketches = merge_keyed_counts([(quantile_sketches, 1), (build_sketches(part), sign)])
+        cube = drop_empty_cells(cube)
+
+    stagnation_analysis_overall, ratio_pm25_overall = overall_stagnation(CubeBackend(cube))
+    return {
+        **metrics,
+        'version': data_version,
+        'dataset': SharedDataset(df_new, version=data_version),
+        'cube': cube,
+        'filter_index': build_filter_index(df_new),
+        'windrose_hist': windrose_hist,
+        'quantile_sketches': quantile_sketches,
+        'pb4_stagnation': stagnation_analysis_overall,
+        'pb4_ratio': ratio_pm25_overall,
+    }
+
+
+# --- PB 4: Perhitungan Dampak Stagnasi ---
+def calculate_pb4_impact(source):
+    """PB 4: Menghitung perbandingan PM2.5 rata-rata saat Stagnan vs. Normal dari backend query terfilter (untuk Metrik)."""
+
+    stagnation_analysis = source.stagnation_means()
+
+    if stagnation_analysis.empty:
+        return None, "Data tidak cukup untuk analisis dampak stagnasi."
+
+    if True not in stagnation_analysis.index or False not in stagnation_analysis.index:
+        return None, "Hanya ada data Stagnan atau data Normal. Perbandingan tidak mungkin."
+
+    pm25_stagnant = stagnation_analysis.loc[True, 'PM2.5']
+    pm25_normal = stagnation_analysis.loc[False, 'PM2.5']
+
+    if pm25_normal == 0:
+        return None, "Rata-rata PM2.5 saat Normal adalah nol, perbandingan rasio tidak valid."
+
+    ratio_pm25 = (pm25_stagnant / pm25_normal)
+
+    return ratio_pm25, None
+
+
+def stagnation_sweep_scope(backend, frame, filter_index, filters):
+    """
+    PB 4: Sapuan ambang stagnasi (grid slider) untuk baris yang lolos filter: satu take lewat filter_index,
+    atau total PM2.5 per nilai WSPM dari backend SQL jika data per baris tidak dimuat (frame None).
+    """
+    if frame is None:
+        totals = backend.scope(filters).wspm_totals()
+        return stagnation_sweep_totals(totals['WSPM'].to_numpy(), totals['n'], totals['sum'], threshold_grid())
+
+    positions = select_positions(filter_index, filters)
+    wspm = frame['WSPM'].to_numpy()
+    pm25 = frame['PM2.5'].to_numpy()
+    if positions is not None:
+        wspm, pm25 = wspm[positions], pm25[positions]
+    return stagnation_sweep(wspm, pm25, threshold_grid())
+
+
+def load_backend(base_path, metrics):
+    """Backend query PB 1-4: DuckDB jika metrik dimuat dari backend SQL, jika tidak cube in-memory (lihat query_backend.py)."""
+    if metrics.get('backend') is not None:
+        return metrics['backend']
+    return CubeBackend(metrics['cube'])
+
+
+def build_compute_graph():
+    """
+    Graf komputasi tabel turunan PB 1-4 (lihat compute_graph.py).
+    Source: backend (query_backend.py), frame & filter_index (data per baris, None untuk backend SQL), area, season_pb1,
+    year_pb3_boxplot, year_pb4, season_pb4, serta station_frame, rolling_x, rolling_y, rolling_window, rolling_station (korelasi bergulir PB 3).
+    """
+    graph = ComputeGraph()
+
+    # Filter Area Global pada backend query
+    graph.add('source_area', lambda backend, area: backend.scope({'Area_Type': area}), ['backend', 'area'])
+
+    # PB 1 & 2: Baseline Pra-CAAP, Rata-rata Pasca-CAAP, dan Perubahan Persentase Tahunan
+    graph.add('caap_evaluation', lambda source: source.caap_evaluation(POLLUTANTS_CAAP), ['source_area'])
+    graph.add('annual_change', lambda evaluation: evaluation[2], ['caap_evaluation'])
+
+    # PB 2: Interval kepercayaan bootstrap blok perubahan persentase (data per jam per stasiun)
+    graph.add('caap_blocks', lambda frame: build_caap_blocks(frame, POLLUTANTS_CAAP), ['station_frame'])
+    graph.add('caap_ci', lambda blocks, area: bootstrap_caap_change(blocks, POLLUTANTS_CAAP, area), ['caap_blocks', 'area'])
+
+    # PB 1: Tren & Rata-rata terfilter musim
+    graph.add(
+        'source_pb1',
+        lambda source, season: source.scope({'Season': season}),
+        ['source_area', 'season_pb1'],
+    )
+    graph.add('annual_means_pb1', lambda source: source.annual_means(POLLUTANTS_CAAP), ['source_pb1'])
+    graph.add('means_pb1', lambda source: source.means(POLLUTANTS_CAAP).iloc[0], ['source_pb1'])
+
+    # PB 3: Korelasi O3 vs NO2 Musim Panas & rata-rata O3 per Tipe Area
+    def o3_no2_corr_summer(source):
+        corr = source.scope({'Season': 'Summer'}).correlation_by('O3', 'NO2', by=['year'])
+        corr.name = 'O3_NO2_Correlation_Summer'
+        return corr
+
+    graph.add('o3_no2_corr_summer', o3_no2_corr_summer, ['source_area'])
+    graph.add(
+        'o3_summer_means',
+        lambda backend, year: backend.scope({'year': year, 'Season': 'Summer'}).means(['O3'], by=['Area_Type'])['O3'],
+        ['backend', 'year_pb3_boxplot'],
+    )
+
+    # PB 3: Korelasi bergulir pasangan variabel apa pun (semua stasiun sekaligus, lihat rolling_corr.py)
+    graph.add(
+        'rolling_corr',
+        lambda frame, x, y, window: rolling_correlation(frame, x, y, window),
+        ['station_frame', 'rolling_x', 'rolling_y', 'rolling_window'],
+    )
+    graph.add(
+        'rolling_summary',
+        summarize_rolling_scope,
+        ['rolling_corr', 'station_frame', 'area', 'rolling_station'],
+    )
+
+    # PB 4: Opsi filter & Dampak Stagnasi
+    graph.add('years_area', lambda source: source.values('year'), ['source_area'])
+    graph.add('seasons_area', lambda source: source.values('Season'), ['source_area'])
+    graph.add(
+        'source_pb4',
+        lambda source, year, season: source.scope({'year': year, 'Season': season}),
+        ['source_area', 'year_pb4', 'season_pb4'],
+    )
+    graph.add('pb4_impact', calculate_pb4_impact, ['source_pb4'])
+
+    # PB 4: Kurva rasio untuk semua ambang WSPM (data per baris diurutkan sekali per filter, atau GROUP BY WSPM di SQL)
+    graph.add(
+        'stagnation_sweep',
+        lambda backend, frame, index, area, year, season: stagnation_sweep_scope(
+            backend, frame, index, {'Area_Type': area, 'year': year, 'Season': season}
+        ),
+        ['backend', 'frame', 'filter_index', 'area', 'year_pb4', 'season_pb4'],
+    )
+    return graph
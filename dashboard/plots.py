@@ -0,0 +1,470 @@
+import numpy as np
+import seaborn as sns
+import matplotlib
+import matplotlib.pyplot as plt
+import matplotlib.cm as cm
+from matplotlib.container import BarContainer
+
+from bootstrap_ci import BLOCK_DAYS, CONFIDENCE
+from quantile_sketch import box_stats, merge_sketches
+from windrose_hist import PM25_CONDITIONS, SPEED_BINS, windrose_table
+
+# =========================================================
+#           FUNGSI VISUALISASI DASHBOARD (PB 1-4)
+# =========================================================
+# Dipisah dari dashboard.py agar plot dapat dibuat tanpa server Streamlit
+# (mis. benchmark.py). Setiap fungsi mengembalikan figure matplotlib.
+
+# =========================================================
+#                   HELPER FUNCTIONS (PB 3 & 4)
+# =========================================================
+
+def windrose_axes(fig, rect=111):
+    """PB 4 Helper: Sumbu polar bergaya wind rose (Utara di atas, searah jarum jam, label 8 arah)."""
+    ax = fig.add_subplot(rect, projection='polar')
+    ax.set_theta_zero_location('N')
+    ax.set_theta_direction(-1)
+    ax.set_xticks(np.radians(np.arange(0, 360, 45)))
+    ax.set_xticklabels(['N', 'N-E', 'E', 'S-E', 'S', 'S-W', 'W', 'N-W'])
+    ax.set_rlabel_position(22.5)
+    return ax
+
+
+def draw_windrose_bars(ax, table, speed_bins, cmap, opening=0.8, edgecolor='white'):
+    """
+    PB 4 Helper: Menggambar bar wind rose bertumpuk dari tabel [bin kecepatan, sektor] yang sudah dihitung
+    pada sumbu windrose_axes (hanya API publik matplotlib). Setara dengan WindroseAxes.bar(normed=True)
+    bila tabel berisi persentase, tanpa membutuhkan data per baris.
+    """
+    nbins, nsector = table.shape
+    colors = [cmap(i) for i in np.linspace(0.0, 1.0, nbins)]
+    angles = np.radians(np.arange(nsector) * (360 / nsector))
+    width = (2 * np.pi / nsector) * opening
+    edges = list(speed_bins) + [np.inf]
+    labels = [
+        f'[{edges[i]:.1f} : {edges[i + 1]:.1f})' if np.isfinite(edges[i + 1]) else f'>{edges[i]:.1f}'
+        for i in range(nbins)
+    ]
+
+    bottoms = np.vstack([np.zeros(nsector), np.cumsum(table, axis=0)[:-1]])
+    for i in range(nbins):
+        ax.bar(
+            angles, table[i], width=width, bottom=bottoms[i], color=colors[i],
+            edgecolor=edgecolor, linewidth=0.5, label=labels[i],
+        )
+
+    # Grid radial: 5 lingkaran sampai panjang bar tertinggi (%), seperti WindroseAxes
+    rmax = table.sum(axis=0).max()
+    if rmax > 0:
+        ticks = np.linspace(0, rmax, 6)[1:]
+        ax.set_rgrids(ticks, labels=[f'{tick:.1f}' for tick in ticks])
+        ax.set_ylim(0, rmax)
+
+
+def draw_sketch_boxes(ax, stats, colors):
+    """
+    PB 3 & 4 Helper: Menggambar box plot dari statistik sketch (lihat quantile_sketch.py)
+    dengan gaya yang menyerupai sns.boxplot.
+    """
+    if not stats:
+        return
+    artists = ax.bxp(
+        stats,
+        positions=range(len(stats)),
+        widths=0.8,
+        patch_artist=True,
+        boxprops={'edgecolor': '0.25', 'linewidth': 1.25},
+        medianprops={'color': '0.25', 'linewidth': 1.25},
+        whiskerprops={'color': '0.25', 'linewidth': 1.25},
+        capprops={'color': '0.25', 'linewidth': 1.25},
+        flierprops={'marker': 'd', 'markerfacecolor': '0.25', 'markeredgecolor': '0.25', 'markersize': 4},
+    )
+    for patch, color in zip(artists['boxes'], colors):
+        patch.set_facecolor(color)
+    ax.set_xlim(-0.5, len(stats) - 0.5)
+
+
+# =========================================================
+#                   VISUALIZATION FUNCTIONS
+# =========================================================
+
+# --- PB 1: Line Plot Gabungan ---
+def plot_pb1_combined_dynamic(df_plot):
+    """PB 1: Membuat Line Plot tren polutan tahunan (PM2.5, NO2, SO2) dari rata-rata tahunan (cube)."""
+    fig, ax = plt.subplots(figsize=(10, 5))
+    df_plot.plot(
+        kind='line',
+        marker='o',
+        linewidth=2,
+        ax=ax,
+        color={'PM2.5': 'tab:red', 'NO2': 'darkorange', 'SO2': 'tab:blue'},
+    )
+
+    ax.set_title('Tren Konsentrasi Polutan Utama Tahunan', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Konsentrasi Polutan (µg/m³)')
+    ax.set_xlabel('Tahun')
+    ax.set_xticks(df_plot.index.astype(int))
+    ax.legend(title='Polutan', frameon=False, loc='upper right')
+    ax.grid(axis='y', linestyle=':', alpha=0.7)
+
+    max_val = df_plot.max().max()
+    # Anotasi Tahun 2017
+    ax.axvline(x=2017, color='gray', linestyle='--', alpha=0.5)
+    ax.text(2017, max_val * 1.05, 'Bias Data 2017', color='gray', fontsize=9, ha='center')
+
+    plt.tight_layout()
+    return fig
+
+# --- PB 2: Bar Chart Persentase Perubahan ---
+def plot_pb2(df_change_filtered, ci=None):
+    """
+    PB 2: Membuat Bar Chart persentase perubahan polutan vs. Baseline Pra-CAAP.
+    ci: interval kepercayaan bootstrap (lihat bootstrap_ci.py) untuk error bar; None = tanpa error bar.
+    """
+    # Mengubah dari wide ke long format untuk plotting Seaborn
+    df_viz = df_change_filtered.reset_index().melt(
+        id_vars='year', var_name='Pollutant', value_name='Percentage_Change'
+    )
+    
+    df_viz = df_viz[df_viz['year'] >= 2014].copy()
+    df_viz['year'] = df_viz['year'].astype(str)
+    
+    n_pollutants = len(df_viz['Pollutant'].unique())
+    if n_pollutants == 0: return None, "Pilih minimal satu polutan untuk divisualisasikan."
+
+    fig, axes = plt.subplots(nrows=1, ncols=n_pollutants, figsize=(5 * n_pollutants, 5), sharey=False)
+    
+    if n_pollutants == 1: axes = [axes]
+    
+    plt.suptitle('Evaluasi Dampak CAAP: Persentase Perubahan Tahunan (vs. Baseline Pra-CAAP)', 
+                 fontsize=14, fontweight='bold')
+    
+    for i, pol in enumerate(df_viz['Pollutant'].unique()):
+        ax = axes[i]
+        df_pol = df_viz[df_viz['Pollutant'] == pol]
+        
+        # Penentuan warna: Hijau (perbaikan/penurunan), Merah (memburuk/kenaikan)
+        colors = ['green' if p < 0 else 'red' for p in df_pol['Percentage_Change']]
+
+        sns.barplot(ax=ax, data=df_pol, x='year', y='Percentage_Change', palette=colors, legend=False)
+
+        # Error bar: interval kepercayaan bootstrap blok per tahun
+        values = lower = upper = df_pol['Percentage_Change'].to_numpy()
+        if ci is not None and pol in ci['lower'].columns:
+            years = df_pol['year'].astype(int)
+            # fmin/fmax: tahun tanpa interval (NaN) tidak mendapat error bar
+            lower = np.fmin(ci['lower'][pol].reindex(years).to_numpy(), values)
+            upper = np.fmax(ci['upper'][pol].reindex(years).to_numpy(), values)
+            ax.errorbar(
+                range(len(df_pol)), values, yerr=[values - lower, upper - values],
+                fmt='none', ecolor='black', elinewidth=1.2, capsize=4,
+            )
+
+        ax.set_title(f'{pol} Change', fontsize=12)
+        ax.set_xlabel('Tahun')
+        ax.set_ylabel('Perubahan (%) vs. Pra-CAAP Baseline')
+        ax.axhline(0, color='black', linestyle='--', linewidth=1.5)
+        ax.grid(axis='y', linestyle=':', alpha=0.6)
+        
+        # Tambahkan data label
+        bars = [bar for container in ax.containers if isinstance(container, BarContainer) for bar in container]
+        for bar, low, high in zip(bars, lower, upper):
+            yval = bar.get_height()
+            padding = 1.5 
+            # Label di luar ujung error bar
+            y_text_pos = max(yval, high) + padding if yval >= 0 else min(yval, low) - padding 
+            va_align = 'bottom' if yval >= 0 else 'top'
+
+            ax.text(
+                bar.get_x() + bar.get_width() / 2, 
+                y_text_pos,
+                f'{yval:+.1f}%', 
+                ha='center', va=va_align, 
+                fontsize=9, fontweight='bold', color='black'
+            )
+        # Ruang untuk label di luar batang/error bar
+        y_min, y_max = ax.get_ylim()
+        ax.set_ylim(y_min - 0.08 * (y_max - y_min), y_max + 0.08 * (y_max - y_min))
+
+    if ci is not None:
+        fig.text(0.5, 0.005, f'Error bar: interval kepercayaan {CONFIDENCE:.0%} bootstrap blok ({BLOCK_DAYS} hari per stasiun)',
+                 ha='center', fontsize=9, color='dimgray')
+    plt.tight_layout(rect=[0, 0.03 if ci is not None else 0, 1, 0.9])
+    return fig, None
+
+# --- PB 3: Line Plot Korelasi ---
+def plot_pb3_correlation_trend(corr_series):
+    """PB 3: Membuat Line Plot tren koefisien korelasi tahunan O3 vs NO2 Musim Panas."""
+    fig, ax = plt.subplots(figsize=(8, 4))
+    
+    corr_series.plot(kind='line', marker='o', ax=ax, linewidth=2, color='darkorange', markersize=8)
+
+    ax.set_title('Tren Koefisien Korelasi O₃ vs. NO₂ Musim Panas (2013–2017)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Tahun')
+    ax.set_ylabel('Koefisien Korelasi Pearson (r)')
+    ax.set_xticks(corr_series.index.astype(int))
+    ax.axhline(0, color='gray', linestyle='--', alpha=0.7)
+    ax.grid(axis='both', linestyle=':', alpha=0.6)
+    
+    # Anotasi hasil Korelasi
+    for year, r_val in corr_series.items():
+        ax.annotate(
+            f'r={r_val:.3f}', 
+            (year, r_val), 
+            textcoords="offset points", 
+            xytext=(0, 10 if r_val < 0 else -15), 
+            ha='center', 
+            fontsize=10, 
+            fontweight='bold', 
+            color='darkorange'
+        )
+
+    plt.tight_layout()
+    return fig
+
+# --- PB 3: Box Plot Ozon per Area Type ---
+def plot_pb3_boxplot(sketches, year=None):
+    """PB 3: Membuat Box Plot distribusi Ozon Musim Panas berdasarkan Tipe Area (dari sketch kuantil)."""
+    # Note: sketch difilter berdasarkan tahun & Musim Panas, tetapi tidak berdasarkan Area Global
+    filters = {'year': year, 'Season': 'Summer'}
+    merged = merge_sketches(sketches, 'O3', filters=filters, by='Area_Type')
+
+    order = [area for area in ['Urban', 'Suburban', 'Rural'] if area in merged]
+    stats = [box_stats(merged[area], area) for area in order]
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    draw_sketch_boxes(ax, stats, sns.color_palette('pastel'))
+
+    # Tambahkan informasi tahun ke judul
+    keys = sketches['keys']
+    years = keys.loc[keys['Season'] == 'Summer', 'year'].unique() if year is None else [year]
+    year_title = f"Tahun: {', '.join(map(str, sorted(years))) if len(years) < 5 else 'Overall'}"
+    
+    ax.set_title(f'Distribusi Ozon Musim Panas Berdasarkan Tipe Area\n({year_title})', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Tipe Area')
+    ax.set_ylabel(r'O₃ Konsentrasi ($\mu g/m^3$)')
+    ax.grid(axis='y', linestyle='--', alpha=0.6)
+    plt.tight_layout()
+    return fig
+
+# --- PB 3: Line Plot Korelasi Bergulir ---
+def plot_pb3_rolling_correlation(summary, x, y, window_label, scope_label):
+    """PB 3: Membuat Line Plot korelasi bergulir x vs y (rata-rata harian; median & IQR antar stasiun)."""
+    if summary.empty or summary.iloc[:, 0].isna().all():
+        return None, "Data tidak cukup untuk korelasi bergulir pada pilihan ini."
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    if 'median' in summary.columns:
+        ax.fill_between(summary.index, summary['q25'], summary['q75'], color='darkorange', alpha=0.25,
+                        linewidth=0, label='IQR antar stasiun')
+        ax.plot(summary.index, summary['median'], color='darkorange', linewidth=1, label='Median antar stasiun')
+        ax.legend(frameon=False, loc='upper right')
+    else:
+        ax.plot(summary.index, summary['r'], color='darkorange', linewidth=1)
+
+    ax.set_title(f'Korelasi Bergulir {x} vs. {y} (Jendela {window_label}) | {scope_label}', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Tanggal')
+    ax.set_ylabel('Koefisien Korelasi Pearson (r)')
+    ax.set_ylim(-1.05, 1.05)
+    ax.axhline(0, color='gray', linestyle='--', alpha=0.7)
+    ax.grid(axis='both', linestyle=':', alpha=0.6)
+    plt.tight_layout()
+    return fig, None
+
+# --- Eksplorasi: Deret Waktu Per Jam ---
+def plot_timeseries_explorer(line, envelope, station, col, level):
+    """Eksplorasi: Line Plot deret waktu satu stasiun (garis rata-rata + pita min/max) dari piramida multi-resolusi."""
+    if line.empty or line.isna().all():
+        return None, "Tidak ada data pada rentang waktu terpilih."
+
+    fig, ax = plt.subplots(figsize=(12, 4))
+    if envelope is not None:
+        ax.fill_between(envelope.index, envelope['min'], envelope['max'], step='post',
+                        color='tab:blue', alpha=0.2, linewidth=0, label='Rentang min-max')
+    ax.plot(line.index, line.to_numpy(), color='tab:blue', linewidth=1,
+            label='Nilai per jam' if envelope is None else 'Rata-rata')
+
+    ax.set_title(f'{col} di Stasiun {station} (Resolusi: {level}, {len(line):,} titik)', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Waktu')
+    ax.set_ylabel(col)
+    ax.legend(frameon=False, loc='upper right')
+    ax.grid(axis='both', linestyle=':', alpha=0.6)
+    fig.autofmt_xdate()
+    plt.tight_layout()
+    return fig, None
+
+# --- Peta Polusi: Medan Interpolasi IDW ---
+def plot_idw_map(field, grid, station_values, col, title, vmin=None, vmax=None):
+    """Peta Polusi: medan IDW satu frame (grid lat/lon) dengan lokasi & nilai setiap stasiun."""
+    if field is None or np.isnan(field).all():
+        return None, "Tidak ada data stasiun pada jendela waktu terpilih."
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+    image = ax.imshow(
+        field, origin='lower', extent=grid.extent, cmap='YlOrRd', vmin=vmin, vmax=vmax,
+        aspect=1 / np.cos(np.radians(grid.lat.mean())), interpolation='bilinear',
+    )
+    if np.nanmax(field) > np.nanmin(field):
+        ax.contour(grid.lon, grid.lat, field, levels=8, colors='black', linewidths=0.5, alpha=0.35)
+
+    # Stasiun tanpa nilai (atau di luar filter area) digambar kosong
+    coords = grid.coords
+    values = station_values.reindex(coords.index)
+    has_value = values.notna().to_numpy()
+    ax.scatter(coords['lon'][has_value], coords['lat'][has_value], marker='^', s=70,
+               c='white', edgecolors='black', linewidths=1.2, zorder=3)
+    ax.scatter(coords['lon'][~has_value], coords['lat'][~has_value], marker='^', s=70,
+               facecolors='none', edgecolors='grey', linewidths=1.0, zorder=3)
+    for station, row in coords.iterrows():
+        label = station if np.isnan(values[station]) else f'{station}\n{values[station]:.1f}'
+        ax.annotate(label, (row['lon'], row['lat']), xytext=(5, 4), textcoords='offset points',
+                    fontsize=8, color='black' if not np.isnan(values[station]) else 'grey')
+
+    fig.colorbar(image, ax=ax, shrink=0.8, label=col)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel('Bujur')
+    ax.set_ylabel('Lintang')
+    plt.tight_layout()
+    return fig, None
+
+# --- PB 4: Box Plot Stagnasi PM2.5 ---
+def plot_pb4_boxplot_stagnation(sketches, filters):
+    """PB 4: Membuat Box Plot perbandingan PM2.5 saat Stagnan vs. Normal (dari sketch kuantil)."""
+
+    merged = merge_sketches(sketches, 'PM2.5', filters=filters, by='Is_Stagnant')
+    merged = {flag: counts for flag, counts in merged.items() if counts.sum() > 0}
+    if not merged:
+        return None, "Data tidak cukup untuk Box Plot."
+
+    order = [False, True]
+    labels = {False: 'Normal', True: 'Stagnant'}
+    palette = {'Stagnant': '#B71C1C', 'Normal': '#1565C0'}
+    stats = [box_stats(merged[flag], labels[flag]) for flag in order if flag in merged]
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    draw_sketch_boxes(ax, stats, [palette[s['label']] for s in stats])
+
+    ax.set_title(
+        r'Distribusi $\text{PM2.5}$ Saat Stagnasi Udara (WSPM < 3.2 m/s)',
+        fontsize=14, fontweight='bold'
+    )
+    ax.set_xlabel('Kondisi Udara', fontsize=12)
+    tick_labels = {'Normal': 'Angin Normal', 'Stagnant': 'Stagnan (WSPM < 3.2 m/s)'}
+    ax.set_xticklabels([tick_labels[s['label']] for s in stats])
+    ax.set_ylabel(r'$\text{PM2.5}$ Konsentrasi ($\mu g/m^3$)')
+    ax.grid(axis='y', linestyle='--', alpha=0.6)
+    plt.tight_layout()
+
+    return fig, None
+
+
+# --- PB 4: Kurva Sensitivitas Ambang Stagnasi ---
+def plot_pb4_threshold_sweep(sweep, threshold, default_threshold):
+    """PB 4: Line Plot rasio PM2.5 Stagnan/Normal dan rata-rata PM2.5 kedua sisi untuk semua ambang WSPM."""
+    if sweep['ratio'].isna().all():
+        return None, "Data tidak cukup untuk kurva ambang stagnasi pada filter ini."
+
+    fig, (ax_ratio, ax_mean) = plt.subplots(2, 1, figsize=(10, 6), sharex=True)
+    thresholds = sweep.index.to_numpy()
+
+    ax_ratio.plot(thresholds, sweep['ratio'], color='firebrick', linewidth=2)
+    ax_ratio.axhline(1, color='gray', linestyle='--', alpha=0.7)
+    ax_ratio.set_ylabel('Rasio PM2.5\nStagnan / Normal')
+    ax_ratio.set_title('Sensitivitas Dampak Stagnasi terhadap Ambang Kecepatan Angin', fontsize=14, fontweight='bold')
+
+    ax_mean.plot(thresholds, sweep['pm25_stagnant'], color='firebrick', linewidth=2, label='Stagnan (WSPM < ambang)')
+    ax_mean.plot(thresholds, sweep['pm25_normal'], color='lightskyblue', linewidth=2, label='Normal (WSPM ≥ ambang)')
+    ax_mean.set_ylabel(r'Rata-rata PM2.5 ($\mu g/m^3$)')
+    ax_mean.set_xlabel('Ambang Stagnasi WSPM (m/s)')
+    ax_mean.legend(frameon=False, loc='upper right')
+
+    for ax in (ax_ratio, ax_mean):
+        ax.axvline(default_threshold, color='gray', linestyle=':', linewidth=1)
+        ax.axvline(threshold, color='black', linestyle='--', linewidth=1)
+        ax.grid(axis='both', linestyle=':', alpha=0.6)
+    ax_ratio.annotate(f'Ambang terpilih: {threshold:.1f} m/s', xy=(threshold, 1), xytext=(5, 5),
+                      textcoords='offset points', fontsize=9)
+    plt.tight_layout()
+    return fig, None
+
+# --- PB 4: Episode Polusi Berkelanjutan ---
+def plot_pb4_episodes(episodes, col, threshold, min_hours):
+    """PB 4: Linimasa episode per stasiun (warna = puncak) dan sebaran durasi vs. puncak per Tipe Area."""
+    if episodes.empty:
+        return None, f"Tidak ada episode {col} > {threshold:g} selama >= {min_hours} jam pada filter ini."
+
+    fig, (ax_timeline, ax_scatter) = plt.subplots(
+        2, 1, figsize=(12, 8), gridspec_kw={'height_ratios': [3, 2]}
+    )
+
+    stations = sorted(episodes['station'].unique())
+    rows = episodes['station'].map({station: i for i, station in enumerate(stations)}).to_numpy()
+    norm = plt.Normalize(threshold, max(float(episodes['peak'].max()), threshold + 1))
+    cmap = matplotlib.colormaps['YlOrRd']
+    duration = (episodes['end'] - episodes['start']) + np.timedelta64(1, 'h')
+    ax_timeline.barh(
+        rows, duration, left=episodes['start'], height=0.7,
+        color=cmap(norm(episodes['peak'].to_numpy())), edgecolor='black', linewidth=0.3,
+    )
+    ax_timeline.set_yticks(range(len(stations)))
+    ax_timeline.set_yticklabels(stations)
+    ax_timeline.set_title(
+        f'Episode {col} > {threshold:g} ' + r'$\mu g/m^3$' + f' Selama ≥ {min_hours} Jam',
+        fontsize=14, fontweight='bold',
+    )
+    ax_timeline.grid(axis='x', linestyle=':', alpha=0.6)
+    fig.colorbar(cm.ScalarMappable(norm=norm, cmap=cmap), ax=ax_timeline, label=f'Puncak {col}')
+
+    areas = [area for area in ['Urban', 'Suburban', 'Rural'] if area in set(episodes['Area_Type'])]
+    for area, color in zip(areas, sns.color_palette('deep')):
+        group = episodes[episodes['Area_Type'] == area]
+        ax_scatter.scatter(group['hours'], group['peak'], s=18, alpha=0.6, color=color, label=area)
+    ax_scatter.set_xlabel('Durasi Episode (jam)')
+    ax_scatter.set_ylabel(f'Puncak {col}')
+    ax_scatter.legend(frameon=False, loc='upper left')
+    ax_scatter.grid(axis='both', linestyle=':', alpha=0.6)
+    plt.tight_layout()
+    return fig, None
+
+# --- PB 4: Wind Rose Plot ---
+def plot_windrose_single_condition(windrose_hist, filters, pm25_condition, filter_title):
+    """
+    PB 4: Membuat plot windrose untuk satu kondisi PM2.5 tertentu dari histogram pra-hitung.
+    pm25_condition: 'Normal' (PM2.5 < 75) atau 'Extreme' (PM2.5 > 200).
+    """
+
+    # Menerapkan Filter Kondisi PM2.5
+    if pm25_condition == 'Normal':
+        plot_title = f"Wind Rose: Kondisi Normal (< 75) | {filter_title}"
+    elif pm25_condition == 'Extreme':
+        plot_title = f"Wind Rose: Kondisi Ekstrem (> 200) | {filter_title}"
+    else:
+        return None, "Kondisi PM2.5 tidak valid."
+
+    # Menjumlahkan histogram (sektor x kecepatan) untuk grup yang lolos filter
+    lower, upper = PM25_CONDITIONS[pm25_condition]
+    table = windrose_table(windrose_hist, filters, lower=lower, upper=upper)
+    total = table.sum()
+
+    if total == 0:
+        return None, f"Data {pm25_condition} tidak cukup setelah pemfilteran."
+    
+    # PLOTTING
+    fig = plt.figure(figsize=(6, 6))
+    ax = windrose_axes(fig)
+    cmap_object = matplotlib.colormaps['viridis'] 
+
+    draw_windrose_bars(
+        ax,
+        table * 100 / total, # normed=True
+        SPEED_BINS,
+        cmap_object,
+        opening=0.8,
+        edgecolor='white',
+    )
+
+    ax.set_title(plot_title, fontsize=10, fontweight='bold')
+    ax.legend(title='WSPM (m/s)', loc='lower left', bbox_to_anchor=(-0.1, -0.1), fontsize=8)
+
+    plt.tight_layout()
+    return fig, None
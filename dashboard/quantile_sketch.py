@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#     SKETCH KUANTIL (MERGEABLE) UNTUK BOX PLOT PB 3 & PB 4
+# =========================================================
+# Sketch berbasis bucket logaritmik (ala DDSketch) per grup
+# stasiun x tahun x musim x Is_Stagnant. Sketch dapat digabung (dijumlahkan)
+# untuk kombinasi filter apa pun, lalu kuartil, whisker, dan outlier box plot
+# dibaca dari sketch gabungan -- tanpa mengurutkan data per baris.
+#
+# Batas galat: setiap bucket k mencakup (MIN_VALUE * GAMMA^(k-1), MIN_VALUE * GAMMA^k]
+# dan diwakili oleh 2 * MIN_VALUE * GAMMA^k / (GAMMA + 1). Karena itu setiap
+# kuantil (Q1, median, Q3) memiliki galat relatif paling besar ALPHA (1%) terhadap
+# nilai data sebenarnya pada peringkat yang sama. Ujung whisker dan outlier adalah
+# nilai representatif bucket (galat relatif <= ALPHA terhadap data di bucket itu);
+# karena batas 1.5 IQR dihitung dari kuartil hasil sketch, ujung whisker dapat
+# bergeser satu bucket (~2 * ALPHA). Nilai di bawah MIN_VALUE dilaporkan sebagai 0.
+
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+MIN_VALUE = 0.1
+MAX_VALUE = 5000.0
+# Bucket 0 = nilai < MIN_VALUE, bucket terakhir = nilai > MAX_VALUE (overflow)
+N_BUCKETS = int(np.ceil(np.log(MAX_VALUE / MIN_VALUE) / np.log(GAMMA))) + 2
+
+SKETCH_KEYS = ['station', 'Area_Type', 'year', 'Season', 'Is_Stagnant']
+SKETCH_COLS = ['PM2.5', 'O3']
+
+
+def bucket_index(values):
+    """Indeks bucket untuk setiap nilai (NA -> -1)."""
+    values = np.asarray(values, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.ceil(np.log(values / MIN_VALUE) / np.log(GAMMA))
+    idx = np.clip(k + 1, 1, N_BUCKETS - 1)
+    idx = np.where(values < MIN_VALUE, 0, idx)
+    return np.where(np.isnan(values), -1, idx).astype('int64')
+
+
+def bucket_values():
+    """Nilai representatif setiap bucket."""
+    k = np.arange(N_BUCKETS) - 1
+    values = 2 * MIN_VALUE * GAMMA ** k / (GAMMA + 1)
+    values[0] = 0.0
+    return values
+
+
+BUCKET_VALUES = bucket_values()
+
+
+def build_sketches(df, columns=SKETCH_COLS):
+    """
+    Membangun sketch per grup SKETCH_KEYS untuk setiap kolom.
+    Mengembalikan dict: 'keys' (DataFrame grup) dan 'counts' ({kolom: array [grup, bucket]}).
+    """
+    keys = [key for key in SKETCH_KEYS if key in df.columns]
+    grouped = df.groupby(keys, observed=True, sort=True)
+    group_code = grouped.ngroup().to_numpy()
+    group_keys = grouped.size().index.to_frame(index=False)
+    n_groups = len(group_keys)
+
+    counts = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        idx = bucket_index(df[col].to_numpy())
+        valid = idx >= 0
+        flat = group_code[valid] * N_BUCKETS + idx[valid]
+        col_counts = np.bincount(flat, minlength=n_groups * N_BUCKETS)
+        col_counts = col_counts.astype(np.min_scalar_type(max(int(col_counts.max(initial=0)), 1)))
+        counts[col] = col_counts.reshape(n_groups, N_BUCKETS)
+
+    return {'keys': group_keys, 'counts': counts}
+
+
+def merge_sketches(sketches, col, filters=None, by=None):
+    """
+    Menggabungkan sketch kolom `col` untuk grup yang lolos filter.
+    by=None -> satu array bucket; by='kolom' -> {nilai: array bucket}.
+    """
+    keys = sketches['keys']
+    mask = np.ones(len(keys), dtype=bool)
+    for key, val in (filters or {}).items():
+        if val is None or (isinstance(val, str) and val == 'Overall'):
+            continue
+        values = val if isinstance(val, (list, tuple, set)) else [val]
+        mask &= keys[key].isin(list(values)).to_numpy()
+
+    counts = sketches['counts'][col]
+    if by is None:
+        return counts[mask].sum(axis=0, dtype='int64')
+
+    merged = {}
+    for value in pd.unique(keys.loc[mask, by]):
+        group_mask = mask & (keys[by] == value).to_numpy()
+        merged[value] = counts[group_mask].sum(axis=0, dtype='int64')
+    return merged
+
+
+def quantile(counts, q):
+    """Kuantil q (interpolasi linier antar peringkat, seperti np.percentile) dari sketch."""
+    n = int(counts.sum())
+    if n == 0:
+        return np.nan
+    cumulative = np.cumsum(counts)
+    rank = q * (n - 1)
+    lower, upper = int(np.floor(rank)), int(np.ceil(rank))
+    value_lower = BUCKET_VALUES[np.searchsorted(cumulative, lower, side='right')]
+    value_upper = BUCKET_VALUES[np.searchsorted(cumulative, upper, side='right')]
+    return value_lower + (rank - lower) * (value_upper - value_lower)
+
+
+def box_stats(counts, label, whis=1.5, max_fliers=300):
+    """
+    Statistik box plot (format matplotlib `bxp`) dari sketch gabungan.
+    Outlier diwakili satu titik per bucket non-kosong (maksimal `max_fliers`, disampel merata).
+    """
+    q1, med, q3 = (quantile(counts, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    nonempty = BUCKET_VALUES[counts > 0]
+
+    inside = nonempty[(nonempty >= q1 - whis * iqr) & (nonempty <= q3 + whis * iqr)]
+    whislo = inside.min() if len(inside) else q1
+    whishi = inside.max() if len(inside) else q3
+
+    fliers = nonempty[(nonempty < whislo) | (nonempty > whishi)]
+    if len(fliers) > max_fliers:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, max_fliers).astype(int)]
+
+    return {
+        'label': label,
+        'q1': q1,
+        'med': med,
+        'q3': q3,
+        'whislo': whislo,
+        'whishi': whishi,
+        'fliers': fliers,
+    }
@@ -0,0 +1,394 @@
+import argparse
+import os
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from data_store import STORE_DIRNAME, store_version
+from quantile_sketch import GAMMA, MIN_VALUE, N_BUCKETS, SKETCH_COLS, SKETCH_KEYS
+from stats_cube import CUBE_COLS, CUBE_PAIRS, caap_change, means, pearson, reduce_cube, select_cube
+from windrose_hist import HIST_KEYS, N_SECTORS, PM25_EDGES, SPEED_BINS, WD_NA_CODE, n_pm25_bins
+
+# =========================================================
+#     API QUERY PB 1-4: BACKEND PANDAS (CUBE) ATAU SQL (DUCKDB)
+# =========================================================
+# Halaman dashboard (lewat graf komputasi di pipeline.py) memanggil API yang sama
+# untuk kedua backend: scope(filters) mempersempit sumber data, reduce(by, cols)
+# mengembalikan statistik aditif (n, sum, sumsq, co-moment) dengan nama kolom
+# yang sama seperti cube, lalu metrik PB dihitung dari hasil reduksi tersebut.
+#
+# - CubeBackend: cube statistik in-memory (stats_cube.py), default.
+# - SqlBackend: database DuckDB tertanam (file main_data.duckdb, tanpa server).
+#   Filter Area_Type/Season/year/station menjadi klausa WHERE dan hanya kolom
+#   yang dibutuhkan yang dipindai, sehingga data per baris tidak perlu dimuat
+#   ke setiap proses Streamlit. Aktif jika DASHBOARD_BACKEND=duckdb.
+#   Histogram wind rose, sketch kuantil, dan total PM2.5 per nilai WSPM (sapuan
+#   stagnasi PB 4) juga dihitung di DuckDB: kode bin dihitung dengan ekspresi
+#   SQL yang sama dengan versi NumPy, lalu GROUP BY mengembalikan jumlah per sel.
+
+BACKEND_ENV = 'DASHBOARD_BACKEND'
+DATABASE_NAME = 'main_data.duckdb'
+TABLE_NAME = 'prsa'
+
+# Kunci yang tidak tersimpan sebagai kolom: ekspresi SQL penggantinya
+KEY_EXPRESSIONS = {'month': 'month("datetime")'}
+
+
+class QueryBackend(ABC):
+    """Metrik PB 1-4 yang sama untuk semua backend; subclass mengimplementasikan scope, reduce, values."""
+
+    @abstractmethod
+    def scope(self, filters):
+        """Backend baru yang dipersempit dengan `filters` (dict kolom -> nilai; 'Overall'/None = semua)."""
+
+    @abstractmethod
+    def reduce(self, by=None, cols=CUBE_COLS):
+        """Statistik aditif `cols` per kelompok `by` (kolom sama dengan cube)."""
+
+    @abstractmethod
+    def values(self, col):
+        """Nilai unik terurut kolom `col` pada scope ini."""
+
+    def means(self, cols, by=None):
+        """Rata-rata kolom `cols` (per kelompok `by`, None = satu baris total)."""
+        return means(self.reduce(by, cols), cols)
+
+    def annual_means(self, cols):
+        """PB 1: Rata-rata tahunan polutan."""
+        return self.means(cols, by=['year'])
+
+    def caap_evaluation(self, cols):
+        """PB 1 & 2: (rata-rata tahunan Pasca-CAAP, baseline Pra-CAAP, persentase perubahan)."""
+        return caap_change(
+            self.scope({'Pre_CAAP': False}).means(cols, by=['year']),
+            self.scope({'Pre_CAAP': True}).means(cols),
+        )
+
+    def correlation_by(self, x, y, by):
+        """PB 3: Korelasi Pearson x vs y per kelompok `by`."""
+        return pearson(self.reduce(by, [x, y]), x, y)
+
+    def stagnation_means(self):
+        """PB 4: Rata-rata PM2.5 dan WSPM per kondisi Is_Stagnant."""
+        return self.means(['PM2.5', 'WSPM'], by=['Is_Stagnant'])
+
+
+class CubeBackend(QueryBackend):
+    """Backend pandas: cube statistik in-memory (hasil build_cube/build_cube_chunked)."""
+
+    def __init__(self, cube):
+        self.cube = cube
+
+    def scope(self, filters):
+        return CubeBackend(select_cube(self.cube, filters))
+
+    def reduce(self, by=None, cols=CUBE_COLS):
+        return reduce_cube(self.cube, by)
+
+    def values(self, col):
+        return sorted(self.cube[col].unique().tolist())
+
+
+def _active(value):
+    return value is not None and not (isinstance(value, str) and value == 'Overall')
+
+
+def _key_sql(col):
+    return KEY_EXPRESSIONS.get(col, f'"{col}"')
+
+
+def _double(value):
+    """Literal DOUBLE SQL yang eksak (notasi ilmiah tidak dibaca DuckDB sebagai DECIMAL)."""
+    return f'{float(value):.17e}'
+
+
+def _uniform_bin_sql(col, edges):
+    """Indeks bin `col` pada grid seragam `edges` (= searchsorted(edges, v, 'right') - 1, bin terakhir terbuka)."""
+    start, step = _double(edges[0]), _double(edges[1] - edges[0])
+    return f'LEAST(FLOOR((CAST("{col}" AS DOUBLE) - {start}) / {step}), {len(edges) - 1})'
+
+
+def pm25_code_sql(col='PM2.5'):
+    """Kode bin PM2.5 wind rose dalam SQL (sama dengan windrose_hist.pm25_bin_codes; NULL untuk NA)."""
+    idx = f'GREATEST({_uniform_bin_sql(col, PM25_EDGES)}, 0)'
+    edge = f'({_double(PM25_EDGES[0])} + {_double(PM25_EDGES[1] - PM25_EDGES[0])} * {idx})'
+    return f'CAST(2 * {idx} + CAST(CAST("{col}" AS DOUBLE) <> {edge} AS INTEGER) AS INTEGER)'
+
+
+def speed_code_sql(col='WSPM'):
+    """Kode bin kecepatan angin wind rose dalam SQL (NULL untuk NA atau kecepatan negatif)."""
+    return f'CASE WHEN "{col}" >= {_double(SPEED_BINS[0])} THEN CAST({_uniform_bin_sql(col, SPEED_BINS)} AS INTEGER) END'
+
+
+def sector_code_sql(col='wd_sector'):
+    """Kode sektor arah angin dalam SQL (NULL untuk WD_NA_CODE)."""
+    return f'CASE WHEN "{col}" <> {WD_NA_CODE} THEN CAST("{col}" AS INTEGER) END'
+
+
+def bucket_sql(col):
+    """Indeks bucket sketch kuantil dalam SQL (sama dengan quantile_sketch.bucket_index; NULL untuk NA)."""
+    value = f'CAST("{col}" AS DOUBLE)'
+    k = f'CEIL(LN({value} / {_double(MIN_VALUE)}) / {_double(np.log(GAMMA))})'
+    return (
+        f'CASE WHEN {value} < {_double(MIN_VALUE)} THEN 0 '
+        f'WHEN {value} IS NOT NULL THEN CAST(LEAST(GREATEST({k} + 1, 1), {N_BUCKETS - 1}) AS INTEGER) END'
+    )
+
+
+def _stat_sql(cols):
+    """Ekspresi agregat SQL dengan nama kolom yang sama seperti cube (pairwise complete untuk co-moment)."""
+    exprs = []
+    for col in cols:
+        value = f'CAST("{col}" AS DOUBLE)'
+        exprs += [
+            f'COUNT("{col}") AS "n:{col}"',
+            f'SUM({value}) AS "sum:{col}"',
+            f'SUM({value} * {value}) AS "sumsq:{col}"',
+        ]
+    for x, y in CUBE_PAIRS:
+        if x not in cols or y not in cols:
+            continue
+        name = f'{x}|{y}'
+        both = f'FILTER (WHERE "{x}" IS NOT NULL AND "{y}" IS NOT NULL)'
+        vx, vy = f'CAST("{x}" AS DOUBLE)', f'CAST("{y}" AS DOUBLE)'
+        exprs += [
+            f'COUNT(*) {both} AS "n:{name}"',
+            f'SUM({vx}) {both} AS "sx:{name}"',
+            f'SUM({vy}) {both} AS "sy:{name}"',
+            f'SUM({vx} * {vx}) {both} AS "sxx:{name}"',
+            f'SUM({vy} * {vy}) {both} AS "syy:{name}"',
+            f'SUM({vx} * {vy}) {both} AS "sxy:{name}"',
+        ]
+    return exprs
+
+
+class SqlBackend(QueryBackend):
+    """
+    Backend SQL: tabel data per baris di DuckDB. Setiap scope menambah kondisi filter
+    (tanpa membaca data); query dijalankan saat reduce/values dengan WHERE dan proyeksi kolom.
+    """
+
+    def __init__(self, connection, table=TABLE_NAME, conditions=()):
+        self.connection = connection
+        self.table = table
+        self.conditions = conditions
+
+    @classmethod
+    def open(cls, db_path):
+        """Membuka database DuckDB (read-only, aman dipakai beberapa proses Streamlit sekaligus)."""
+        import duckdb
+
+        return cls(duckdb.connect(db_path, read_only=True))
+
+    def scope(self, filters):
+        added = tuple((col, value) for col, value in (filters or {}).items() if _active(value))
+        return SqlBackend(self.connection, self.table, self.conditions + added)
+
+    def _where(self, extra=()):
+        """Klausa WHERE (beserta parameter) dari kondisi scope ditambah kondisi SQL `extra`."""
+        clauses, params = list(extra), []
+        for col, value in self.conditions:
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append(f'{_key_sql(col)} IN ({", ".join("?" * len(value))})')
+                params += value
+            else:
+                clauses.append(f'{_key_sql(col)} = ?')
+                params.append(value.item() if isinstance(value, np.generic) else value)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def _query(self, sql, params):
+        # Satu cursor per query: koneksi DuckDB tidak boleh dipakai bersamaan oleh beberapa thread sesi
+        with self.connection.cursor() as cursor:
+            return cursor.execute(sql, params).df()
+
+    def reduce(self, by=None, cols=CUBE_COLS):
+        by = list(by or [])
+        select = [f'{_key_sql(col)} AS "{col}"' for col in by] + _stat_sql(cols)
+        where, params = self._where()
+        sql = f'SELECT {", ".join(select)} FROM {self.table}{where}'
+        if by:
+            keys = ', '.join(f'"{col}"' for col in by)
+            sql += f' GROUP BY {keys} ORDER BY {keys}'
+
+        reduced = self._query(sql, params)
+        stats = [col for col in reduced.columns if ':' in col]
+        reduced[stats] = reduced[stats].fillna(0)
+        return reduced.set_index(by) if by else reduced
+
+    def values(self, col):
+        where, params = self._where()
+        sql = f'SELECT DISTINCT {_key_sql(col)} AS value FROM {self.table}{where} ORDER BY 1'
+        return self._query(sql, params)['value'].tolist()
+
+    def first_seen_values(self, col):
+        """Nilai unik `col` menurut urutan kemunculan pertama di tabel (sama dengan filter_index.index_values)."""
+        where, params = self._where()
+        sql = f'SELECT {_key_sql(col)} AS value FROM {self.table}{where} GROUP BY 1 ORDER BY MIN(rowid)'
+        return self._query(sql, params)['value'].tolist()
+
+    def keyed_counts(self, keys, codes, sizes):
+        """
+        Jumlah baris per grup `keys` x kode bin (ekspresi SQL `codes`, kode ke-i di 0..sizes[i]-1; baris dengan
+        kode NULL tidak dihitung). Nomor grup & indeks sel datar dihitung di DuckDB, sehingga yang dikirim hanya
+        (sel, jumlah) untuk sel non-kosong. Mengembalikan (DataFrame grup terurut, array int [grup, *sizes]).
+        """
+        key_sql = ', '.join(f'"{key}"' for key in keys)
+        # Grup dengan kunci NULL dilewati (sama dengan groupby pandas)
+        keys_present = [f'"{key}" IS NOT NULL' for key in keys]
+        where, params = self._where(keys_present)
+        groups_sql = f'SELECT DISTINCT {key_sql} FROM {self.table}{where}'
+        group_keys = self._query(f'{groups_sql} ORDER BY ALL', params)
+
+        # Sel datar = ((grup * sizes[0] + kode0) * sizes[1] + kode1) ...; nomor grup = peringkat kunci pada
+        # hasil GROUP BY (termasuk baris berkode NULL agar penomoran sama dengan group_keys)
+        cell = '"group"'
+        for i, size in enumerate(sizes):
+            cell = f'({cell} * {size} + "code:{i}")'
+        code_select = ', '.join(f'{code} AS "code:{i}"' for i, code in enumerate(codes))
+        code_present = ' AND '.join(f'"code:{i}" IS NOT NULL' for i in range(len(codes)))
+        counted = self._query(f"""
+            SELECT {cell} AS cell, n FROM (
+                SELECT *, DENSE_RANK() OVER (ORDER BY {key_sql}) - 1 AS "group" FROM (
+                    SELECT {key_sql}, {code_select}, COUNT(*) AS n FROM {self.table}{where} GROUP BY ALL
+                )
+            )
+            WHERE {code_present}
+        """, params)
+
+        n = counted['n'].to_numpy('int64')
+        shape = (len(group_keys),) + tuple(sizes)
+        counts = np.zeros(int(np.prod(shape)), dtype=np.min_scalar_type(max(int(n.max(initial=0)), 1)))
+        counts[counted['cell'].to_numpy('int64')] = n
+        return group_keys, counts.reshape(shape)
+
+    def windrose_hist(self):
+        """Histogram wind rose (format windrose_hist.build_windrose_hist) dengan GROUP BY di DuckDB."""
+        keys, counts = self.keyed_counts(
+            HIST_KEYS,
+            [pm25_code_sql(), sector_code_sql(), speed_code_sql()],
+            (n_pm25_bins(), N_SECTORS, len(SPEED_BINS)),
+        )
+        return {'keys': keys, 'counts': counts}
+
+    def sketches(self, columns=SKETCH_COLS):
+        """Sketch kuantil (format quantile_sketch.build_sketches) dengan GROUP BY di DuckDB."""
+        counts = {}
+        for col in columns:
+            keys, counts[col] = self.keyed_counts(SKETCH_KEYS, [bucket_sql(col)], (N_BUCKETS,))
+        return {'keys': keys, 'counts': counts}
+
+    def wspm_totals(self, col='PM2.5'):
+        """
+        Jumlah jam ber-`col` (n) dan total `col` (sum) per nilai WSPM pada scope ini, untuk
+        stagnation_sweep.stagnation_sweep_totals (satu baris per nilai WSPM, bukan per jam).
+        """
+        where, params = self._where()
+        sql = (
+            f'SELECT "WSPM", COUNT("{col}") AS n, COALESCE(SUM(CAST("{col}" AS DOUBLE)), 0) AS sum '
+            f'FROM {self.table}{where} GROUP BY 1 ORDER BY 1 NULLS LAST'
+        )
+        return self._query(sql, params)
+
+
+def build_database(store_path, db_path, table=TABLE_NAME):
+    """
+    Menyalin store Parquet ke database DuckDB (diurutkan per stasiun & waktu agar zone map
+    efektif untuk filter). Versi store dicatat di tabel metadata. Mengembalikan db_path.
+    """
+    import duckdb
+
+    if not os.path.isdir(store_path):
+        raise FileNotFoundError(f"Store Parquet tidak ditemukan: {store_path}")
+
+    tmp_path = db_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    pattern = os.path.join(store_path, '**', '*.parquet')
+    with duckdb.connect(tmp_path) as con:
+        con.execute(f"""
+            CREATE TABLE {table} AS
+            SELECT * REPLACE (CAST(year AS SMALLINT) AS year)
+            FROM read_parquet(?, hive_partitioning = true)
+            ORDER BY station, "datetime"
+        """, [pattern])
+        con.execute("CREATE TABLE metadata AS SELECT ? AS data_version", [store_version(store_path)])
+    os.replace(tmp_path, db_path)
+    return db_path
+
+
+def database_version(db_path):
+    """Versi store yang dicatat saat database dibuat (None jika tidak ada/tidak terbaca)."""
+    try:
+        import duckdb
+
+        with duckdb.connect(db_path, read_only=True) as con:
+            return con.execute("SELECT data_version FROM metadata").fetchone()[0]
+    except Exception:
+        return None
+
+
+def sql_backend_selected():
+    """True jika DASHBOARD_BACKEND=duckdb."""
+    return os.environ.get(BACKEND_ENV, 'pandas').strip().lower() == 'duckdb'
+
+
+def open_sql_backend(base_path, data_version):
+    """
+    Backend SQL untuk main_data.duckdb jika DASHBOARD_BACKEND=duckdb dan database dibuat dari
+    versi data yang sama; None jika tidak (dashboard memakai cube in-memory).
+    """
+    db_path = os.path.join(base_path, DATABASE_NAME)
+    if sql_backend_selected() and os.path.exists(db_path) and database_version(db_path) == data_version:
+        return SqlBackend.open(db_path)
+    return None
+
+
+def pb_results(backend, pollutants=('PM2.5', 'NO2', 'SO2')):
+    """Metrik PB 1-4 utama dari satu backend (untuk membandingkan backend)."""
+    pollutants = list(pollutants)
+    return {
+        'annual_means': backend.annual_means(pollutants),
+        'annual_change': backend.caap_evaluation(pollutants)[2],
+        'o3_no2_corr_summer': backend.scope({'Season': 'Summer'}).correlation_by('O3', 'NO2', ['year']),
+        'stagnation_means': backend.stagnation_means(),
+        'years_urban': backend.scope({'Area_Type': 'Urban'}).values('year'),
+    }
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Membangun/memverifikasi backend SQL (DuckDB) dashboard.")
+    parser.add_argument('--store', default=os.path.join(base_path, STORE_DIRNAME))
+    parser.add_argument('--database', default=os.path.join(base_path, DATABASE_NAME))
+    parser.add_argument('--verify', action='store_true', help="Bandingkan hasil PB 1-4 SQL dengan cube in-memory.")
+    args = parser.parse_args()
+
+    build_database(args.store, args.database)
+    print(f"Database DuckDB berhasil disimpan di: {args.database}")
+
+    if args.verify:
+        from data_store import read_store
+        from quantile_sketch import build_sketches, merge_sketches
+        from stats_cube import build_cube
+        from windrose_hist import PM25_CONDITIONS, build_windrose_hist, windrose_table
+
+        store_frame = read_store(args.store)
+        sql_backend = SqlBackend.open(args.database)
+        sql_results = pb_results(sql_backend)
+        cube_results = pb_results(CubeBackend(build_cube(store_frame)))
+        for name, value in sql_results.items():
+            diff = np.abs(np.asarray(value, dtype='float64') - np.asarray(cube_results[name], dtype='float64'))
+            print(f"{name:>20}: selisih maks {np.nanmax(diff):.3e}")
+
+        # Histogram wind rose & sketch kuantil: jumlah per sel harus sama persis
+        sql_hist, hist = sql_backend.windrose_hist(), build_windrose_hist(store_frame)
+        for condition, (lower, upper) in PM25_CONDITIONS.items():
+            diff = np.abs(windrose_table(sql_hist, None, lower, upper).astype('int64')
+                          - windrose_table(hist, None, lower, upper).astype('int64')).max()
+            print(f"{'windrose ' + condition:>20}: selisih maks {diff}")
+        sql_sketches, sketches = sql_backend.sketches(), build_sketches(store_frame)
+        for col in SKETCH_COLS:
+            diff = np.abs(merge_sketches(sql_sketches, col) - merge_sketches(sketches, col)).max()
+            print(f"{'sketch ' + col:>20}: selisih maks {diff}")
@@ -0,0 +1,207 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from figure_cache import MANIFEST_NAME, PRERENDERED_DIRNAME, SAVEFIG_OPTIONS
+from filter_index import index_values
+from pipeline import POLLUTANTS_CAAP, build_compute_graph, build_metrics, load_dataset, load_station_frame
+from plots import (
+    plot_pb1_combined_dynamic, plot_pb2, plot_pb3_boxplot, plot_pb3_correlation_trend,
+    plot_pb4_boxplot_stagnation, plot_windrose_single_condition,
+)
+from query_backend import CubeBackend
+from shared_data import enable_copy_on_write
+from windrose_hist import PM25_CONDITIONS
+
+# =========================================================
+#     RENDER BATCH SEMUA GRAFIK PB UNTUK SEMUA KOMBINASI FILTER
+# =========================================================
+# Ruang filter dashboard kecil dan terbatas, sehingga setiap grafik PB 1-4 dapat
+# dirender sekali (PNG dan/atau SVG) di process pool. manifest.json memetakan
+# kunci figure (sama persis dengan kunci FigureCache di dashboard.py) ke file,
+# sehingga dashboard dapat menyajikan aset pra-render atau dipakai sebagai laporan statis.
+
+FORMATS = ('png', 'svg')
+PLOTS = [
+    'plot_pb1_combined_dynamic',
+    'plot_pb2',
+    'plot_pb3_correlation_trend',
+    'plot_pb3_boxplot',
+    'plot_pb4_boxplot_stagnation',
+    'plot_windrose_single_condition',
+]
+
+# State per proses worker (dataset & graf komputasi dimuat sekali oleh initializer)
+_WORKER = {}
+
+
+def enumerate_jobs(metrics, graph, plots=PLOTS):
+    """
+    Semua kombinasi filter yang dapat dipilih di dashboard, sebagai daftar kunci figure
+    (tanpa versi data) dengan urutan dan nilai string yang sama seperti widget dashboard.
+    """
+    filter_index = metrics['filter_index']
+    areas = ['Overall'] + index_values(filter_index, 'Area_Type')
+    seasons = ['Overall'] + index_values(filter_index, 'Season')
+    years = ['Overall'] + [str(year) for year in sorted(index_values(filter_index, 'year'))]
+    # Semua urutan subset polutan (urutan pilih multiselect menentukan urutan subplot)
+    pollutant_choices = [
+        subset for r in range(1, len(POLLUTANTS_CAAP) + 1) for subset in permutations(POLLUTANTS_CAAP, r)
+    ]
+
+    jobs = []
+    for area in areas:
+        sources = {'backend': CubeBackend(metrics['cube']), 'area': area}
+        if 'plot_pb1_combined_dynamic' in plots:
+            jobs += [('plot_pb1_combined_dynamic', area, season) for season in seasons]
+        if 'plot_pb2' in plots:
+            jobs += [('plot_pb2', area, pollutants) for pollutants in pollutant_choices]
+        if 'plot_pb3_correlation_trend' in plots:
+            jobs.append(('plot_pb3_correlation_trend', area))
+
+        # PB 4: opsi tahun & musim mengikuti area (sama dengan dashboard)
+        years_pb4 = ['Overall'] + [str(year) for year in graph.evaluate('years_area', sources)]
+        seasons_pb4 = ['Overall'] + graph.evaluate('seasons_area', sources)
+        for year in years_pb4:
+            for season in seasons_pb4:
+                if 'plot_pb4_boxplot_stagnation' in plots:
+                    jobs.append(('plot_pb4_boxplot_stagnation', area, year, season))
+                if 'plot_windrose_single_condition' in plots:
+                    jobs += [
+                        ('plot_windrose_single_condition', condition, area, year, season)
+                        for condition in PM25_CONDITIONS
+                    ]
+
+    if 'plot_pb3_boxplot' in plots:
+        jobs += [('plot_pb3_boxplot', year) for year in years]
+    return jobs
+
+
+def _init_worker(base_path):
+    # Peringatan matplotlib/seaborn yang sama berulang untuk setiap grafik
+    warnings.simplefilter('ignore')
+    enable_copy_on_write()  # Sama dengan dashboard.py saat aplikasi dimulai
+    df_full, data_version = load_dataset(base_path)
+    _WORKER['metrics'] = build_metrics(df_full, data_version)
+    _WORKER['graph'] = build_compute_graph()
+    _WORKER['station_frame'] = load_station_frame(base_path)
+
+
+def render_figure(key, metrics, graph, station_frame=None):
+    """Membuat figure untuk satu kunci (tanpa versi data). Mengembalikan (fig, error_msg)."""
+    plot = key[0]
+    sources = {'backend': CubeBackend(metrics['cube']), 'station_frame': station_frame}
+    version = metrics['version']
+
+    def compute(node, **widgets):
+        return graph.evaluate(node, {**sources, **widgets}, {'backend': version, 'station_frame': version})
+
+    if plot == 'plot_pb1_combined_dynamic':
+        _, area, season = key
+        return plot_pb1_combined_dynamic(compute('annual_means_pb1', area=area, season_pb1=season)), None
+    if plot == 'plot_pb2':
+        _, area, pollutants = key
+        caap_ci = compute('caap_ci', area=area) if station_frame is not None else None
+        return plot_pb2(compute('annual_change', area=area)[list(pollutants)], caap_ci)
+    if plot == 'plot_pb3_correlation_trend':
+        _, area = key
+        return plot_pb3_correlation_trend(compute('o3_no2_corr_summer', area=area)), None
+    if plot == 'plot_pb3_boxplot':
+        _, year = key
+        return plot_pb3_boxplot(metrics['quantile_sketches'], None if year == 'Overall' else int(year)), None
+
+    if plot == 'plot_pb4_boxplot_stagnation':
+        _, area, year, season = key
+    else:
+        _, condition, area, year, season = key
+    filters = {'Area_Type': area, 'year': None if year == 'Overall' else int(year), 'Season': season}
+
+    if plot == 'plot_pb4_boxplot_stagnation':
+        return plot_pb4_boxplot_stagnation(metrics['quantile_sketches'], filters)
+    filter_title = f"Area: {area} | Tahun: {year} | Musim: {season}"
+    return plot_windrose_single_condition(metrics['windrose_hist'], filters, condition, filter_title)
+
+
+def _file_stem(key):
+    """Nama file aman dari kunci figure, mis. plot_pb2/Urban__PM2.5-NO2."""
+    parts = ['-'.join(p) if isinstance(p, tuple) else str(p) for p in key[1:]]
+    name = '__'.join(parts) or 'default'
+    return os.path.join(key[0], re.sub(r'[^A-Za-z0-9._-]+', '_', name))
+
+
+def _render_job(job):
+    key, output_dir, formats = job
+    metrics, graph = _WORKER['metrics'], _WORKER['graph']
+    entry = {'key': list(key), 'files': {}, 'error': None}
+
+    fig, error_msg = render_figure(key, metrics, graph, _WORKER['station_frame'])
+    if fig is None:
+        entry['error'] = error_msg
+        return entry
+
+    try:
+        stem = _file_stem(key)
+        os.makedirs(os.path.join(output_dir, os.path.dirname(stem)), exist_ok=True)
+        for fmt in formats:
+            path = f'{stem}.{fmt}'
+            options = {**SAVEFIG_OPTIONS, 'format': fmt}
+            fig.savefig(os.path.join(output_dir, path), **options)
+            entry['files'][fmt] = path
+    finally:
+        plt.close(fig)
+    return entry
+
+
+def render_all(base_path, output_dir, formats=('png',), plots=PLOTS, max_workers=None):
+    """Merender semua kombinasi filter ke `output_dir` dan menulis manifest.json. Mengembalikan manifest."""
+    df_full, data_version = load_dataset(base_path)
+    metrics = build_metrics(df_full, data_version)
+    jobs = enumerate_jobs(metrics, build_compute_graph(), plots)
+    del df_full, metrics
+
+    os.makedirs(output_dir, exist_ok=True)
+    started = datetime.datetime.now()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(base_path,)) as executor:
+        entries = list(executor.map(
+            _render_job, [(key, output_dir, tuple(formats)) for key in jobs], chunksize=8
+        ))
+
+    manifest = {
+        'data_version': data_version,
+        'generated_at': started.isoformat(timespec='seconds'),
+        'duration_s': round((datetime.datetime.now() - started).total_seconds(), 2),
+        'formats': list(formats),
+        'savefig': {k: v for k, v in SAVEFIG_OPTIONS.items() if k != 'format'},
+        'charts': entries,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    return manifest
+
+
+if __name__ == '__main__':
+    enable_copy_on_write()
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Render batch semua grafik PB untuk semua kombinasi filter.")
+    parser.add_argument('--output', default=os.path.join(base_path, PRERENDERED_DIRNAME))
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=FORMATS)
+    parser.add_argument('--plots', nargs='+', default=PLOTS, choices=PLOTS)
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: semua core).")
+    args = parser.parse_args()
+
+    manifest = render_all(base_path, args.output, args.formats, args.plots, args.workers)
+    n_errors = sum(entry['error'] is not None for entry in manifest['charts'])
+    print(
+        f"{len(manifest['charts'])} grafik ({n_errors} tanpa data) dirender dalam "
+        f"{manifest['duration_s']} detik ke: {args.output}"
+    )
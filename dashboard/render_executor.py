@@ -0,0 +1,298 @@
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from figure_cache import render_png
+from timing import span
+
+# =========================================================
+#     RENDER PARALEL UNTUK GRAFIK YANG SALING INDEPENDEN
+# =========================================================
+# Beberapa grafik dalam satu halaman tidak saling bergantung (PB 3: tren korelasi
+# & box plot O3; PB 4: box plot stagnasi & wind rose Normal/Ekstrem). Fungsi plot
+# memakai pyplot (state global, tidak thread-safe), sehingga pembuatan figure dan
+# rasterisasi PNG dijalankan di process pool dengan backend Agg. Hasil dikirim
+# balik sebagai byte PNG (bukan figure) dan langsung ditampilkan di kolomnya
+# begitu selesai. Dengan core sebanyak jumlah grafik, latensi halaman mendekati
+# grafik paling lambat; pada 1 CPU pool tidak lebih cepat (ukur dengan __main__).
+#
+# Jumlah worker: DASHBOARD_RENDER_WORKERS (default min(4, jumlah CPU)). Nilai <= 1
+# berarti render serial di proses Streamlit (tanpa pool), dengan urutan tampil sama.
+# Grafik yang sedang dirender sesi lain (kunci sama) ditunggu, tidak dikirim ulang.
+#
+# Data besar yang dipakai banyak job (sketch kuantil ~0,7 MB, histogram wind rose
+# ~2,7 MB) dikirim sekali ke setiap worker lewat initializer (RenderExecutor.share);
+# job hanya membawa SharedArg(nama) dan filternya. Versi data baru memulai pool baru.
+
+WORKERS_ENV = 'DASHBOARD_RENDER_WORKERS'
+MAX_DEFAULT_WORKERS = 4
+
+
+def default_workers():
+    """Jumlah worker dari DASHBOARD_RENDER_WORKERS, atau min(MAX_DEFAULT_WORKERS, jumlah CPU)."""
+    raw = os.environ.get(WORKERS_ENV, '').strip()
+    if raw:
+        try:
+            return max(int(raw), 0)
+        except ValueError:
+            pass
+    return min(MAX_DEFAULT_WORKERS, os.cpu_count() or 1)
+
+
+class SharedArg:
+    """Penanda argumen job: diganti data bersama `name` (RenderExecutor.share) yang sudah ada di worker."""
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f'SharedArg({self.name!r})'
+
+
+def resolve_args(args, shared):
+    """args job dengan setiap SharedArg diganti nilainya dari dict `shared`."""
+    return tuple(shared[arg.name] if isinstance(arg, SharedArg) else arg for arg in args)
+
+
+# Data bersama di proses worker (diisi _init_worker)
+_worker_shared = {}
+
+
+def _init_worker(shared):
+    """Inisialisasi worker: backend Agg (tanpa GUI), modul plot dan data bersama dimuat sekali per proses."""
+    import matplotlib
+
+    matplotlib.use('Agg')
+    warnings.filterwarnings('ignore')
+    importlib.import_module('plots')
+    _worker_shared.update(shared)
+
+
+def _render_job(plot_name, args):
+    """Dijalankan di worker: membuat figure `plots.<plot_name>(*args)` lalu merasterisasinya menjadi PNG."""
+    import plots
+
+    started = time.perf_counter()
+    result = getattr(plots, plot_name)(*resolve_args(args, _worker_shared))
+    fig, error_msg = result if isinstance(result, tuple) else (result, None)
+    plotted = time.perf_counter()
+    if fig is None:
+        return None, error_msg, {'plot_ms': round((plotted - started) * 1000, 1)}
+
+    png = render_png(fig)
+    return png, None, {
+        'plot_ms': round((plotted - started) * 1000, 1),
+        'rasterize_ms': round((time.perf_counter() - plotted) * 1000, 1),
+        'png_kb': round(len(png) / 1024, 1),
+    }
+
+
+class RenderExecutor:
+    """Process pool (spawn, backend Agg) untuk membuat & merasterisasi beberapa grafik sekaligus."""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = default_workers() if max_workers is None else max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._shared_version = None
+        self._shared = {}
+
+    @property
+    def parallel(self):
+        return self.max_workers > 1
+
+    def share(self, version, data):
+        """
+        Data bersama {nama: nilai} versi `version` untuk job yang memakai SharedArg(nama): dimuat sekali
+        per worker lewat initializer. Versi baru menggantikan pool; job di pool lama tetap diselesaikan.
+        """
+        with self._lock:
+            if version == self._shared_version:
+                return
+            self._shared_version, self._shared = version, dict(data)
+            old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: proses Streamlit memiliki banyak thread, fork dapat mewarisi lock yang sedang dipegang
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self._shared,),
+                )
+            return self._pool
+
+    def shutdown(self, pool=None):
+        """Menghentikan pool (atau hanya jika pool saat ini adalah `pool`, mis. pool yang rusak)."""
+        with self._lock:
+            if self._pool is None or (pool is not None and pool is not self._pool):
+                return
+            old_pool, self._pool = self._pool, None
+        old_pool.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, figure_cache, jobs):
+        """
+        Merender beberapa grafik independen. jobs: {slot: (kunci cache, nama fungsi di plots.py, args)};
+        args boleh memuat SharedArg untuk data yang didaftarkan lewat share().
+        Menghasilkan (slot, png, error_msg) sesegera setiap grafik siap: cache hit lebih dulu, lalu
+        hasil worker sesuai urutan selesai. PNG baru disimpan ke figure_cache.
+        """
+        pending = {}
+        for slot, (key, plot_name, args) in jobs.items():
+            png = figure_cache.get(key)
+            if png is not None:
+                with span('figure_cache_hit', plot=plot_name):
+                    yield slot, png, None
+            else:
+                pending[slot] = (key, plot_name, args)
+
+        if not pending:
+            return
+        if not self.parallel or len(pending) == 1:
+            yield from self._render_serial(figure_cache, pending)
+            return
+
+        # Grafik yang sedang dirender sesi lain tidak dikirim ulang ke pool: hasilnya ditunggu
+        flight = figure_cache.flight
+        leaders, followers = {}, {}
+        for slot, job in pending.items():
+            call, leader = flight.acquire(job[0])
+            if leader:
+                leaders[slot] = (call, job)
+            else:
+                followers[slot] = (call, job)
+
+        try:
+            yield from self._render_pool(figure_cache, leaders)
+        finally:
+            # Render dihentikan (mis. sesi rerun) atau gagal: penunggu dari sesi lain merender sendiri
+            for call, (key, _, _) in leaders.values():
+                flight.release(key, call, failed=True)
+
+        for slot, (call, job) in followers.items():
+            if flight.wait(call):
+                yield (slot,) + call.value
+            else:
+                yield from self._render_serial(figure_cache, {slot: job})
+
+    def _render_pool(self, figure_cache, leaders):
+        """Merender grafik `leaders` ({slot: (call single-flight, job)}) di process pool sesuai urutan selesai."""
+        if not leaders:
+            return
+        jobs = {slot: job for slot, (_, job) in leaders.items()}
+        pool = None
+        try:
+            pool = self._get_pool()
+            futures = {pool.submit(_render_job, plot_name, args): slot
+                       for slot, (key, plot_name, args) in jobs.items()}
+        except (BrokenProcessPool, RuntimeError, OSError):
+            self.shutdown(pool)
+            yield from self._render_serial(figure_cache, jobs, leaders)
+            return
+
+        submitted = time.perf_counter()
+        failed = {}
+        for future in as_completed(futures):
+            slot = futures[future]
+            key, plot_name, args = jobs[slot]
+            try:
+                png, error_msg, timings = future.result()
+            except BrokenProcessPool:
+                failed[slot] = jobs[slot]
+                continue
+            with span('render_worker', plot=plot_name, workers=self.max_workers,
+                      wall_ms=round((time.perf_counter() - submitted) * 1000, 1), **timings):
+                if png is not None:
+                    figure_cache.put(key, png)
+            figure_cache.flight.release(key, leaders[slot][0], (png, error_msg),
+                                        compute_ms=timings['plot_ms'] + timings.get('rasterize_ms', 0.0))
+            yield slot, png, error_msg
+
+        if failed:
+            # Worker mati (mis. kehabisan memori): sisa grafik dirender di proses ini
+            self.shutdown(pool)
+            yield from self._render_serial(figure_cache, failed, leaders)
+
+    def _render_serial(self, figure_cache, jobs, leaders=None):
+        """Render di proses ini. leaders: call single-flight yang sudah dipegang untuk slot tersebut (diselesaikan di sini)."""
+        import plots
+
+        shared = self._shared
+        for slot, (key, plot_name, args) in jobs.items():
+            args = resolve_args(args, shared)
+            if leaders and slot in leaders:
+                started = time.perf_counter()
+                result = figure_cache.render_now(key, lambda: getattr(plots, plot_name)(*args))
+                figure_cache.flight.release(key, leaders[slot][0], result,
+                                            compute_ms=(time.perf_counter() - started) * 1000)
+            else:
+                result = figure_cache.get_or_render(key, lambda: getattr(plots, plot_name)(*args))
+            yield (slot,) + result
+
+
+if __name__ == '__main__':
+    import argparse
+    import pickle
+    import statistics
+
+    parser = argparse.ArgumentParser(description="Membandingkan render serial vs. paralel grafik PB 3 & PB 4.")
+    parser.add_argument('--workers', type=int, default=max(default_workers(), 2))
+    parser.add_argument('--repeat', type=int, default=5, help="Jumlah pengukuran per mode (dilaporkan median).")
+    args = parser.parse_args()
+
+    from figure_cache import FigureCache
+    from pipeline import load_metrics
+    from shared_data import enable_copy_on_write
+
+    enable_copy_on_write()
+    metrics = load_metrics(os.path.dirname(os.path.abspath(__file__)))
+    shared = {name: metrics[name] for name in ('quantile_sketches', 'windrose_hist')}
+    filters = {'Area_Type': 'Overall', 'year': None, 'Season': 'Overall'}
+    jobs = {
+        'boxplot_pb4': (('plot_pb4_boxplot_stagnation',), 'plot_pb4_boxplot_stagnation',
+                        (SharedArg('quantile_sketches'), filters)),
+        'windrose_normal': (('windrose', 'Normal'), 'plot_windrose_single_condition',
+                            (SharedArg('windrose_hist'), filters, 'Normal', 'Overall')),
+        'windrose_extreme': (('windrose', 'Extreme'), 'plot_windrose_single_condition',
+                             (SharedArg('windrose_hist'), filters, 'Extreme', 'Overall')),
+    }
+
+    # Byte yang dikirim ke worker per halaman PB 4: dengan SharedArg vs. data lengkap di setiap job
+    sent = sum(len(pickle.dumps(job[2])) for job in jobs.values())
+    sent_full = sum(len(pickle.dumps(resolve_args(job[2], shared))) for job in jobs.values())
+    print(f"Payload job PB 4: {sent / 1024:.1f} KB (tanpa data bersama: {sent_full / 1024 ** 2:.1f} MB)")
+
+    totals = {}
+    for workers in (1, args.workers):
+        executor = RenderExecutor(workers)
+        executor.share('benchmark', shared)
+        if executor.parallel:
+            # Pool dipanaskan dulu: biaya start worker hanya dibayar sekali per proses Streamlit
+            started = time.perf_counter()
+            list(executor.render(FigureCache(), {slot: (('warmup',) + job[0],) + job[1:] for slot, job in jobs.items()}))
+            print(f"{workers} worker: start pool + render pertama {time.perf_counter() - started:.2f} detik")
+        runs = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for slot, png, _ in executor.render(FigureCache(), jobs):
+                if len(runs) == 0:
+                    print(f"  [{workers} worker] {slot:<17} selesai {time.perf_counter() - started:6.2f} detik "
+                          f"({len(png or b'') / 1024:.0f} KB)")
+            runs.append(time.perf_counter() - started)
+        totals[workers] = statistics.median(runs)
+        print(f"{workers} worker: median {totals[workers]:.2f} detik dari {args.repeat} pengukuran")
+        executor.shutdown()
+
+    print(f"\nCPU: {os.cpu_count()} | serial {totals[1]:.2f} detik | {args.workers} worker "
+          f"{totals[args.workers]:.2f} detik | percepatan {totals[1] / totals[args.workers]:.2f}x")
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#     KORELASI BERGULIR (ROLLING) PER STASIUN - O(n)
+# =========================================================
+# Korelasi Pearson bergulir berbasis waktu untuk pasangan kolom apa pun,
+# per stasiun, dihitung untuk semua stasiun dalam satu pass vektor:
+# jumlah kumulatif n, x, y, x², y², xy (pairwise complete) lalu selisih
+# jumlah kumulatif di ujung-ujung jendela -- O(n) berapa pun panjang jendelanya.
+# Nilai dipusatkan per stasiun sebelum dijumlahkan agar co-moment stabil secara numerik.
+
+# Kolom polutan & meteorologi yang dapat dipasangkan
+ROLLING_COLS = ['PM2.5', 'PM10', 'SO2', 'NO2', 'CO', 'O3', 'TEMP', 'PRES', 'DEWP', 'WSPM']
+
+# Pilihan panjang jendela (jam): dari harian hingga satu musim
+ROLLING_WINDOWS = {
+    '1 Hari': 24,
+    '3 Hari': 72,
+    '1 Minggu': 168,
+    '2 Minggu': 336,
+    '1 Bulan (30 Hari)': 720,
+    '1 Musim (90 Hari)': 2160,
+}
+
+# Minimal pasangan valid dalam jendela (fraksi panjang jendela)
+MIN_PERIODS_FRACTION = 0.5
+
+# Batas bawah varians per sampel (di bawahnya r dianggap tidak terdefinisi)
+VARIANCE_EPS = 1e-12
+
+
+def _windowed_sum(values, start):
+    """Jumlah values[start[i] .. i] untuk setiap i, via selisih jumlah kumulatif."""
+    cumulative = np.concatenate([[0.0], np.cumsum(values, dtype='float64')])
+    return cumulative[1:] - cumulative[start]
+
+
+def rolling_correlation(df, x, y, window_hours, min_periods=None, station_col='station'):
+    """
+    Korelasi Pearson bergulir x vs y dengan jendela waktu (t - window_hours, t] per stasiun.
+    df: index datetime; baris boleh dalam urutan apa pun dan boleh ada jam yang hilang.
+    Mengembalikan Series (sejajar dengan baris df) berisi r, NaN jika pasangan valid < min_periods.
+    """
+    if min_periods is None:
+        min_periods = max(int(window_hours * MIN_PERIODS_FRACTION), 2)
+
+    if station_col in df.columns:
+        codes, _ = pd.factorize(df[station_col])
+    else:
+        codes = np.zeros(len(df), dtype='int64')
+    hours = df.index.to_numpy().astype('datetime64[h]').astype('int64')
+
+    # Urutkan per stasiun lalu waktu; kunci gabungan membuat jendela tidak melintasi stasiun
+    order = np.lexsort((hours, codes))
+    codes = codes[order]
+    hours = hours[order] - hours.min()
+    key = codes.astype('int64') * (int(hours.max()) + window_hours + 1) + hours
+    start = np.searchsorted(key, key - window_hours + 1, side='left')
+
+    xv = df[x].to_numpy(dtype='float64')[order]
+    yv = df[y].to_numpy(dtype='float64')[order]
+    valid = ~np.isnan(xv) & ~np.isnan(yv)
+
+    # Pemusatan per stasiun (rata-rata pasangan valid)
+    n_station = np.bincount(codes, weights=valid, minlength=codes.max() + 1)
+    n_station = np.where(n_station > 0, n_station, 1)
+    mean_x = np.bincount(codes, weights=np.where(valid, xv, 0.0), minlength=len(n_station)) / n_station
+    mean_y = np.bincount(codes, weights=np.where(valid, yv, 0.0), minlength=len(n_station)) / n_station
+    xc = np.where(valid, xv - mean_x[codes], 0.0)
+    yc = np.where(valid, yv - mean_y[codes], 0.0)
+
+    n = _windowed_sum(valid.astype('float64'), start)
+    sx = _windowed_sum(xc, start)
+    sy = _windowed_sum(yc, start)
+    sxx = _windowed_sum(xc * xc, start)
+    syy = _windowed_sum(yc * yc, start)
+    sxy = _windowed_sum(xc * yc, start)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+
+    # Varians ~0 (mis. nilai konstan dalam jendela) dianggap tidak terdefinisi
+    defined = (n >= min_periods) & (var_x > VARIANCE_EPS * n) & (var_y > VARIANCE_EPS * n)
+    r = np.where(defined, np.clip(r, -1.0, 1.0), np.nan)
+
+    result = np.empty(len(df))
+    result[order] = r
+    return pd.Series(result, index=df.index, name=f'r({x},{y})')
+
+
+def summarize_rolling(r, stations=None, freq='D'):
+    """
+    Meringkas r bergulir per jam menjadi resolusi `freq` untuk plot:
+    tanpa stasiun -> kolom 'r' (rata-rata); dengan stasiun -> median & IQR antar stasiun.
+    """
+    if stations is None:
+        return r.resample(freq).mean().to_frame('r')
+
+    per_station = (
+        pd.DataFrame({'r': r.to_numpy(), 'station': np.asarray(stations)}, index=r.index)
+        .groupby('station', observed=True)['r']
+        .resample(freq)
+        .mean()
+        .unstack('station')
+    )
+    return pd.DataFrame({
+        'median': per_station.median(axis=1),
+        'q25': per_station.quantile(0.25, axis=1),
+        'q75': per_station.quantile(0.75, axis=1),
+        'n_station': per_station.notna().sum(axis=1),
+    })
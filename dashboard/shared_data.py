@@ -0,0 +1,131 @@
+import gc
+import os
+import pickle
+import tracemalloc
+
+import pandas as pd
+
+from timing import MB
+
+# =========================================================
+#     DATASET BERSAMA (READ-ONLY) SEKALI PER PROSES
+# =========================================================
+# Dashboard memegang satu DataFrame per proses (st.cache_resource) dan
+# membagikannya ke semua sesi. Copy-on-Write pandas (diaktifkan sekali saat
+# dashboard dimulai, lihat enable_copy_on_write) memastikan setiap sesi hanya
+# mendapat "lazy copy": filter & pemilihan kolom tidak menyalin data, dan
+# penulisan dari satu sesi tidak pernah mengubah data bersama.
+
+
+def enable_copy_on_write():
+    """Mengaktifkan Copy-on-Write pandas (default sejak pandas 3.0). Opsi global: panggil sekali saat aplikasi dimulai."""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def copy_on_write_enabled():
+    return int(pd.__version__.split('.')[0]) >= 3 or bool(pd.get_option('mode.copy_on_write'))
+
+
+class SharedDataset:
+    """Pembungkus read-only untuk DataFrame yang dibagi antar sesi Streamlit."""
+
+    def __init__(self, df, version=None):
+        self._df = df
+        # Versi data (mis. waktu modifikasi sumber), dipakai sebagai bagian kunci cache
+        self.version = version
+
+    @property
+    def frame(self):
+        """
+        Lazy copy (tanpa menyalin data) dari DataFrame bersama jika Copy-on-Write aktif;
+        tanpa Copy-on-Write (mis. skrip CLI) salinan penuh, agar data bersama tetap tidak dapat diubah.
+        """
+        return self._df.copy(deep=not copy_on_write_enabled())
+
+    @property
+    def nbytes(self):
+        return int(self._df.memory_usage(deep=True).sum())
+
+    def __len__(self):
+        return len(self._df)
+
+
+# ---------------------------------------------------------
+# Pengukuran memori per rerun: implementasi lama vs. dataset bersama
+# ---------------------------------------------------------
+
+def legacy_rerun(payload, area='Overall'):
+    """
+    Akses data satu rerun implementasi lama: st.cache_data mengembalikan salinan hasil cache (unpickle),
+    lalu df_full_raw.copy() + filter Area, dan df_full.copy() di halaman PB.
+    """
+    df_full_raw = pickle.loads(payload)
+    df_full = df_full_raw.copy()
+    if area != 'Overall':
+        df_full = df_full[df_full['Area_Type'] == area]
+    return df_full_raw, df_full, df_full.copy()
+
+
+def shared_rerun(dataset, area='Overall'):
+    """Akses data yang sama dengan dataset bersama: lazy copy untuk df_full_raw dan halaman PB."""
+    df_full_raw = dataset.frame
+    df_full = df_full_raw
+    if area != 'Overall':
+        df_full = df_full[df_full['Area_Type'] == area]
+    return df_full_raw, df_full, df_full.copy(deep=False)
+
+
+def measure_rerun(func):
+    """
+    Memori satu rerun func() menurut tracemalloc (termasuk buffer NumPy): alokasi puncak dan memori yang
+    masih dipegang objek hasil rerun, dalam MB. Delta RSS tidak dipakai karena allocator memakai ulang
+    halaman yang sudah dibebaskan sehingga hasilnya bergantung urutan pengukuran.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {'Alokasi puncak (MB)': peak / MB, 'Dipegang rerun (MB)': retained / MB}
+
+
+def memory_report(dataset, area='Overall'):
+    """
+    Memori satu rerun (filter Area `area`) yang diukur untuk jalur lama (salinan per rerun) dan jalur
+    dataset bersama (lazy copy), beserta selisihnya. Membutuhkan Copy-on-Write aktif untuk jalur bersama.
+    """
+    # Hasil st.cache_data disimpan sebagai pickle di cache; dibuat di luar pengukuran
+    payload = pickle.dumps(dataset.frame, protocol=pickle.HIGHEST_PROTOCOL)
+    shared = measure_rerun(lambda: shared_rerun(dataset, area))
+    legacy = measure_rerun(lambda: legacy_rerun(payload, area))
+
+    report = pd.DataFrame(
+        [legacy, shared],
+        index=['Salinan per rerun (lama)', 'Dataset bersama (lazy copy)'],
+        dtype='float64',
+    )
+    report.loc['Penghematan per rerun'] = report.iloc[0] - report.iloc[1]
+    return report.round(2)
+
+
+if __name__ == '__main__':
+    from data_store import STORE_DIRNAME, read_csv_frame, read_store
+
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    store_path = os.path.join(base_path, STORE_DIRNAME)
+
+    if os.path.isdir(store_path):
+        df = read_store(store_path)
+    else:
+        df = read_csv_frame(os.path.join(base_path, 'main_data.csv'))
+
+    enable_copy_on_write()
+    dataset = SharedDataset(df)
+    print(f"Dataset bersama (sekali per proses): {dataset.nbytes / MB:.2f} MB, {len(dataset):,} baris")
+    for area in ['Overall'] + sorted(df['Area_Type'].dropna().unique().tolist()):
+        print(f"\nArea: {area}")
+        print(memory_report(dataset, area).to_string())
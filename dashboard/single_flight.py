@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+from timing import span
+
+# =========================================================
+#     SINGLE-FLIGHT: SATU KOMPUTASI UNTUK PERMINTAAN SERENTAK
+# =========================================================
+# Streamlit menjalankan ulang skrip per sesi. Saat banyak sesi membuka halaman
+# yang sama bersamaan (mis. setelah deploy), semuanya meleset di memo/cache
+# dan menghitung agregasi & grafik yang sama sekaligus. SingleFlight menahan
+# pemanggil dengan kunci yang sama selama komputasinya sedang berjalan: hanya
+# satu pemanggil ("pemimpin") yang menghitung, sisanya menunggu hasil yang
+# sama. Jika pemimpin gagal atau dihentikan (mis. sesinya rerun), penunggu
+# mencoba lagi dan salah satunya menjadi pemimpin baru.
+#
+# Dipakai oleh memo compute_graph.ComputeGraph, FigureCache.get_or_render, dan
+# RenderExecutor. Nonaktifkan dengan DASHBOARD_COALESCE=0 (untuk perbandingan).
+
+COALESCE_ENV = 'DASHBOARD_COALESCE'
+
+ENABLED = os.environ.get(COALESCE_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+class _Call:
+    """Satu komputasi yang sedang berjalan untuk sebuah kunci."""
+
+    __slots__ = ('done', 'value', 'failed', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Penggabung panggilan serentak per kunci (thread-safe, satu per cache per proses)."""
+
+    def __init__(self, name, enabled=None):
+        self.name = name
+        self.enabled = ENABLED if enabled is None else enabled
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.computed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_waiters = 0
+        self.compute_ms = 0.0
+        self.wait_ms = 0.0
+
+    def acquire(self, key):
+        """
+        Mendaftar untuk `key`: (call, True) jika pemanggil menjadi pemimpin (wajib memanggil release),
+        atau (call, False) jika komputasi yang sama sedang berjalan (tunggu dengan wait).
+        """
+        with self._lock:
+            call = self._calls.get(key) if self.enabled else None
+            if call is None:
+                call = _Call()
+                if self.enabled:
+                    self._calls[key] = call
+                return call, True
+            call.waiters += 1
+            self.max_waiters = max(self.max_waiters, call.waiters)
+            return call, False
+
+    def release(self, key, call, value=None, failed=False, compute_ms=0.0):
+        """Menyelesaikan komputasi pemimpin dan membangunkan penunggunya (aman dipanggil lebih dari sekali)."""
+        with self._lock:
+            if call.done.is_set():
+                return
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if failed:
+                self.failed += 1
+            else:
+                self.computed += 1
+                self.compute_ms += compute_ms
+            call.value, call.failed = value, failed
+            call.done.set()
+
+    def wait(self, call):
+        """Menunggu komputasi pemimpin. True jika berhasil (hasil di call.value), False jika pemimpin gagal."""
+        started = time.perf_counter()
+        with span('single_flight_wait', flight=self.name, waiters=call.waiters):
+            call.done.wait()
+        with self._lock:
+            self.wait_ms += (time.perf_counter() - started) * 1000
+            if not call.failed:
+                self.coalesced += 1
+        return not call.failed
+
+    def do(self, key, func):
+        """func() untuk `key`, dihitung sekali untuk semua pemanggil serentak dengan kunci yang sama."""
+        while True:
+            call, leader = self.acquire(key)
+            if not leader:
+                if self.wait(call):
+                    return call.value
+                continue  # Pemimpin gagal: coba lagi (salah satu penunggu menjadi pemimpin)
+
+            started = time.perf_counter()
+            try:
+                value = func()
+            except BaseException:
+                self.release(key, call, failed=True)
+                raise
+            self.release(key, call, value, compute_ms=(time.perf_counter() - started) * 1000)
+            return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'coalesced': self.coalesced,
+                'max_waiters': self.max_waiters,
+                'compute_ms': round(self.compute_ms, 1),
+                'wait_ms': round(self.wait_ms, 1),
+                'failed': self.failed,
+            }
+
+
+if __name__ == '__main__':
+    import argparse
+    import warnings
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="Simulasi banyak sesi serentak membuka halaman PB yang sama.")
+    parser.add_argument('--sessions', type=int, default=8)
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    from figure_cache import FigureCache
+    from pipeline import build_compute_graph, load_backend, load_metrics, metrics_frame
+    import plots
+
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    metrics = load_metrics(base_path)
+    version = metrics['version']
+    sources = {
+        'backend': load_backend(base_path, metrics), 'frame': metrics_frame(metrics),
+        'filter_index': metrics['filter_index'], 'area': 'Overall', 'season_pb1': 'Overall',
+        'year_pb3_boxplot': None, 'year_pb4': None, 'season_pb4': 'Overall',
+    }
+    fingerprints = {'backend': version, 'frame': version, 'filter_index': version}
+
+    def open_page(graph, figure_cache):
+        """Satu rerun sesi: tabel PB 1-4 dari graf komputasi + grafik PB 1 & PB 2 dari cache gambar."""
+        compute = lambda node: graph.evaluate(node, sources, fingerprints)  # noqa: E731
+        for node in ('annual_means_pb1', 'annual_change', 'o3_no2_corr_summer', 'pb4_impact', 'stagnation_sweep'):
+            compute(node)
+        figure_cache.get_or_render(('plot_pb1_combined_dynamic', version),
+                                   lambda: plots.plot_pb1_combined_dynamic(compute('annual_means_pb1')))
+        figure_cache.get_or_render(('plot_pb2', version), lambda: plots.plot_pb2(compute('annual_change')))
+
+    for enabled in (False, True):
+        graph, figure_cache = build_compute_graph(), FigureCache()
+        graph.flight.enabled = figure_cache.flight.enabled = enabled
+        started, cpu_started = time.perf_counter(), time.process_time()
+        with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+            list(executor.map(lambda _: open_page(graph, figure_cache), range(args.sessions)))
+        print(
+            f"coalescing {'aktif' if enabled else 'nonaktif'}: {args.sessions} sesi dalam "
+            f"{time.perf_counter() - started:.2f} detik (CPU {time.process_time() - cpu_started:.2f} detik)"
+        )
+        print(f"  compute_graph: {graph.stats()}")
+        print(f"  figure_cache:  {figure_cache.stats()}")
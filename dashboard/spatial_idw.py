@@ -0,0 +1,249 @@
+import argparse
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ingest import STATION_MAPPING
+from single_flight import SingleFlight
+from timing import span
+
+# =========================================================
+#     PETA POLUSI KONTINU: INTERPOLASI IDW ANTAR STASIUN
+# =========================================================
+# Nilai per jam ke-12 stasiun diinterpolasi ke grid lat/lon dengan Inverse
+# Distance Weighting (bobot 1 / jarak^IDW_POWER). Matriks bobot grid x stasiun
+# dihitung sekali per grid, sehingga medan satu jam hanyalah satu perkalian
+# matriks-vektor dan medan banyak jam (animasi) satu perkalian matriks batch.
+# Stasiun tanpa nilai (NaN) pada jam tertentu dikeluarkan dengan normalisasi
+# per jam: medan = (W @ nilai) / (W @ valid), tetap dalam bentuk batch.
+# Medan yang sudah dihitung disimpan di cache LRU (anggaran MB).
+
+# Koordinat perkiraan stasiun pemantauan PRSA (lintang, bujur; derajat)
+STATION_COORDS = {
+    'Aotizhongxin': (39.982, 116.397),
+    'Changping': (40.217, 116.230),
+    'Dingling': (40.292, 116.220),
+    'Dongsi': (39.929, 116.417),
+    'Guanyuan': (39.929, 116.339),
+    'Gucheng': (39.914, 116.184),
+    'Huairou': (40.328, 116.628),
+    'Nongzhanguan': (39.937, 116.461),
+    'Shunyi': (40.127, 116.655),
+    'Tiantan': (39.886, 116.407),
+    'Wanliu': (39.987, 116.287),
+    'Wanshouxigong': (39.878, 116.352),
+}
+
+IDW_POWER = 2.0
+# Grid default (baris lintang, kolom bujur) dan margin di sekitar stasiun terluar (derajat)
+GRID_SHAPE = (60, 80)
+GRID_OPTIONS = {
+    'Kasar (30 x 40)': (30, 40),
+    'Sedang (60 x 80)': (60, 80),
+    'Halus (120 x 160)': (120, 160),
+}
+GRID_MARGIN_DEG = 0.06
+# Jarak minimum (km): sel tepat di lokasi stasiun tidak membagi dengan nol
+MIN_DISTANCE_KM = 0.5
+# Kilometer per derajat lintang (pendekatan equirectangular di sekitar Beijing)
+KM_PER_DEG = 111.2
+
+# Jumlah jam maksimum per jendela animasi, dan anggaran cache medan
+MAX_FRAMES = 168
+FIELD_CACHE_MB = 64
+
+
+def station_table(stations=None):
+    """Tabel koordinat stasiun (index stasiun, kolom lat, lon, Area_Type). stations: subset (None = semua)."""
+    table = pd.DataFrame.from_dict(STATION_COORDS, orient='index', columns=['lat', 'lon'])
+    table.index.name = 'station'
+    table['Area_Type'] = table.index.map(STATION_MAPPING)
+    if stations is not None:
+        missing = sorted(set(stations) - set(table.index))
+        if missing:
+            raise KeyError(f"Koordinat stasiun tidak diketahui: {', '.join(missing)}")
+        table = table.loc[list(stations)]
+    return table
+
+
+def idw_weights(grid_lat, grid_lon, station_lat, station_lon, power=IDW_POWER):
+    """Bobot IDW (belum dinormalisasi) untuk setiap sel grid x stasiun: array float32 (sel, stasiun)."""
+    lat, lon = np.meshgrid(grid_lat, grid_lon, indexing='ij')
+    lon_scale = np.cos(np.radians(np.mean(station_lat)))
+    dy = (lat.reshape(-1, 1) - np.asarray(station_lat)[None, :]) * KM_PER_DEG
+    dx = (lon.reshape(-1, 1) - np.asarray(station_lon)[None, :]) * KM_PER_DEG * lon_scale
+    distance = np.maximum(np.hypot(dx, dy), MIN_DISTANCE_KM)
+    return (distance ** -power).astype('float32')
+
+
+class IdwGrid:
+    """Grid lat/lon beserta matriks bobot IDW untuk sekumpulan stasiun (dihitung sekali)."""
+
+    def __init__(self, stations=None, shape=GRID_SHAPE, power=IDW_POWER, margin=GRID_MARGIN_DEG):
+        coords = station_table(stations)
+        self.stations = coords.index.tolist()
+        self.coords = coords
+        self.shape = tuple(shape)
+        self.power = power
+        self.lat = np.linspace(coords['lat'].min() - margin, coords['lat'].max() + margin, self.shape[0])
+        self.lon = np.linspace(coords['lon'].min() - margin, coords['lon'].max() + margin, self.shape[1])
+        self.weights = idw_weights(self.lat, self.lon, coords['lat'], coords['lon'], power)
+
+    def __getstate__(self):
+        # Matriks bobot tidak ikut di-pickle (job render per frame, lihat render_executor.py): dihitung ulang
+        state = self.__dict__.copy()
+        del state['weights']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.weights = idw_weights(self.lat, self.lon, self.coords['lat'], self.coords['lon'], self.power)
+
+    @property
+    def extent(self):
+        """Batas grid untuk imshow: (bujur kiri, bujur kanan, lintang bawah, lintang atas)."""
+        return self.lon[0], self.lon[-1], self.lat[0], self.lat[-1]
+
+    def fields(self, values):
+        """
+        Medan IDW untuk nilai stasiun `values` (frame, stasiun; urutan self.stations, NaN = tidak ada data):
+        array float32 (frame, baris lintang, kolom bujur). Sel tanpa stasiun valid pada frame itu bernilai NaN.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype='float32'))
+        valid = ~np.isnan(values)
+        # Dua perkalian matriks batch: semua frame sekaligus
+        numerator = np.where(valid, values, 0.0).astype('float32') @ self.weights.T
+        denominator = valid.astype('float32') @ self.weights.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            field = np.where(denominator > 0, numerator / denominator, np.nan).astype('float32')
+        return field.reshape((len(values),) + self.shape)
+
+
+def hourly_matrix(station_frame, col, stations):
+    """Nilai per jam `col` sebagai DataFrame (index jam, kolom stasiun sesuai urutan `stations`), float32."""
+    table = pd.DataFrame({
+        'time': station_frame.index,
+        'station': station_frame['station'].astype(str).to_numpy(),
+        'value': station_frame[col].to_numpy('float32'),
+    }).pivot_table(index='time', columns='station', values='value', aggfunc='first', dropna=False)
+    return table.reindex(columns=stations).astype('float32')
+
+
+class SpatialFields:
+    """
+    Medan IDW untuk data per jam per stasiun (station_frame): matriks per jam per variabel disiapkan
+    sekali (lazy), medan jendela waktu disimpan di cache LRU dan permintaan serentak digabung (single-flight).
+    """
+
+    def __init__(self, station_frame, shape=GRID_SHAPE, power=IDW_POWER, budget_mb=FIELD_CACHE_MB):
+        stations = sorted(set(station_frame['station'].astype(str).unique()) & set(STATION_COORDS))
+        self.frame = station_frame
+        self.grid = IdwGrid(stations, shape, power)
+        self.budget_bytes = int(budget_mb * 1024 ** 2)
+        self._hourly = {}
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.flight = SingleFlight('spatial_fields')
+        self.hits = 0
+        self.misses = 0
+
+    def hourly(self, col):
+        """Matriks per jam (jam x stasiun) untuk variabel `col` (sekali per variabel)."""
+        table = self._hourly.get(col)
+        if table is None:
+            table = self.flight.do(('hourly', col), lambda: hourly_matrix(self.frame, col, self.grid.stations))
+            self._hourly[col] = table
+        return table
+
+    def window(self, col, start, hours, hourly=False, stations=None):
+        """
+        Medan IDW `col` untuk jendela [start, start + hours jam).
+        hourly=False: satu medan dari rata-rata jendela setiap stasiun; True: satu medan per jam (maks. MAX_FRAMES).
+        stations: stasiun yang dipakai (mis. satu Tipe Area; None = semua).
+        Mengembalikan (waktu frame, medan (frame, lintang, bujur), nilai stasiun DataFrame (frame x stasiun)).
+        """
+        start = pd.Timestamp(start).floor('h')
+        hours = min(int(hours), MAX_FRAMES) if hourly else int(hours)
+        stations = tuple(self.grid.stations if stations is None else [s for s in self.grid.stations if s in stations])
+        key = (col, start, hours, bool(hourly), stations)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        return self.flight.do(key, lambda: self._compute(key))
+
+    def _compute(self, key):
+        col, start, hours, hourly, stations = key
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+
+        with span('idw_fields', variable=col, hours=hours, hourly=hourly) as s:
+            values = self.hourly(col).loc[start:start + pd.Timedelta(hours=hours - 1)].copy()
+            # Stasiun di luar pilihan dianggap tidak bernilai (dikeluarkan oleh normalisasi per frame)
+            values.loc[:, ~values.columns.isin(stations)] = np.nan
+            if not hourly:
+                with np.errstate(all='ignore'):
+                    values = values.mean().to_frame(start).T
+            fields = self.grid.fields(values.to_numpy())
+            s.set(frames=len(fields))
+
+        result = (values.index, fields, values)
+        size = fields.nbytes + int(values.memory_usage(deep=True).sum())
+        with self._lock:
+            self._entries[key] = result
+            self._nbytes += size
+            while self._nbytes > self.budget_bytes and len(self._entries) > 1:
+                _, (_, old_fields, old_values) = self._entries.popitem(last=False)
+                self._nbytes -= old_fields.nbytes + int(old_values.memory_usage(deep=True).sum())
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'MB': round(self._nbytes / 1024 ** 2, 2),
+                'hits': self.hits,
+                'misses': self.misses,
+                'grid': self.grid.shape,
+                **self.flight.stats(),
+            }
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Medan IDW per jam: satu matvec per jam vs. satu matmul batch.")
+    parser.add_argument('--variable', default='PM2.5')
+    parser.add_argument('--start', default='2015-12-20')
+    parser.add_argument('--hours', type=int, default=MAX_FRAMES)
+    parser.add_argument('--grid', type=int, nargs=2, default=GRID_SHAPE, metavar=('BARIS', 'KOLOM'))
+    args = parser.parse_args()
+
+    from pipeline import load_station_frame
+
+    station_frame = load_station_frame(base_path)
+    if station_frame is None:
+        raise SystemExit("Interpolasi spasial membutuhkan store Parquet (main_data_store/).")
+
+    started = time.perf_counter()
+    spatial = SpatialFields(station_frame, shape=args.grid)
+    values = spatial.hourly(args.variable).loc[pd.Timestamp(args.start):].iloc[:args.hours].to_numpy()
+    prepared = time.perf_counter()
+    per_hour = np.stack([spatial.grid.fields(row)[0] for row in values])
+    looped = time.perf_counter()
+    batched = spatial.grid.fields(values)
+    done = time.perf_counter()
+
+    print(f"Grid {spatial.grid.shape[0]}x{spatial.grid.shape[1]}, {len(spatial.grid.stations)} stasiun, "
+          f"{len(values)} jam | persiapan {prepared - started:.2f} detik")
+    print(f"  matvec per jam : {(looped - prepared) * 1000:8.1f} ms")
+    print(f"  matmul batch   : {(done - looped) * 1000:8.1f} ms (selisih maks {np.nanmax(np.abs(per_hour - batched)):.2e})")
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#     SAPUAN AMBANG STAGNASI (WSPM) DALAM SATU PASS VEKTOR
+# =========================================================
+# PB 4 mendefinisikan stagnasi sebagai WSPM < ambang (default 3.2 m/s). Untuk
+# melihat sensitivitas rasio PM2.5 Stagnan/Normal terhadap ambang tersebut,
+# subset data diurutkan sekali menurut WSPM; untuk ambang t, baris stagnan
+# adalah prefiks hasil urutan (searchsorted), sehingga jumlah & rata-rata PM2.5
+# di kedua sisi untuk SEMUA ambang diperoleh dari jumlah kumulatif -- O(n log n)
+# total, bukan satu groupby per ambang.
+
+# Rentang & langkah ambang untuk slider dashboard (m/s)
+THRESHOLD_MIN = 0.5
+THRESHOLD_MAX = 8.0
+THRESHOLD_STEP = 0.1
+
+# Minimal jam per sisi agar rasio dianggap bermakna
+MIN_HOURS = 24
+
+
+def stagnation_sweep(wspm, pm25, thresholds=None):
+    """
+    Rasio PM2.5 Stagnan (WSPM < t) / Normal untuk setiap ambang t.
+    Baris dengan WSPM kosong selalu dihitung Normal (sama dengan WSPM < t pada NaN);
+    PM2.5 kosong tidak ikut dirata-rata. thresholds: None = semua nilai WSPM unik (kurva eksak).
+    Mengembalikan DataFrame per ambang: n_stagnant, n_normal, pm25_stagnant, pm25_normal,
+    share_stagnant (fraksi jam stagnan), ratio (NaN jika salah satu sisi < MIN_HOURS jam).
+    """
+    pm25 = np.asarray(pm25, dtype='float64')
+    valid = ~np.isnan(pm25)
+    return stagnation_sweep_totals(wspm, valid, np.where(valid, pm25, 0.0), thresholds)
+
+
+def stagnation_sweep_totals(wspm, counts, sums, thresholds=None):
+    """
+    Sapuan yang sama dari jumlah jam ber-PM2.5 (`counts`) dan total PM2.5 (`sums`) per nilai `wspm`,
+    mis. hasil GROUP BY WSPM di backend SQL (satu baris per nilai, bukan per jam).
+    """
+    data_dtype = np.asarray(wspm).dtype
+    wspm = np.asarray(wspm, dtype='float64')
+
+    # Urutkan sekali; NaN WSPM berada di akhir sehingga tidak pernah masuk prefiks stagnan
+    order = np.argsort(wspm, kind='stable')
+    wspm_sorted = wspm[order]
+
+    cum_n = np.concatenate([[0], np.cumsum(np.asarray(counts, dtype='int64')[order])])
+    cum_sum = np.concatenate([[0.0], np.cumsum(np.asarray(sums, dtype='float64')[order])])
+    total_n, total_sum = cum_n[-1], cum_sum[-1]
+
+    if thresholds is None:
+        thresholds = np.unique(wspm_sorted[~np.isnan(wspm_sorted)])
+    thresholds = np.asarray(thresholds, dtype='float64')
+    # Ambang dibandingkan pada presisi data WSPM (mis. float32): nilai tercatat 3.3 tidak dihitung < 3.3
+    search = thresholds.astype(data_dtype).astype('float64') if np.issubdtype(data_dtype, np.floating) else thresholds
+
+    # Jumlah baris dengan WSPM < t untuk setiap ambang
+    k = np.searchsorted(wspm_sorted, search, side='left')
+    n_stagnant = cum_n[k]
+    n_normal = total_n - n_stagnant
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pm25_stagnant = cum_sum[k] / n_stagnant
+        pm25_normal = (total_sum - cum_sum[k]) / n_normal
+        share = n_stagnant / total_n
+
+    sweep = pd.DataFrame({
+        'n_stagnant': n_stagnant,
+        'n_normal': n_normal,
+        'pm25_stagnant': pm25_stagnant,
+        'pm25_normal': pm25_normal,
+        'share_stagnant': share,
+    }, index=pd.Index(thresholds, name='threshold'))
+    enough = (sweep['n_stagnant'] >= MIN_HOURS) & (sweep['n_normal'] >= MIN_HOURS) & (sweep['pm25_normal'] != 0)
+    sweep['ratio'] = (sweep['pm25_stagnant'] / sweep['pm25_normal']).where(enough)
+    return sweep
+
+
+def threshold_grid(start=THRESHOLD_MIN, stop=THRESHOLD_MAX, step=THRESHOLD_STEP):
+    """Grid ambang untuk slider (dibulatkan agar cocok dengan nilai slider)."""
+    return np.round(np.arange(start, stop + step / 2, step), 2)
@@ -0,0 +1,189 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#        CUBE STATISTIK ADITIF (PRE-AGREGASI DASHBOARD)
+# =========================================================
+# Setiap sel cube menyimpan count, sum, sum of squares, dan co-moment
+# (cross-product) per pasangan polutan. Karena semua statistik aditif,
+# metrik PB 1-4 cukup dihitung dengan mereduksi (menjumlahkan) sel cube
+# yang lolos filter, tanpa memindai data per baris.
+
+CUBE_KEYS = ['station', 'Area_Type', 'year', 'month', 'Season', 'Pre_CAAP', 'Is_Stagnant']
+CUBE_COLS = ['PM2.5', 'NO2', 'SO2', 'O3', 'WSPM']
+CUBE_PAIRS = list(combinations(CUBE_COLS, 2))
+
+
+def _pair_name(x, y):
+    return f'{x}|{y}'
+
+
+def _stat_columns(cube):
+    return [col for col in cube.columns if ':' in col]
+
+
+def build_cube(df):
+    """
+    Membangun cube statistik dari data per baris (index datetime).
+    Kunci: CUBE_KEYS yang tersedia (month diambil dari index jika tidak ada kolomnya).
+    """
+    keys = {}
+    for key in CUBE_KEYS:
+        if key in df.columns:
+            keys[key] = df[key].to_numpy()
+        elif key == 'month' and isinstance(df.index, pd.DatetimeIndex):
+            keys[key] = df.index.month.to_numpy()
+
+    values = {col: df[col].to_numpy(dtype='float64') for col in CUBE_COLS if col in df.columns}
+    valid = {col: ~np.isnan(arr) for col, arr in values.items()}
+    filled = {col: np.where(valid[col], arr, 0.0) for col, arr in values.items()}
+
+    stats = {}
+    for col in values:
+        stats[f'n:{col}'] = valid[col].astype('int64')
+        stats[f'sum:{col}'] = filled[col]
+        stats[f'sumsq:{col}'] = filled[col] ** 2
+
+    # Co-moment dihitung hanya pada baris yang valid di kedua kolom (pairwise complete)
+    for x, y in CUBE_PAIRS:
+        if x not in values or y not in values:
+            continue
+        both = valid[x] & valid[y]
+        px = np.where(both, filled[x], 0.0)
+        py = np.where(both, filled[y], 0.0)
+        name = _pair_name(x, y)
+        stats[f'n:{name}'] = both.astype('int64')
+        stats[f'sx:{name}'] = px
+        stats[f'sy:{name}'] = py
+        stats[f'sxx:{name}'] = px ** 2
+        stats[f'syy:{name}'] = py ** 2
+        stats[f'sxy:{name}'] = px * py
+
+    df_stats = pd.DataFrame(stats)
+    group_keys = [pd.Series(arr, name=key) for key, arr in keys.items()]
+    cube = df_stats.groupby(group_keys, observed=True, sort=True).sum().reset_index()
+    return cube
+
+
+def merge_cubes(cubes):
+    """
+    Menggabungkan beberapa cube parsial (mis. dari potongan data berbeda) menjadi satu cube.
+    Sel dengan kunci yang sama dijumlahkan; hasilnya sama dengan build_cube pada seluruh data.
+    """
+    cubes = [cube for cube in cubes if cube is not None]
+    if len(cubes) == 1:
+        return cubes[0]
+
+    combined = pd.concat(cubes, ignore_index=True)
+    keys = [col for col in combined.columns if ':' not in col]
+    stats = combined[_stat_columns(combined)]
+    return stats.groupby([combined[key] for key in keys], observed=True, sort=True).sum().reset_index()
+
+
+def negate_cube(cube):
+    """Cube dengan statistik bertanda negatif: merge_cubes([cube, negate_cube(bagian)]) mengurangkan `bagian`."""
+    negated = cube.copy()
+    stats = _stat_columns(cube)
+    negated[stats] = -negated[stats]
+    return negated
+
+
+def drop_empty_cells(cube):
+    """Membuang sel tanpa observasi sama sekali (mis. setelah pengurangan dengan negate_cube)."""
+    counts = [f'n:{col}' for col in CUBE_COLS if f'n:{col}' in cube.columns]
+    return cube[(cube[counts] != 0).any(axis=1)].reset_index(drop=True)
+
+
+def select_cube(cube, filters=None):
+    """
+    Memilih sel cube sesuai filter {kolom_kunci: nilai atau list nilai}.
+    Nilai None atau 'Overall' berarti tanpa filter untuk kolom tersebut.
+    """
+    if not filters:
+        return cube
+
+    mask = np.ones(len(cube), dtype=bool)
+    for col, val in filters.items():
+        if val is None or (isinstance(val, str) and val == 'Overall'):
+            continue
+        if isinstance(val, (list, tuple, set)):
+            mask &= cube[col].isin(list(val)).to_numpy()
+        else:
+            mask &= (cube[col] == val).to_numpy()
+    return cube[mask]
+
+
+def reduce_cube(cube, by=None):
+    """Menjumlahkan statistik cube per kelompok `by` (None = satu total)."""
+    stats = cube[_stat_columns(cube)]
+    if not by:
+        return stats.sum().to_frame().T
+    return stats.groupby([cube[col] for col in by], observed=True).sum()
+
+
+def means(reduced, cols=CUBE_COLS):
+    """Rata-rata (sum / count) per kolom dari cube yang sudah direduksi."""
+    result = pd.DataFrame(index=reduced.index)
+    for col in cols:
+        count = reduced[f'n:{col}'].astype('float64')
+        result[col] = reduced[f'sum:{col}'] / count.where(count > 0)
+    return result
+
+
+def pearson(reduced, x, y):
+    """Koefisien korelasi Pearson (r) antara x dan y dari co-moment cube."""
+    if (x, y) not in CUBE_PAIRS:
+        x, y = y, x
+    name = _pair_name(x, y)
+
+    n = reduced[f'n:{name}'].astype('float64')
+    n = n.where(n > 1)
+    cov = reduced[f'sxy:{name}'] - reduced[f'sx:{name}'] * reduced[f'sy:{name}'] / n
+    var_x = reduced[f'sxx:{name}'] - reduced[f'sx:{name}'] ** 2 / n
+    var_y = reduced[f'syy:{name}'] - reduced[f'sy:{name}'] ** 2 / n
+    return cov / np.sqrt(var_x * var_y)
+
+
+# =========================================================
+#           METRIK PB 1-4 BERBASIS CUBE
+# =========================================================
+
+def annual_means(cube, cols, filters=None):
+    """PB 1: Rata-rata tahunan polutan untuk sel cube yang difilter."""
+    return means(reduce_cube(select_cube(cube, filters), by=['year']), cols)
+
+
+def caap_evaluation(cube, cols, filters=None):
+    """
+    PB 1 & 2: Rata-rata tahunan Pasca-CAAP, baseline Pra-CAAP, dan persentase perubahan.
+    Mengembalikan (df_post_caap_annual, df_pre_caap_baseline, df_annual_change).
+    """
+    cube_filtered = select_cube(cube, filters)
+
+    df_post_caap_annual = means(
+        reduce_cube(select_cube(cube_filtered, {'Pre_CAAP': False}), by=['year']), cols
+    )
+    df_pre_caap_baseline = means(reduce_cube(select_cube(cube_filtered, {'Pre_CAAP': True})), cols)
+    return caap_change(df_post_caap_annual, df_pre_caap_baseline)
+
+
+def caap_change(df_post_caap_annual, df_pre_caap_baseline):
+    """PB 2: Persentase perubahan rata-rata tahunan Pasca-CAAP terhadap baseline Pra-CAAP (satu baris)."""
+    df_pre_caap_baseline.index = [2013]
+    baseline_values = df_pre_caap_baseline.iloc[0]
+
+    df_annual_change = ((df_post_caap_annual - baseline_values) / baseline_values) * 100
+    df_annual_change.index.name = 'year'
+    return df_post_caap_annual, df_pre_caap_baseline, df_annual_change
+
+
+def correlation_by(cube, x, y, by, filters=None):
+    """PB 3: Korelasi Pearson x vs y per kelompok `by` (mis. per tahun musim panas)."""
+    return pearson(reduce_cube(select_cube(cube, filters), by=by), x, y)
+
+
+def stagnation_means(cube, filters=None):
+    """PB 4: Rata-rata PM2.5 dan WSPM per kondisi Is_Stagnant."""
+    return means(reduce_cube(select_cube(cube, filters), by=['Is_Stagnant']), ['PM2.5', 'WSPM'])
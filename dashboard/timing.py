@@ -0,0 +1,198 @@
+import datetime
+import json
+import os
+import platform
+import threading
+import time
+
+# =========================================================
+#       INSTRUMENTASI HOT PATH (SPAN WAKTU PER RERUN)
+# =========================================================
+# Span bernama di sekitar setiap tahap skrip (load, filter/compute, agregasi,
+# plot, rasterisasi) dengan jumlah baris dan delta memori (RSS). Span dari satu
+# rerun dikumpulkan menjadi satu record, ditulis sebagai satu baris JSON
+# (JSON-lines) dan dapat ditampilkan di panel debug sidebar.
+#
+# Aktif hanya jika DASHBOARD_TRACE=1. Saat nonaktif, span() mengembalikan
+# objek no-op bersama sehingga biayanya hanya satu pemanggilan fungsi.
+
+TRACE_ENV = 'DASHBOARD_TRACE'
+TRACE_FILE_ENV = 'DASHBOARD_TRACE_FILE'
+
+ENABLED = os.environ.get(TRACE_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+TRACE_FILE = os.environ.get(TRACE_FILE_ENV) or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'dashboard_trace.jsonl'
+)
+
+MB = 1024 ** 2
+
+_local = threading.local()
+_file_lock = threading.Lock()
+
+
+def current_rss():
+    """
+    RSS proses saat ini (byte). Linux: /proc/self/statm, POSIX lain: ru_maxrss sebagai pendekatan,
+    None jika tidak tersedia (mis. Windows tanpa modul resource).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource  # Hanya POSIX
+    except ImportError:
+        return None
+    # ru_maxrss: KB di Linux, byte di macOS
+    scale = 1 if platform.system() == 'Darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def rss_mb(start=None):
+    """RSS saat ini (MB), atau selisihnya terhadap `start` (byte, dari current_rss). None jika RSS tidak tersedia."""
+    rss = current_rss()
+    if rss is None:
+        return None
+    return round((rss - (start or 0)) / MB, 3)
+
+
+def row_count(obj):
+    """Jumlah baris objek (DataFrame/Series/array/list), None jika tidak relevan."""
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+class _NullSpan:
+    """Span no-op (tracing nonaktif atau di luar rerun)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Satu span waktu: durasi, delta RSS, dan atribut (mis. rows, cache hit)."""
+
+    def __init__(self, trace, name, attrs):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.depth = len(self.trace['stack'])
+        self.trace['stack'].append(self.name)
+        self.rss_start = current_rss()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        self.trace['stack'].pop()
+        record = {
+            'name': self.name,
+            'depth': self.depth,
+            'start_ms': round((self.start - self.trace['start']) * 1000, 3),
+            'duration_ms': round(duration * 1000, 3),
+            'rss_delta_mb': rss_mb(self.rss_start) if self.rss_start is not None else None,
+            **self.attrs,
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        self.trace['spans'].append(record)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    """Context manager span `name` pada rerun aktif (no-op jika tracing nonaktif)."""
+    if not ENABLED:
+        return NULL_SPAN
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return NULL_SPAN
+    return Span(trace, name, attrs)
+
+
+def begin_rerun():
+    """Memulai pengumpulan span untuk rerun di thread ini."""
+    if not ENABLED:
+        return
+    _local.trace = {
+        'start': time.perf_counter(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='milliseconds'),
+        'rss_start': current_rss(),
+        'stack': [],
+        'spans': [],
+    }
+
+
+def end_rerun(**attrs):
+    """
+    Menutup rerun aktif: menulis record ke TRACE_FILE (JSON-lines) dan mengembalikannya.
+    attrs: informasi tambahan (mis. halaman, filter). None jika tracing nonaktif.
+    """
+    trace = getattr(_local, 'trace', None)
+    if not ENABLED or trace is None:
+        return None
+    _local.trace = None
+
+    record = {
+        'timestamp': trace['timestamp'],
+        'total_ms': round((time.perf_counter() - trace['start']) * 1000, 3),
+        'rss_mb': rss_mb(),
+        'rss_delta_mb': rss_mb(trace['rss_start']) if trace['rss_start'] is not None else None,
+        **attrs,
+        'spans': trace['spans'],
+    }
+
+    try:
+        with _file_lock, open(TRACE_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+    except OSError:
+        # Gagal menulis file trace tidak boleh menghentikan dashboard
+        pass
+    return record
+
+
+def read_trace(path=TRACE_FILE):
+    """Membaca file JSON-lines menjadi DataFrame satu baris per span (untuk agregasi)."""
+    import pandas as pd
+
+    rows = []
+    with open(path, encoding='utf-8') as f:
+        for rerun_id, line in enumerate(f):
+            record = json.loads(line)
+            meta = {k: v for k, v in record.items() if k != 'spans'}
+            for span_record in record['spans']:
+                rows.append({'rerun': rerun_id, **{f'rerun_{k}': v for k, v in meta.items()}, **span_record})
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ringkasan file trace dashboard (JSON-lines).")
+    parser.add_argument('path', nargs='?', default=TRACE_FILE)
+    args = parser.parse_args()
+
+    df = read_trace(args.path)
+    # Span plot/compute dirinci per nama plot/node
+    label = df['name']
+    for col in ('plot', 'node'):
+        if col in df.columns:
+            label = label.where(df[col].isna(), label + ':' + df[col].astype(str))
+    summary = df.groupby(label)['duration_ms'].describe(percentiles=[0.5, 0.95])
+    print(summary.sort_values('mean', ascending=False).round(2).to_string())
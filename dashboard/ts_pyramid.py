@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#   PIRAMIDA MULTI-RESOLUSI DERET WAKTU PER JAM + LTTB
+# =========================================================
+# Untuk setiap stasiun dan variabel disiapkan empat level: per jam (data asli),
+# harian, mingguan, dan bulanan (min/mean/max). Query rentang waktu memilih
+# level paling halus yang jumlah titiknya masih wajar, lalu menurunkannya
+# ke ~MAX_POINTS titik dengan LTTB (Largest-Triangle-Three-Buckets) untuk
+# garis rata-rata dan min/max per bucket untuk pita envelope -- sehingga
+# setiap tampilan (zoom apa pun) hanya menggambar ~2 ribu titik.
+
+# Level dari paling halus ke paling kasar: nama -> frekuensi resample (None = data asli)
+PYRAMID_LEVELS = {
+    'Per Jam': None,
+    'Harian': 'D',
+    'Mingguan': 'W-MON',
+    'Bulanan': 'MS',
+}
+PYRAMID_STATS = ['min', 'mean', 'max']
+
+# Jumlah titik maksimum yang digambar per tampilan
+MAX_POINTS = 2000
+# Level dipakai jika jumlah titiknya di rentang terpilih <= MAX_POINTS x faktor ini
+LEVEL_OVERSAMPLE = 8
+
+
+def build_pyramid(frame, columns, station_col='station'):
+    """
+    Membangun piramida {level: {stasiun: DataFrame}} dari data per jam (index datetime).
+    Level 'Per Jam' berisi nilai asli; level lain berkolom MultiIndex (variabel, min/mean/max).
+    """
+    columns = [col for col in columns if col in frame.columns]
+    pyramid = {level: {} for level in PYRAMID_LEVELS}
+
+    for station, df_station in frame.groupby(station_col, observed=True, sort=True):
+        df_station = df_station[columns].sort_index().astype('float32')
+        for level, freq in PYRAMID_LEVELS.items():
+            if freq is None:
+                pyramid[level][station] = df_station
+            else:
+                table = df_station.resample(freq, label='left', closed='left').agg(PYRAMID_STATS)
+                pyramid[level][station] = table.dropna(how='all').astype('float32')
+    return pyramid
+
+
+def lttb(x, y, n_out):
+    """
+    Indeks titik terpilih Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+    Titik pertama & terakhir selalu dipertahankan; NaN pada y diabaikan saat memilih.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    # Batas bucket untuk titik tengah (n - 2 titik dibagi menjadi n_out - 2 bucket)
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype('int64') + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Rata-rata bucket berikutnya (bucket terakhir: titik terakhir)
+        if i == n_out - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            next_y = y[hi:edges[i + 2]]
+            avg_x = x[hi:edges[i + 2]].mean()
+            avg_y = next_y[~np.isnan(next_y)].mean() if not np.isnan(next_y).all() else y[a]
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        area = np.nan_to_num(area, nan=-1.0)
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def query_pyramid(pyramid, station, col, start=None, end=None, max_points=MAX_POINTS):
+    """
+    Data untuk satu tampilan: level paling halus yang memadai untuk rentang [start, end].
+    Mengembalikan (line, envelope, level):
+    - line: Series rata-rata (<= max_points titik, LTTB bila perlu)
+    - envelope: DataFrame min/max per bucket (index waktu awal bucket), None untuk data per jam tanpa downsampling
+    """
+    for level in PYRAMID_LEVELS:
+        table = pyramid[level].get(station)
+        if table is None:
+            return pd.Series(dtype='float32'), None, level
+        window = table.loc[start:end]
+        if len(window) <= max_points * LEVEL_OVERSAMPLE:
+            break
+
+    if PYRAMID_LEVELS[level] is None:
+        mean = window[col]
+        low = high = mean
+    else:
+        mean, low, high = (window[(col, stat)] for stat in ('mean', 'min', 'max'))
+
+    if len(mean) <= max_points:
+        envelope = None if PYRAMID_LEVELS[level] is None else pd.DataFrame({'min': low, 'max': high})
+        return mean, envelope, level
+
+    x = mean.index.asi8.astype('float64')
+    idx = lttb(x, mean.to_numpy(), max_points)
+    line = mean.iloc[idx]
+
+    # Envelope: min/max asli di setiap bucket di antara titik LTTB
+    starts = np.unique(np.concatenate([[0], idx[1:-1]]))
+    envelope = pd.DataFrame({
+        'min': np.fmin.reduceat(low.to_numpy(), starts),
+        'max': np.fmax.reduceat(high.to_numpy(), starts),
+    }, index=mean.index[starts])
+    return line, envelope, level
@@ -0,0 +1,269 @@
+import argparse
+import ast
+import datetime
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# =========================================================
+#     COLD START CEPAT: IMPORT TERTUNDA & SNAPSHOT HANGAT
+# =========================================================
+# Worker Streamlit baru (deploy/autoscale) tidak perlu lagi menunggu import
+# matplotlib/seaborn dan pembangunan ulang semua agregasi:
+# - lazy_import: modul plot baru dimuat saat grafik pertama dirender.
+# - Snapshot: data siap pakai (frame Feather tanpa kompresi, dibaca lewat
+#   memory map) dan agregasi statis (pickle) disimpan per versi data + versi
+#   kode; worker baru langsung memuatnya jika versinya cocok.
+# - Time-to-first-paint: waktu dari awal proses/rerun hingga judul halaman
+#   tampil dicatat dan dilaporkan (panel debug & `python warm_start.py`).
+
+SNAPSHOT_DIRNAME = 'warm_snapshot'
+SNAPSHOT_ENV = 'DASHBOARD_SNAPSHOT'
+# Naikkan jika struktur dict metrik berubah tanpa perubahan kode modul sumber snapshot
+SNAPSHOT_FORMAT = 1
+# Modul akar isi snapshot (load_dataset/build_metrics). Versi kode adalah hash modul ini beserta
+# semua modul lokal yang diimpornya secara transitif (mis. ingest.py untuk STAGNANT_WSPM & musim),
+# sehingga perubahan kode mana pun yang memengaruhi agregasi membatalkan snapshot lama.
+SNAPSHOT_ROOTS = ['pipeline.py', 'shared_data.py']
+
+FRAME_FILE = 'frame.feather'
+AGGREGATES_FILE = 'aggregates.pkl'
+META_FILE = 'meta.json'
+
+ENABLED = os.environ.get(SNAPSHOT_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+_first_paint = {}
+
+
+def lazy_import(name):
+    """Modul yang baru benar-benar diimpor saat atributnya pertama kali diakses."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# ---------------------------------------------------------
+# Snapshot versi data + versi kode
+# ---------------------------------------------------------
+
+def _is_main_block(node):
+    """True untuk blok `if __name__ == '__main__':` (kode CLI, tidak memengaruhi isi snapshot)."""
+    return (
+        isinstance(node, ast.If) and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name) and node.test.left.id == '__name__'
+    )
+
+
+def local_imports(path, base_path):
+    """Nama file modul lokal (di base_path) yang diimpor oleh modul `path` (termasuk di dalam fungsi, kecuali blok CLI)."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    nodes = (node for statement in tree.body if not _is_main_block(statement) for node in ast.walk(statement))
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module.split('.')[0])
+    return {f'{name}.py' for name in names if os.path.isfile(os.path.join(base_path, f'{name}.py'))}
+
+
+def snapshot_sources(base_path=os.path.dirname(os.path.abspath(__file__))):
+    """SNAPSHOT_ROOTS beserta semua modul lokal yang diimpornya secara transitif (terurut)."""
+    sources, pending = set(), list(SNAPSHOT_ROOTS)
+    while pending:
+        name = pending.pop()
+        if name in sources:
+            continue
+        sources.add(name)
+        pending.extend(local_imports(os.path.join(base_path, name), base_path) - sources)
+    return sorted(sources)
+
+
+def code_version(base_path=os.path.dirname(os.path.abspath(__file__))):
+    """Hash isi modul sumber snapshot (snapshot_sources) + SNAPSHOT_FORMAT."""
+    digest = hashlib.sha1(str(SNAPSHOT_FORMAT).encode('utf-8'))
+    for name in snapshot_sources(base_path):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(base_path, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def snapshot_key(data_version):
+    """Kunci snapshot: versi data + versi kode + versi pandas (format pickle)."""
+    raw = f'{data_version}|{code_version()}|{pd.__version__}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def save_snapshot(metrics, snapshot_dir):
+    """
+    Menyimpan metrik (dict build_metrics) sebagai snapshot untuk versi datanya. Ditulis ke folder
+    sementara lalu di-rename (aman bila beberapa worker menulis bersamaan). Mengembalikan path.
+    """
+    dataset = metrics['dataset']
+    key = snapshot_key(dataset.version)
+    target = os.path.join(snapshot_dir, key)
+    if os.path.isdir(target):
+        return target
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f'.{key}-', dir=snapshot_dir)
+    try:
+        frame = dataset.frame
+        index_name = frame.index.name or 'datetime'
+        feather.write_feather(frame.reset_index(names=index_name), os.path.join(tmp_dir, FRAME_FILE),
+                              compression='uncompressed')
+        aggregates = {name: value for name, value in metrics.items() if name != 'dataset'}
+        with open(os.path.join(tmp_dir, AGGREGATES_FILE), 'wb') as f:
+            pickle.dump(aggregates, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'key': key,
+                'data_version': dataset.version,
+                'code_version': code_version(),
+                'index': index_name,
+                'rows': len(frame),
+                'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            }, f, indent=1)
+        os.rename(tmp_dir, target)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.isdir(target):
+            raise
+
+    # Snapshot versi lama tidak akan pernah dipakai lagi
+    for name in os.listdir(snapshot_dir):
+        if name != key and not name.startswith('.'):
+            shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+    return target
+
+
+def load_snapshot(snapshot_dir, data_version):
+    """
+    Memuat snapshot untuk `data_version` (versi kode saat ini): (df_full, dict agregat),
+    atau None jika belum ada / tidak cocok / rusak.
+    """
+    path = os.path.join(snapshot_dir, snapshot_key(data_version))
+    try:
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('data_version') != data_version:
+            return None
+        with pa.memory_map(os.path.join(path, FRAME_FILE)) as source:
+            df_full = feather.read_table(source).to_pandas().set_index(meta['index'])
+        with open(os.path.join(path, AGGREGATES_FILE), 'rb') as f:
+            aggregates = pickle.load(f)
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, pa.ArrowException):
+        return None
+    return df_full, aggregates
+
+
+# ---------------------------------------------------------
+# Time-to-first-paint
+# ---------------------------------------------------------
+
+def process_start_time():
+    """Waktu mulai proses (epoch detik). Linux: /proc/self/stat, selain itu waktu import modul ini."""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/stat') as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith('btime'))
+        return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return _MODULE_LOADED
+
+
+_MODULE_LOADED = time.time()
+
+
+def mark_first_paint(rerun_started):
+    """
+    Mencatat first paint rerun ini (perf_counter saat skrip mulai). Mengembalikan dict:
+    rerun_ms (awal skrip -> paint) dan, hanya pada paint pertama proses, process_s (awal proses -> paint).
+    """
+    result = {'rerun_ms': round((time.perf_counter() - rerun_started) * 1000, 1)}
+    if not _first_paint:
+        _first_paint['process_s'] = round(time.time() - process_start_time(), 3)
+        result['process_s'] = _first_paint['process_s']
+    return result
+
+
+def first_paint_info():
+    """First paint proses ini (awal proses -> paint pertama, detik); kosong sebelum paint pertama."""
+    return dict(_first_paint)
+
+
+# ---------------------------------------------------------
+# Laporan cold start (subprocess baru per skenario)
+# ---------------------------------------------------------
+
+def _first_run(script, snapshot):
+    """Satu run pertama dashboard di proses baru (AppTest); membaca first paint dari file trace."""
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_file = os.path.join(tmp, 'trace.jsonl')
+        env = {
+            **os.environ, 'DASHBOARD_TRACE': '1', 'DASHBOARD_TRACE_FILE': trace_file,
+            SNAPSHOT_ENV: '1' if snapshot else '0',
+        }
+        code = (
+            "import time; t = time.perf_counter()\n"
+            "from streamlit.testing.v1 import AppTest\n"
+            f"AppTest.from_file({script!r}, default_timeout=600).run()\n"
+            "print(round(time.perf_counter() - t, 3))"
+        )
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        with open(trace_file, encoding='utf-8') as f:
+            record = json.loads(f.readline())
+    spans = {s['name']: s['duration_ms'] for s in record['spans'] if s['depth'] == 0}
+    return {
+        'first_paint_ms': record.get('first_paint_ms'),
+        'load_data_ms': spans.get('load_data'),
+        'rerun_ms': record['total_ms'],
+        'run_total_s': float(output.stdout.strip().splitlines()[-1]),
+    }
+
+
+if __name__ == '__main__':
+    base_path = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description="Membangun snapshot hangat dan mengukur time-to-first-paint dashboard.")
+    parser.add_argument('--build', action='store_true', help="Hanya membangun snapshot untuk data saat ini.")
+    args = parser.parse_args()
+
+    from pipeline import build_metrics, dataset_version, load_dataset
+
+    snapshot_dir = os.path.join(base_path, SNAPSHOT_DIRNAME)
+    if args.build:
+        df_full, data_version = load_dataset(base_path)
+        print(f"Snapshot disimpan di: {save_snapshot(build_metrics(df_full, data_version), snapshot_dir)}")
+        sys.exit(0)
+
+    script = os.path.join(base_path, 'dashboard.py')
+    rows = {}
+    rows['Tanpa snapshot'] = _first_run(script, snapshot=False)
+    if load_snapshot(snapshot_dir, dataset_version(base_path)) is None:
+        df_full, data_version = load_dataset(base_path)
+        save_snapshot(build_metrics(df_full, data_version), snapshot_dir)
+    rows['Dengan snapshot'] = _first_run(script, snapshot=True)
+    report = pd.DataFrame(rows).T
+    print(f"Versi data: {dataset_version(base_path)} | snapshot: {snapshot_key(dataset_version(base_path))}")
+    print(report.to_string())
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+# =========================================================
+#      HISTOGRAM WIND ROSE PRA-HITUNG (PB 4)
+# =========================================================
+# Arah angin (wd) disimpan sekali sebagai kode sektor uint8 (0-15, 255 = NA).
+# Untuk setiap grup stasiun x tahun x musim dihitung tensor jumlah
+# [bin PM2.5, sektor arah, bin kecepatan]. Wind rose untuk kombinasi filter
+# apa pun cukup menjumlahkan tensor ini -- tanpa memindai data per baris.
+
+# 16 arah kardinal (urutan sektor searah jarum jam dari Utara)
+CARDINAL16 = ['N', 'NNE', 'NE', 'ENE', 'E', 'ESE', 'SE', 'SSE', 'S', 'SSW', 'SW', 'WSW', 'W', 'WNW', 'NW', 'NNW']
+N_SECTORS = len(CARDINAL16)
+WD_NA_CODE = 255
+
+# Bin kecepatan angin (batas bawah, bin terakhir terbuka ke atas) - sama dengan plot
+SPEED_BINS = np.arange(0, 10, 1)
+
+# Grid ambang PM2.5 (µg/m³). Ambang apa pun di grid ini dapat dipakai secara eksak,
+# termasuk kondisi Normal (< 75) dan Ekstrem (> 200).
+PM25_EDGES = np.arange(0, 1001, 25)
+
+# Kondisi PM2.5 yang digunakan di dashboard: (batas bawah eksklusif, batas atas eksklusif)
+PM25_CONDITIONS = {
+    'Normal': (None, 75),
+    'Extreme': (200, None),
+}
+
+HIST_KEYS = ['station', 'Area_Type', 'year', 'Season']
+
+
+def encode_wd(wd_series):
+    """
+    Mengonversi arah angin (kardinal atau derajat numerik) menjadi kode sektor uint8.
+    Nilai yang tidak dikenali / NA menjadi WD_NA_CODE.
+    """
+    # Konversi dilakukan pada nilai unik saja, lalu dipetakan kembali ke setiap baris
+    row_codes, uniques = pd.factorize(pd.Series(wd_series))
+    uniques = pd.Series(np.asarray(uniques, dtype='object'))
+    codes = uniques.map({d: i for i, d in enumerate(CARDINAL16)}).astype('float64')
+
+    # Mengisi nilai yang tersisa dengan mencoba konversi numerik (derajat) langsung
+    degrees = pd.to_numeric(uniques, errors='coerce')
+    sectors_from_deg = np.floor(((degrees % 360) + 180 / N_SECTORS) / (360 / N_SECTORS)) % N_SECTORS
+    codes = codes.fillna(sectors_from_deg).fillna(WD_NA_CODE).astype('uint8').to_numpy()
+
+    lookup = np.append(codes, np.uint8(WD_NA_CODE))
+    return lookup[row_codes]
+
+
+def sector_degrees():
+    """Derajat tengah setiap sektor (0, 22.5, ..., 337.5)."""
+    return np.arange(N_SECTORS) * (360 / N_SECTORS)
+
+
+def pm25_bin_codes(pm25):
+    """
+    Kode bin PM2.5: 2*i untuk nilai tepat sama dengan PM25_EDGES[i],
+    2*i + 1 untuk nilai di antara PM25_EDGES[i] dan PM25_EDGES[i+1] (atau di atas edge terakhir).
+    Dengan begitu ambang '<' maupun '>' pada grid dapat dihitung eksak. NA -> -1.
+    """
+    pm25 = np.asarray(pm25, dtype='float64')
+    idx = np.clip(np.searchsorted(PM25_EDGES, pm25, side='right') - 1, 0, None)
+    codes = 2 * idx + (PM25_EDGES[idx] != pm25)
+    return np.where(np.isnan(pm25), -1, codes)
+
+
+def n_pm25_bins():
+    return 2 * len(PM25_EDGES)
+
+
+def build_windrose_hist(df):
+    """
+    Membangun histogram wind rose dari data per baris.
+    Mengembalikan dict: 'keys' (DataFrame grup), 'counts' (array [grup, bin PM2.5, sektor, bin kecepatan]).
+    """
+    wd_sector = df['wd_sector'].to_numpy() if 'wd_sector' in df.columns else encode_wd(df['wd'])
+    wspm = df['WSPM'].to_numpy(dtype='float64')
+    speed_code = np.searchsorted(SPEED_BINS, wspm, side='right') - 1
+    pm_code = pm25_bin_codes(df['PM2.5'].to_numpy())
+
+    keys = [key for key in HIST_KEYS if key in df.columns]
+    grouped = df.groupby(keys, observed=True, sort=True)
+    group_code = grouped.ngroup().to_numpy()
+    group_keys = grouped.size().index.to_frame(index=False)
+
+    valid = (wd_sector != WD_NA_CODE) & (speed_code >= 0) & ~np.isnan(wspm) & (pm_code >= 0)
+
+    n_groups = len(group_keys)
+    n_pm = n_pm25_bins()
+    n_speed = len(SPEED_BINS)
+    flat = (
+        ((group_code[valid] * n_pm + pm_code[valid]) * N_SECTORS + wd_sector[valid].astype('int64')) * n_speed
+        + speed_code[valid]
+    )
+    counts = np.bincount(flat, minlength=n_groups * n_pm * N_SECTORS * n_speed)
+    counts = counts.astype(np.min_scalar_type(max(int(counts.max(initial=0)), 1)))
+
+    return {
+        'keys': group_keys,
+        'counts': counts.reshape(n_groups, n_pm, N_SECTORS, n_speed),
+    }
+
+
+def _pm25_slice(lower=None, upper=None):
+    """Rentang kode bin PM2.5 untuk lower < PM2.5 < upper (ambang harus ada di PM25_EDGES)."""
+    def edge_index(threshold):
+        matches = np.flatnonzero(PM25_EDGES == threshold)
+        if len(matches) == 0:
+            raise ValueError(f"Ambang PM2.5 {threshold} tidak ada di grid PM25_EDGES (kelipatan 25).")
+        return int(matches[0])
+
+    start = 0 if lower is None else 2 * edge_index(lower) + 1
+    stop = n_pm25_bins() if upper is None else 2 * edge_index(upper)
+    return slice(start, stop)
+
+
+def windrose_table(hist, filters=None, lower=None, upper=None):
+    """
+    Tabel jumlah [bin kecepatan, sektor] untuk grup yang lolos filter
+    {kolom_kunci: nilai atau list nilai} dan kondisi lower < PM2.5 < upper.
+    """
+    keys = hist['keys']
+    mask = np.ones(len(keys), dtype=bool)
+    for col, val in (filters or {}).items():
+        if val is None or (isinstance(val, str) and val == 'Overall'):
+            continue
+        values = val if isinstance(val, (list, tuple, set)) else [val]
+        mask &= keys[col].isin(list(values)).to_numpy()
+
+    selected = hist['counts'][mask, _pm25_slice(lower, upper)]
+    table = selected.sum(axis=(0, 1), dtype='int64')
+    return table.T
@@ -0,0 +1,66 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modul dashboard diimpor dengan nama langsung (sama seperti dashboard.py dan skrip di folder dashboard)
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard')
+sys.path.insert(0, DASHBOARD_DIR)
+
+# Tanpa snapshot hangat: setiap load_metrics di tes membangun agregasi dari store
+os.environ['DASHBOARD_SNAPSHOT'] = '0'
+
+from benchmark import generate_station  # noqa: E402
+from data_store import STORE_DIRNAME, apply_schema, write_store  # noqa: E402
+from ingest import NON_NUMERIC_COLS, add_features, interpolate_linear, parse_prsa  # noqa: E402
+
+# =========================================================
+#        DATA SINTETIS BERSAMA UNTUK TES
+# =========================================================
+# Satu stasiun per Tipe Area, 2 tahun (Maret 2013 - Februari 2015) sehingga
+# ada periode Pra-CAAP dan beberapa tahun Pasca-CAAP. Data dibuat dengan
+# generator benchmark (skema PRSA_Data_*.csv, ~1% nilai kosong).
+
+TEST_STATIONS = ['Dingling', 'Changping', 'Dongsi']
+TEST_YEARS = 2
+
+
+def synthetic_frame(interpolate=False, stations=TEST_STATIONS, n_years=TEST_YEARS):
+    """
+    Data per jam siap analisis (index datetime, kolom fitur, dtype skema ringkas), urut per stasiun lalu waktu.
+    interpolate=True: nilai kosong diisi seperti ingest.prepare_station; False: nilai kosong dibiarkan NaN.
+    """
+    frames = []
+    for i, station in enumerate(stations):
+        df = parse_prsa(generate_station(station, n_years, seed=i))
+        if interpolate:
+            cols = df.columns.drop(NON_NUMERIC_COLS)
+            df[cols] = interpolate_linear(df[cols].to_numpy(dtype='float64'))
+        frames.append(add_features(df))
+    return apply_schema(pd.concat(frames))
+
+
+@pytest.fixture(scope='session')
+def frame():
+    """Data per jam dengan nilai kosong (NaN) untuk menguji perhitungan pairwise-complete."""
+    return synthetic_frame()
+
+
+@pytest.fixture(scope='session')
+def store_frame():
+    """Data per jam terinterpolasi (isi store Parquet hasil ingest)."""
+    return synthetic_frame(interpolate=True)
+
+
+@pytest.fixture
+def store_base(tmp_path, store_frame):
+    """Folder dashboard sementara berisi main_data_store/ dari store_frame (baru untuk setiap tes)."""
+    write_store(store_frame, str(tmp_path / STORE_DIRNAME))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
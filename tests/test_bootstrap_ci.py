@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bootstrap_ci import PRE_CAAP_PERIOD, bootstrap_caap_change, build_caap_blocks
+from stats_cube import build_cube, caap_evaluation
+
+COLS = ['PM2.5', 'NO2', 'SO2']
+
+
+@pytest.fixture(scope='module')
+def blocks(frame):
+    return build_caap_blocks(frame, COLS)
+
+
+def test_block_totals_match_period_means(frame, blocks):
+    # Jumlah seluruh blok per periode = rata-rata per periode dari data per baris
+    totals = blocks.groupby('period')[[f'sum:{col}' for col in COLS] + [f'n:{col}' for col in COLS]].sum()
+    got = pd.DataFrame({col: totals[f'sum:{col}'] / totals[f'n:{col}'] for col in COLS})
+
+    values = frame[COLS].astype('float64')
+    period = np.where(frame['Pre_CAAP'], PRE_CAAP_PERIOD, frame['year'])
+    expected = values.groupby(period).mean()
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert got.index.tolist() == expected.index.tolist()
+
+
+def test_blocks_sorted_by_period_then_station(blocks):
+    keys = pd.MultiIndex.from_frame(blocks[['period', 'station']].astype({'station': str}))
+    assert keys.is_monotonic_increasing
+    assert set(blocks['Area_Type']) == {'Rural', 'Suburban', 'Urban'}
+
+
+@pytest.mark.parametrize('area', ['Overall', 'Urban'])
+def test_interval_contains_point_estimate(frame, blocks, area):
+    ci = bootstrap_caap_change(blocks, COLS, area, n_resamples=500, workers=1)
+    _, _, change = caap_evaluation(build_cube(frame), COLS, {'Area_Type': area})
+
+    assert ci.index.tolist() == change.index.tolist()
+    assert (ci['lower'] < ci['upper']).to_numpy().all()
+    assert (ci['lower'] <= change).to_numpy().all()
+    assert (change <= ci['upper']).to_numpy().all()
+
+
+def test_result_independent_of_worker_count(blocks):
+    one = bootstrap_caap_change(blocks, COLS, n_resamples=600, seed=7, workers=1)
+    many = bootstrap_caap_change(blocks, COLS, n_resamples=600, seed=7, workers=3)
+    pd.testing.assert_frame_equal(one, many)
+    other_seed = bootstrap_caap_change(blocks, COLS, n_resamples=600, seed=8, workers=1)
+    assert not one.equals(other_seed)
+
+
+def test_wider_interval_for_higher_confidence(blocks):
+    narrow = bootstrap_caap_change(blocks, COLS, n_resamples=500, confidence=0.8)
+    wide = bootstrap_caap_change(blocks, COLS, n_resamples=500, confidence=0.99)
+    assert ((wide['upper'] - wide['lower']) >= (narrow['upper'] - narrow['lower'])).to_numpy().all()
+
+
+def test_none_without_baseline_or_post_period(blocks):
+    assert bootstrap_caap_change(blocks[blocks['period'] != PRE_CAAP_PERIOD], COLS) is None
+    assert bootstrap_caap_change(blocks[blocks['period'] == PRE_CAAP_PERIOD], COLS) is None
+    assert bootstrap_caap_change(blocks, COLS, area='Unknown') is None
@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chunked_cube import (
+    aggregate_store, build_cube_chunked, iter_frame_chunks, max_abs_difference, pb_summary,
+)
+from data_store import STORE_DIRNAME
+from stats_cube import build_cube, merge_cubes
+
+
+def assert_cube_equal(got, expected):
+    pd.testing.assert_frame_equal(
+        got.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False, rtol=1e-9
+    )
+
+
+@pytest.mark.parametrize('chunk_rows', [1_000, 7_777, 10 ** 9])
+def test_chunked_cube_equals_full_build(frame, chunk_rows):
+    assert_cube_equal(build_cube_chunked(iter_frame_chunks(frame, chunk_rows)), build_cube(frame))
+
+
+def test_merge_cubes_of_shuffled_parts(frame, rng):
+    # Potongan acak (bukan per blok berurutan): sel yang sama muncul di beberapa cube parsial
+    parts = np.array_split(rng.permutation(len(frame)), 5)
+    merged = merge_cubes([build_cube(frame.iloc[np.sort(part)]) for part in parts])
+    assert_cube_equal(merged, build_cube(frame))
+
+
+def test_merge_cubes_ignores_none(frame):
+    cube = build_cube(frame)
+    assert merge_cubes([None, cube]) is cube
+
+
+def test_iter_frame_chunks_covers_all_rows(frame):
+    chunks = list(iter_frame_chunks(frame, 10_000))
+    assert all(len(chunk) <= 10_000 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == len(frame)
+
+
+def test_aggregate_store_matches_in_memory_summary(store_base, store_frame):
+    cube = aggregate_store(os.path.join(store_base, STORE_DIRNAME), memory_mb=1)
+    diffs = max_abs_difference(pb_summary(cube), pb_summary(build_cube(store_frame)))
+    assert max(diffs.values()) < 1e-8, diffs
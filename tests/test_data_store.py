@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pandas as pd
+
+from data_store import STORE_DIRNAME, csv_version, read_store, store_version, write_partitions
+from incremental import JOURNAL_NAME
+
+
+def copy_tree(src, dst):
+    """Salinan tanpa mempertahankan mtime (seperti clone git)."""
+    shutil.copytree(src, dst, copy_function=shutil.copyfile)
+    return dst
+
+
+def test_version_survives_copy_and_touch(store_base, tmp_path):
+    store_path = os.path.join(store_base, STORE_DIRNAME)
+    version = store_version(store_path)
+    assert version.startswith('store:')
+
+    copied = copy_tree(store_path, str(tmp_path / 'clone' / STORE_DIRNAME))
+    assert store_version(copied) == version
+    for root, _, names in os.walk(copied):
+        for name in [''] + names:
+            os.utime(os.path.join(root, name), (0, 0))
+    assert store_version(copied) == version
+
+    # File pendamping berawalan '_' / '.' (jurnal, file sementara) tidak mengubah versi
+    with open(os.path.join(copied, JOURNAL_NAME), 'w') as f:
+        f.write('{}\n')
+    open(os.path.join(copied, 'station=Dongsi', '.tmp.parquet'), 'w').close()
+    assert store_version(copied) == version
+
+
+def test_version_follows_partition_contents(store_base, tmp_path):
+    store_path = os.path.join(store_base, STORE_DIRNAME)
+    part = read_store(store_path, stations=['Dongsi'], years=[2014])
+    write_partitions(part, store_path)
+    version = store_version(store_path)
+
+    # Menulis ulang partisi dengan isi sama (nama file baru): versi tetap
+    write_partitions(part, store_path)
+    assert store_version(store_path) == version
+
+    # Satu nilai berubah tanpa mengubah jumlah baris: versi berubah
+    changed = part.copy()
+    changed.iloc[100, changed.columns.get_loc('PM2.5')] += 1
+    write_partitions(changed, store_path)
+    assert store_version(store_path) != version
+
+    write_partitions(part, store_path)
+    assert store_version(store_path) == version
+
+
+def test_csv_version_from_contents(frame, tmp_path):
+    path = tmp_path / 'main_data.csv'
+    frame.head(100).to_csv(path)
+    version = csv_version(str(path))
+    copied = copy_tree(str(tmp_path), str(tmp_path / 'clone')) + '/main_data.csv'
+    assert csv_version(copied) == version
+
+    pd.concat([frame.head(100), frame.tail(1)]).to_csv(path)
+    assert csv_version(str(path)) != version
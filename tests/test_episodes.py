@@ -0,0 +1,134 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+from matplotlib import MatplotlibDeprecationWarning
+
+from episodes import EpisodeIndex, detect_episodes, run_bounds, summarize_episodes
+from plots import plot_pb4_episodes
+from windrose_hist import CARDINAL16
+
+
+def naive_runs(mask, breaks=None):
+    """Batas run True dengan loop per elemen (referensi run_bounds)."""
+    starts, ends = [], []
+    for i, value in enumerate(mask):
+        new_run = i == 0 or not mask[i - 1] or (breaks is not None and breaks[i])
+        if value and new_run:
+            if len(starts) > len(ends):
+                ends.append(i)
+            starts.append(i)
+        elif not value and len(starts) > len(ends):
+            ends.append(i)
+    if len(starts) > len(ends):
+        ends.append(len(mask))
+    return starts, ends
+
+
+def naive_episodes(station_frame, col, threshold, min_hours):
+    """Episode per stasiun dengan loop per jam (referensi detect_episodes)."""
+    rows = []
+    for station, part in station_frame.groupby(station_frame['station'].astype(str), sort=True):
+        part = part.sort_index()
+        run = []
+        for time, value in zip(part.index, part[col].to_numpy('float64')):
+            if run and (value > threshold) and time - run[-1][0] == pd.Timedelta(hours=1):
+                run.append((time, value))
+                continue
+            if len(run) >= min_hours:
+                rows.append((station, run))
+            run = [(time, value)] if value > threshold else []
+        if len(run) >= min_hours:
+            rows.append((station, run))
+
+    return pd.DataFrame([{
+        'station': station,
+        'start': run[0][0],
+        'end': run[-1][0],
+        'hours': len(run),
+        'peak': max(value for _, value in run),
+        'peak_time': max(run, key=lambda item: item[1])[0],
+        'mean': np.mean([value for _, value in run]),
+    } for station, run in rows])
+
+
+@pytest.fixture(scope='module')
+def station_frame(store_frame):
+    """Data per jam dengan beberapa jam yang hilang (celah waktu memutus episode)."""
+    rng = np.random.default_rng(3)
+    return store_frame[rng.random(len(store_frame)) > 0.002]
+
+
+def test_run_bounds_matches_loop(rng):
+    for _ in range(20):
+        mask = rng.random(200) < 0.6
+        breaks = rng.random(200) < 0.05
+        for b in (None, breaks):
+            starts, ends = run_bounds(mask, b)
+            expected_starts, expected_ends = naive_runs(mask, b)
+            assert starts.tolist() == expected_starts
+            assert ends.tolist() == expected_ends
+
+
+@pytest.mark.parametrize('threshold, min_hours', [(30, 12), (75, 3), (200, 1)])
+def test_detect_matches_loop(station_frame, threshold, min_hours):
+    got = detect_episodes(station_frame, 'PM2.5', threshold, min_hours)
+    expected = naive_episodes(station_frame, 'PM2.5', threshold, min_hours)
+    assert len(got) == len(expected) > 0
+
+    got = got.sort_values(['station', 'start']).reset_index(drop=True)
+    expected = expected.sort_values(['station', 'start']).reset_index(drop=True)
+    for col in ['station', 'start', 'end', 'hours', 'peak_time']:
+        assert got[col].tolist() == expected[col].tolist(), col
+    np.testing.assert_allclose(got['peak'], expected['peak'], rtol=1e-6)
+    np.testing.assert_allclose(got['mean'], expected['mean'], rtol=1e-5)
+
+
+def test_episode_wind_and_labels():
+    index = pd.date_range('2014-01-01', periods=30, freq='h')
+    df = pd.DataFrame({
+        'station': 'Dongsi', 'Area_Type': 'Urban',
+        'PM2.5': np.r_[np.full(26, 100.0), 10.0, 10.0, 10.0, 10.0],
+        'WSPM': np.r_[np.full(25, 1.0), np.nan, np.full(4, 5.0)],
+        'wd_sector': np.r_[np.full(20, 4), np.full(6, 12), np.zeros(4)].astype('uint8'),
+    }, index=index)
+    episode = detect_episodes(df, threshold=75, min_hours=24).iloc[0]
+    assert episode['hours'] == 26
+    assert episode['wd_dominant'] == CARDINAL16[4]
+    assert episode['wspm_mean'] == pytest.approx(1.0)
+    assert episode['Season'] == 'Winter' and episode['year'] == 2014
+
+
+def test_no_episode_returns_empty_frame(station_frame):
+    episodes = detect_episodes(station_frame, threshold=10_000)
+    assert episodes.empty
+    assert summarize_episodes(episodes)['count'] == 0
+
+
+@pytest.mark.parametrize('start, end, stations', [
+    (None, None, None),
+    ('2014-01-01', '2014-01-31', None),
+    ('2014-12-20 13:00', '2014-12-20 13:00', ['Dongsi']),
+    (None, '2013-06-01', ['Dingling', 'Changping']),
+    ('2015-02-01', None, None),
+])
+def test_index_query_matches_overlap_mask(station_frame, start, end, stations):
+    index = EpisodeIndex.build(station_frame, threshold=40, min_hours=4)
+    episodes = index.episodes
+    mask = np.ones(len(episodes), dtype=bool)
+    if start is not None:
+        mask &= episodes['end'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= episodes['start'] <= pd.Timestamp(end)
+    if stations is not None:
+        mask &= episodes['station'].isin(stations)
+    pd.testing.assert_frame_equal(index.query(start, end, stations), episodes[mask])
+
+
+@pytest.mark.filterwarnings('error', category=MatplotlibDeprecationWarning)
+def test_plot_episodes_renders(station_frame):
+    episodes = detect_episodes(station_frame, 'PM2.5', 75, 3)
+    fig, err = plot_pb4_episodes(episodes, 'PM2.5', 75, 3)
+    assert err is None and fig is not None
+    plt.close(fig)
+    assert plot_pb4_episodes(episodes.iloc[:0], 'PM2.5', 75, 3)[0] is None
@@ -0,0 +1,85 @@
+import os
+
+from figure_cache import FigureCache
+
+PNG_BYTES = 1000
+# Memori muat satu entri; folder spill muat tiga PNG
+BUDGET_MB = 1500 / 1024 ** 2
+SPILL_MB = 3500 / 1024 ** 2
+
+
+def png(i):
+    return bytes([i]) * PNG_BYTES
+
+
+def spill_files(spill_dir):
+    return sorted(name for name in os.listdir(spill_dir) if name.endswith('.png'))
+
+
+def make_cache(spill_dir):
+    return FigureCache(budget_mb=BUDGET_MB, spill_dir=str(spill_dir), spill_mb=SPILL_MB)
+
+
+def test_spill_dir_capped_with_lru_deletion(tmp_path):
+    cache = make_cache(tmp_path)
+    for i in range(10):
+        cache.put(('plot', i, 'v1'), png(i))
+
+    # Hanya tiga entri terakhir yang dikeluarkan dari memori yang tersisa di disk
+    assert len(spill_files(tmp_path)) == 3
+    assert sum(os.path.getsize(tmp_path / name) for name in spill_files(tmp_path)) <= 3500
+    assert cache.get(('plot', 0, 'v1')) is None
+    assert cache.get(('plot', 6, 'v1')) == png(6)
+
+    # Entri yang kembali ke memori dihapus dari disk; entri yang tergeser dari memori di-spill
+    stats = cache.stats()
+    assert stats['spilled'] == 3 and stats['entries'] == 1
+    assert cache.get(('plot', 9, 'v1')) == png(9)
+    assert cache.get(('plot', 8, 'v1')) == png(8)
+    assert cache.get(('plot', 7, 'v1')) == png(7)
+    assert len(spill_files(tmp_path)) == 3
+
+
+def test_recently_read_spill_survives_eviction(tmp_path):
+    cache = make_cache(tmp_path)
+    for i in range(4):
+        cache.put(('plot', i), png(i))
+    # Spill: 0, 1, 2. Membaca 0 menjadikannya paling baru (3 pindah ke disk)
+    assert cache.get(('plot', 0)) == png(0)
+    cache.put(('plot', 4), png(4))
+    cache.put(('plot', 5), png(5))
+    assert cache.get(('plot', 1)) is None and cache.get(('plot', 2)) is None
+    assert cache.get(('plot', 0)) == png(0)
+
+
+def test_existing_spill_files_trimmed_on_start(tmp_path):
+    cache = make_cache(tmp_path)
+    for i in range(5):
+        cache.put(('plot', i), png(i))
+    names = spill_files(tmp_path)
+    for name, mtime in zip(names, range(3)):
+        os.utime(tmp_path / name, (mtime, mtime))
+
+    # Proses baru dengan anggaran lebih kecil: PNG paling lama (mtime) dihapus saat inisialisasi
+    restarted = FigureCache(budget_mb=BUDGET_MB, spill_dir=str(tmp_path), spill_mb=1500 / 1024 ** 2)
+    assert spill_files(tmp_path) == names[-1:]
+    assert restarted.stats()['spilled'] == 1
+    assert sum(restarted.get(('plot', i)) is not None for i in range(5)) == 1
+
+
+def test_get_or_render_renders_once(tmp_path):
+    cache = make_cache(tmp_path)
+    renders = []
+
+    def render():
+        import matplotlib.pyplot as plt
+
+        renders.append(1)
+        fig, ax = plt.subplots()
+        ax.plot([0, 1], [1, 0])
+        return fig, None
+
+    first, err = cache.get_or_render(('line', 'v1'), render)
+    again, _ = cache.get_or_render(('line', 'v1'), render)
+    assert err is None and first.startswith(b'\x89PNG') and again is first
+    assert len(renders) == 1
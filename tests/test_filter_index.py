@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from filter_index import PackedMask, build_filter_index, index_values, select_positions
+
+FILTERS = [
+    {'Area_Type': 'Urban'},
+    {'Season': 'Winter', 'year': 2014},
+    {'Area_Type': ['Rural', 'Suburban'], 'Season': ['Spring', 'Autumn'], 'year': 'Overall'},
+    {'Is_Stagnant': True},
+    {'Pre_CAAP': False, 'Is_Stagnant': False, 'station': 'Dongsi'},
+    {'Pre_CAAP': [True, False], 'Season': 'Summer'},
+    {'station': ['Dingling', 'Dongsi'], 'Is_Stagnant': True, 'year': [2013, 2015]},
+]
+
+
+def row_mask(frame, filters):
+    """Filter boolean per baris (cara dashboard sebelum indeks posisi)."""
+    mask = np.ones(len(frame), dtype=bool)
+    for col, val in filters.items():
+        if val is None or val == 'Overall':
+            continue
+        values = val if isinstance(val, list) else [val]
+        mask &= frame[col].isin(values).to_numpy()
+    return mask
+
+
+@pytest.mark.parametrize('compact', [True, False])
+@pytest.mark.parametrize('filters', FILTERS)
+def test_select_positions_matches_boolean_mask(frame, filters, compact):
+    index = build_filter_index(frame, compact=compact)
+    positions = select_positions(index, filters)
+    np.testing.assert_array_equal(positions, np.flatnonzero(row_mask(frame, filters)))
+
+
+def test_boolean_columns_are_packed(frame):
+    index = build_filter_index(frame)
+    assert isinstance(index['Is_Stagnant'][True], PackedMask)
+    assert isinstance(index['Area_Type']['Urban'], np.ndarray)
+    assert index['Area_Type']['Urban'].dtype == np.int32
+
+
+def test_no_active_filter_returns_none(frame):
+    index = build_filter_index(frame)
+    assert select_positions(index, {'Area_Type': 'Overall', 'year': None}) is None
+
+
+def test_unknown_value_selects_nothing(frame):
+    index = build_filter_index(frame)
+    assert len(select_positions(index, {'Area_Type': 'Urban', 'year': 1999})) == 0
+
+
+def test_index_values_in_first_seen_order(frame):
+    index = build_filter_index(frame)
+    assert index_values(index, 'station') == list(dict.fromkeys(frame['station'].astype(str)))
+
+
+def test_packed_mask_round_trip(rng):
+    # Panjang bukan kelipatan 8: bit sisa di byte terakhir tidak boleh ikut terhitung
+    mask = rng.random(1_003) < 0.3
+    packed = PackedMask.from_mask(mask)
+    np.testing.assert_array_equal(packed.positions(), np.flatnonzero(mask))
+    positions = np.arange(len(mask))
+    np.testing.assert_array_equal(packed.contains(positions), mask)
+    other = rng.random(1_003) < 0.3
+    np.testing.assert_array_equal(packed.union(PackedMask.from_mask(other)).positions(), np.flatnonzero(mask | other))
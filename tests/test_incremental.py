@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import STORE_DIRNAME, read_store
+from filter_index import select_positions
+from incremental import append_observations, merge_keyed_counts, pending_changes
+from ingest import NON_NUMERIC_COLS, interpolate_linear, parse_prsa
+import pipeline
+from pipeline import (
+    MetricsHolder, build_metrics, load_dataset, load_metrics, metrics_frame, refresh_metrics,
+)
+from quantile_sketch import build_sketches, merge_sketches
+from query_backend import CubeBackend, pb_results
+from stats_cube import build_cube, drop_empty_cells, merge_cubes, negate_cube
+from windrose_hist import PM25_CONDITIONS, build_windrose_hist, windrose_table
+
+NUMERIC_SCALES = {
+    'PM2.5': 80, 'PM10': 100, 'SO2': 10, 'NO2': 50, 'CO': 900, 'O3': 40,
+    'TEMP': 8, 'PRES': 1015, 'DEWP': 5, 'RAIN': 0.1, 'WSPM': 2,
+}
+
+
+def prsa_rows(station, start, hours, seed, nan_tail=0, nan_rows=()):
+    """Baris baru skema PRSA_Data_*.csv untuk satu stasiun (nan_tail jam terakhir PM2.5 & O3 kosong)."""
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=hours, freq='h')
+    df = pd.DataFrame({'No': np.arange(hours), 'year': times.year, 'month': times.month, 'day': times.day,
+                       'hour': times.hour})
+    for col, scale in NUMERIC_SCALES.items():
+        df[col] = np.round(np.abs(rng.normal(scale, scale * 0.3, hours)), 1)
+    df['wd'] = rng.choice(['N', 'NE', 'SW', 'W'], hours)
+    df['station'] = station
+    if nan_tail:
+        df.loc[hours - nan_tail:, ['PM2.5', 'O3']] = np.nan
+    df.loc[list(nan_rows), ['NO2', 'WSPM']] = np.nan
+    return df
+
+
+# Batch 1: Dongsi berlanjut tepat setelah jam terakhir store (ekor PM2.5/O3 kosong), Dingling dengan celah 3 jam.
+# Batch 2: melanjutkan Dongsi setelah celah (mengisi ulang ekor yang sebelumnya hanya diisi nilai terdekat),
+# ditambah baris yang sudah tersimpan (diabaikan).
+BATCHES = [
+    lambda: pd.concat([
+        prsa_rows('Dongsi', '2015-03-01 00:00', 50, seed=1, nan_tail=6, nan_rows=[3, 4]),
+        prsa_rows('Dingling', '2015-03-01 03:00', 30, seed=2),
+    ]),
+    lambda: pd.concat([
+        prsa_rows('Dongsi', '2015-03-03 02:00', 20, seed=3),
+        prsa_rows('Dongsi', '2015-03-02 01:00', 2, seed=4),
+    ]),
+]
+
+
+def assert_metrics_equal(metrics, reference):
+    assert metrics['version'] == reference['version']
+    frame, expected_frame = metrics_frame(metrics), metrics_frame(reference)
+    assert len(frame) == len(expected_frame)
+
+    got, expected = pb_results(CubeBackend(metrics['cube'])), pb_results(CubeBackend(reference['cube']))
+    for name, value in expected.items():
+        if isinstance(value, list):
+            assert got[name] == value, name
+        else:
+            np.testing.assert_allclose(np.asarray(got[name], dtype='float64'), np.asarray(value, dtype='float64'),
+                                       rtol=1e-9, equal_nan=True, err_msg=name)
+    assert metrics['pb4_ratio'] == pytest.approx(reference['pb4_ratio'], rel=1e-9)
+
+    for filters in [None, {'year': 2015}, {'Area_Type': 'Urban', 'Season': 'Spring'}]:
+        for lower, upper in PM25_CONDITIONS.values():
+            np.testing.assert_array_equal(windrose_table(metrics['windrose_hist'], filters, lower, upper),
+                                          windrose_table(reference['windrose_hist'], filters, lower, upper))
+        for col in ['PM2.5', 'O3']:
+            np.testing.assert_array_equal(merge_sketches(metrics['quantile_sketches'], col, filters),
+                                          merge_sketches(reference['quantile_sketches'], col, filters))
+
+    # Indeks filter dibangun ulang: posisi menunjuk ke baris dengan nilai yang sama
+    positions = select_positions(metrics['filter_index'], {'station': 'Dongsi', 'year': 2015})
+    expected_positions = select_positions(reference['filter_index'], {'station': 'Dongsi', 'year': 2015})
+    pd.testing.assert_frame_equal(
+        frame.iloc[positions].sort_index()[['PM2.5', 'WSPM']],
+        expected_frame.iloc[expected_positions].sort_index()[['PM2.5', 'WSPM']],
+    )
+
+
+def test_append_refresh_matches_full_rebuild(store_base, monkeypatch):
+    store_path = os.path.join(store_base, STORE_DIRNAME)
+    holder = MetricsHolder(load_metrics(store_base))
+    # Refresh harus memakai delta, bukan memuat ulang penuh
+    monkeypatch.setattr(pipeline, 'load_metrics', lambda base_path: pytest.fail('refresh memuat ulang penuh'))
+
+    for batch in BATCHES:
+        previous = holder.current
+        entry = append_observations(store_path, batch())
+        assert entry is not None and entry['rows'] > 0
+        assert refresh_metrics(holder, store_base)
+        assert holder.current is not previous
+        assert holder.version == entry['version']
+
+        df_full, version = load_dataset(store_base)
+        assert_metrics_equal(holder.current, build_metrics(df_full, version))
+
+    # Baris yang sudah tersimpan: tidak ada perubahan, metrik tidak dimuat ulang
+    assert append_observations(store_path, BATCHES[0]()) is None
+    assert not refresh_metrics(holder, store_base)
+
+
+def test_tail_interpolation_matches_full_history(store_base, frame):
+    store_path = os.path.join(store_base, STORE_DIRNAME)
+    batches = [batch() for batch in BATCHES]
+    for batch in batches:
+        append_observations(store_path, batch)
+
+    # Referensi: interpolasi sekali atas seluruh riwayat mentah Dongsi (data lama + semua baris baru)
+    raw_new = parse_prsa(pd.concat(batches).query("station == 'Dongsi'"))
+    raw_new = raw_new[~raw_new.index.duplicated()]
+    cols = list(raw_new.columns.drop(NON_NUMERIC_COLS))
+    old = frame[frame['station'] == 'Dongsi'][cols].astype('float64')
+    new = raw_new.reindex(pd.date_range(old.index.max() + pd.Timedelta(hours=1), raw_new.index.max(), freq='h'))
+    history = pd.concat([old, new[cols]])
+    expected = interpolate_linear(history.to_numpy('float64'))
+
+    got = read_store(store_path, stations=['Dongsi'])[cols]
+    assert got.index.equals(history.index)
+    np.testing.assert_allclose(got.to_numpy('float64'), expected, rtol=1e-6)
+
+
+def test_pending_changes_chain(store_base):
+    store_path = os.path.join(store_base, STORE_DIRNAME)
+    version = load_dataset(store_base)[1]
+    first = append_observations(store_path, BATCHES[0]())
+    second = append_observations(store_path, BATCHES[1]())
+
+    assert pending_changes(store_path, second['version']) == {}
+    changes = pending_changes(store_path, version)
+    assert set(changes) == {'Dongsi', 'Dingling'}
+    assert changes['Dongsi'] == min(pd.Timestamp(first['changes']['Dongsi']), pd.Timestamp(second['changes']['Dongsi']))
+    # Versi yang tidak tercatat di jurnal: harus dimuat ulang penuh
+    assert pending_changes(store_path, 'store:0') is None
+
+
+def test_negate_cube_subtracts_part(frame):
+    removed = (frame['station'] == 'Dongsi').to_numpy() & (frame.index >= '2014-06-01')
+    got = drop_empty_cells(merge_cubes([build_cube(frame), negate_cube(build_cube(frame[removed]))]))
+    expected = build_cube(frame[~removed])
+    pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize('build', [build_windrose_hist, build_sketches])
+def test_merge_keyed_counts_with_signs(frame, build):
+    removed = (frame['station'] == 'Dingling').to_numpy() & (frame['year'] == 2015).to_numpy()
+    added = frame[removed].copy()
+    added['PM2.5'] = added['PM2.5'] * 2
+
+    got = merge_keyed_counts([(build(frame), 1), (build(frame[removed]), -1), (build(added), 1)])
+    expected = build(pd.concat([frame[~removed], added]))
+    pd.testing.assert_frame_equal(got['keys'].astype(str), expected['keys'].astype(str))
+    if isinstance(expected['counts'], dict):
+        for col, counts in expected['counts'].items():
+            np.testing.assert_array_equal(got['counts'][col], counts)
+    else:
+        np.testing.assert_array_equal(got['counts'], expected['counts'])
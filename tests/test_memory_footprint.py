@@ -0,0 +1,26 @@
+import pytest
+
+from ingest import MAIN_DATA_COLS
+from memory_footprint import RTOL, accuracy_report, build_representations, footprint_report
+
+
+@pytest.fixture(scope='module')
+def representations(tmp_path_factory, store_frame):
+    """Representasi lama & ringkas dari main_data.csv sintetis (skema output notebook)."""
+    csv_path = tmp_path_factory.mktemp('footprint') / 'main_data.csv'
+    store_frame[MAIN_DATA_COLS].rename_axis('datetime').to_csv(csv_path)
+    return build_representations(str(csv_path))
+
+
+def test_accuracy_report_passes(representations):
+    accuracy = accuracy_report(*representations)
+    assert {'annual_change', 'stagnation_sweep', 'boxplot_pb4', 'windrose_extreme'} <= set(accuracy.index)
+    assert accuracy['lolos'].all(), accuracy
+    assert (accuracy['selisih_relatif'] <= RTOL).all()
+
+
+def test_compact_representation_is_smaller(representations):
+    report = footprint_report(*representations)
+    assert report.loc['Total frame', 'Rasio'] > 2
+    assert report.loc['Indeks filter', 'Rasio'] > 1
+    assert report.loc['Total', 'Ringkas (MB)'] < report.loc['Total', 'Lama (MB)']
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from quantile_sketch import (
+    ALPHA, BUCKET_VALUES, MAX_VALUE, MIN_VALUE, box_stats, bucket_index, build_sketches, merge_sketches, quantile,
+)
+
+FILTERS = [
+    None,
+    {'Area_Type': 'Urban'},
+    {'year': 2014, 'Season': ['Winter', 'Spring']},
+    {'Is_Stagnant': True, 'station': ['Dingling', 'Changping']},
+]
+
+
+def filtered_values(frame, col, filters):
+    mask = np.ones(len(frame), dtype=bool)
+    for key, val in (filters or {}).items():
+        mask &= frame[key].isin(val if isinstance(val, list) else [val]).to_numpy()
+    values = frame[col].to_numpy('float64')[mask]
+    return values[~np.isnan(values)]
+
+
+def test_bucket_value_within_alpha(rng):
+    values = np.exp(rng.uniform(np.log(MIN_VALUE), np.log(MAX_VALUE), 100_000))
+    represented = BUCKET_VALUES[bucket_index(values)]
+    assert np.max(np.abs(represented - values) / values) <= ALPHA + 1e-12
+
+
+def test_bucket_index_edges():
+    idx = bucket_index([np.nan, 0.0, MIN_VALUE / 2, MAX_VALUE * 10])
+    assert idx[:3].tolist() == [-1, 0, 0]
+    assert idx[3] == len(BUCKET_VALUES) - 1
+
+
+@pytest.mark.parametrize('col', ['PM2.5', 'O3'])
+@pytest.mark.parametrize('filters', FILTERS)
+def test_quantiles_within_error_bound(frame, col, filters):
+    sketches = build_sketches(frame)
+    counts = merge_sketches(sketches, col, filters)
+    values = filtered_values(frame, col, filters)
+    assert counts.sum() == len(values)
+    for q in (0.05, 0.25, 0.5, 0.75, 0.95):
+        expected = np.percentile(values, q * 100)
+        assert abs(quantile(counts, q) - expected) <= ALPHA * expected + 1e-9, q
+
+
+def test_merge_by_key(frame):
+    sketches = build_sketches(frame)
+    merged = merge_sketches(sketches, 'PM2.5', {'Area_Type': 'Urban'}, by='year')
+    assert sorted(merged) == sorted(frame['year'].unique())
+    for year, counts in merged.items():
+        np.testing.assert_array_equal(counts, merge_sketches(sketches, 'PM2.5', {'Area_Type': 'Urban', 'year': year}))
+
+
+def test_sketches_of_parts_add_up(frame):
+    # Sketch bersifat mergeable: jumlah sketch per bagian data = sketch seluruh data
+    full = merge_sketches(build_sketches(frame), 'PM2.5')
+    parts = [merge_sketches(build_sketches(part), 'PM2.5') for _, part in frame.groupby('station', observed=True)]
+    np.testing.assert_array_equal(np.sum(parts, axis=0), full)
+
+
+def test_empty_sketch_quantile_is_nan():
+    assert np.isnan(quantile(np.zeros(len(BUCKET_VALUES), dtype='int64'), 0.5))
+
+
+def test_box_stats_close_to_exact(frame):
+    counts = merge_sketches(build_sketches(frame), 'PM2.5', {'Area_Type': 'Rural'})
+    values = filtered_values(frame, 'PM2.5', {'Area_Type': 'Rural'})
+    stats = box_stats(counts, 'Rural')
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    assert stats['med'] == pytest.approx(med, rel=ALPHA)
+    # Ujung whisker dapat bergeser satu bucket (~2 * ALPHA) karena batas 1.5 IQR berasal dari kuartil sketch,
+    # ditambah galat nilai representatif bucket (ALPHA)
+    whishi = values[values <= q3 + 1.5 * (q3 - q1)].max()
+    assert stats['whishi'] == pytest.approx(whishi, rel=3 * ALPHA)
+    fliers = stats['fliers']
+    assert np.all((fliers < stats['whislo']) | (fliers > stats['whishi']))
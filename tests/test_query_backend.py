@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('duckdb')
+
+from data_store import STORE_DIRNAME  # noqa: E402
+from filter_index import build_filter_index, index_values  # noqa: E402
+from pipeline import dataset_version, load_dataset, stagnation_sweep_scope  # noqa: E402
+from quantile_sketch import build_sketches  # noqa: E402
+from query_backend import (  # noqa: E402
+    BACKEND_ENV, DATABASE_NAME, CubeBackend, SqlBackend, build_database, database_version, open_sql_backend,
+    pb_results,
+)
+from stats_cube import build_cube  # noqa: E402
+from windrose_hist import build_windrose_hist  # noqa: E402
+
+SCOPES = [{}, {'Area_Type': 'Urban'}, {'Season': ['Winter', 'Spring'], 'year': 2014, 'Is_Stagnant': True}]
+
+
+@pytest.fixture
+def backends(store_base):
+    """(SqlBackend atas main_data.duckdb, CubeBackend, df_full) dari store yang sama."""
+    db_path = build_database(os.path.join(store_base, STORE_DIRNAME), os.path.join(store_base, DATABASE_NAME))
+    sql = SqlBackend.open(db_path)
+    df_full, _ = load_dataset(store_base)
+    yield sql, CubeBackend(build_cube(df_full)), df_full
+    sql.connection.close()
+
+
+def assert_keys_equal(got, expected):
+    pd.testing.assert_frame_equal(
+        got.astype(str).reset_index(drop=True), expected.astype(str).reset_index(drop=True), check_dtype=False
+    )
+
+
+@pytest.mark.parametrize('scope', SCOPES)
+def test_pb_results_match_cube(backends, scope):
+    sql, cube, _ = backends
+    got, expected = pb_results(sql.scope(scope)), pb_results(cube.scope(scope))
+    for name, value in expected.items():
+        if isinstance(value, list):
+            assert got[name] == value, name
+        else:
+            np.testing.assert_allclose(
+                np.asarray(got[name], dtype='float64'), np.asarray(value, dtype='float64'),
+                rtol=1e-9, equal_nan=True, err_msg=name,
+            )
+
+
+def test_windrose_hist_matches_numpy(backends):
+    sql, _, df_full = backends
+    got, expected = sql.windrose_hist(), build_windrose_hist(df_full)
+    assert_keys_equal(got['keys'], expected['keys'])
+    np.testing.assert_array_equal(got['counts'], expected['counts'])
+
+
+def test_sketches_match_numpy(backends):
+    sql, _, df_full = backends
+    got, expected = sql.sketches(), build_sketches(df_full)
+    assert_keys_equal(got['keys'], expected['keys'])
+    for col, counts in expected['counts'].items():
+        np.testing.assert_array_equal(got['counts'][col], counts, err_msg=col)
+
+
+def test_first_seen_values_match_filter_index(backends):
+    sql, _, df_full = backends
+    index = build_filter_index(df_full)
+    for col in ['station', 'Area_Type', 'Season', 'year']:
+        assert [str(v) for v in sql.first_seen_values(col)] == [str(v) for v in index_values(index, col)], col
+
+
+@pytest.mark.parametrize('scope', SCOPES)
+def test_stagnation_sweep_from_wspm_totals(backends, scope):
+    # Mode SQL (frame None): sapuan dari total per nilai WSPM, sama dengan sapuan per baris
+    sql, _, df_full = backends
+    got = stagnation_sweep_scope(sql, None, None, scope)
+    expected = stagnation_sweep_scope(None, df_full, build_filter_index(df_full), scope)
+    pd.testing.assert_frame_equal(got, expected, rtol=1e-9)
+
+
+def test_open_sql_backend_requires_matching_version(store_base, monkeypatch):
+    db_path = build_database(os.path.join(store_base, STORE_DIRNAME), os.path.join(store_base, DATABASE_NAME))
+    version = dataset_version(store_base)
+    assert open_sql_backend(store_base, version) is None  # DASHBOARD_BACKEND tidak diset: backend pandas
+
+    monkeypatch.setenv(BACKEND_ENV, 'duckdb')
+    assert database_version(db_path) == version
+    assert isinstance(open_sql_backend(store_base, version), SqlBackend)
+    # Database dari versi store lama tidak dipakai
+    assert open_sql_backend(store_base, 'store:0') is None
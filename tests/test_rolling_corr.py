@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rolling_corr import rolling_correlation, summarize_rolling
+
+
+@pytest.fixture(scope='module')
+def sample(frame):
+    """Dua bulan data dua stasiun dengan jam yang hilang, baris diacak (urutan input bebas)."""
+    in_window = (frame.index >= '2014-01-01') & (frame.index < '2014-03-01')
+    df = frame[frame['station'].isin(['Dingling', 'Dongsi']).to_numpy() & in_window]
+    rng = np.random.default_rng(1)
+    df = df[rng.random(len(df)) > 0.05]
+    return df.iloc[rng.permutation(len(df))]
+
+
+def pandas_rolling(df, x, y, window_hours, min_periods):
+    """Korelasi bergulir berbasis waktu per stasiun dengan pandas (referensi)."""
+    parts = []
+    for _, part in df.sort_index().groupby('station', observed=True):
+        r = part[x].astype('float64').rolling(f'{window_hours}h', min_periods=min_periods).corr(part[y].astype('float64'))
+        parts.append(pd.DataFrame({'r': r.to_numpy(), 'station': part['station'].to_numpy()}, index=part.index))
+    return pd.concat(parts)
+
+
+@pytest.mark.parametrize('x, y', [('O3', 'NO2'), ('PM2.5', 'WSPM'), ('TEMP', 'DEWP')])
+@pytest.mark.parametrize('window_hours', [24, 168])
+def test_matches_pandas_time_window(sample, x, y, window_hours):
+    min_periods = window_hours // 2
+    got = rolling_correlation(sample, x, y, window_hours).to_frame('r').assign(station=sample['station'].to_numpy())
+    expected = pandas_rolling(sample, x, y, window_hours, min_periods)
+
+    key = ['station', 'datetime']
+    got = got.rename_axis('datetime').reset_index().astype({'station': str}).sort_values(key)
+    expected = expected.rename_axis('datetime').reset_index().astype({'station': str}).sort_values(key)
+    np.testing.assert_array_equal(got['r'].isna().to_numpy(), expected['r'].isna().to_numpy())
+    np.testing.assert_allclose(got['r'].to_numpy(), expected['r'].to_numpy(), atol=1e-9, equal_nan=True)
+
+
+def test_constant_window_is_undefined():
+    index = pd.date_range('2014-01-01', periods=48, freq='h')
+    df = pd.DataFrame({'station': 'Dongsi', 'x': 5.0, 'y': np.arange(48.0)}, index=index)
+    assert rolling_correlation(df, 'x', 'y', 24).isna().all()
+
+
+def test_windows_do_not_cross_stations():
+    index = pd.date_range('2014-01-01', periods=24, freq='h')
+    a = pd.DataFrame({'station': 'A', 'x': np.arange(24.0), 'y': np.arange(24.0)}, index=index)
+    b = pd.DataFrame({'station': 'B', 'x': np.arange(24.0), 'y': -np.arange(24.0)}, index=index)
+    r = rolling_correlation(pd.concat([a, b]), 'x', 'y', 24, min_periods=2)
+    assert np.allclose(r.iloc[1:24], 1.0)
+    assert np.allclose(r.iloc[25:], -1.0)
+    assert r.iloc[[0, 24]].isna().all()
+
+
+def test_summarize_rolling_by_station():
+    index = pd.date_range('2014-01-01', periods=48, freq='h')
+    r = pd.Series(np.r_[np.full(48, 0.2), np.full(48, 0.6)], index=index.append(index))
+    summary = summarize_rolling(r, np.repeat(['A', 'B'], 48))
+    assert summary['median'].tolist() == pytest.approx([0.4, 0.4])
+    assert summary['n_station'].tolist() == [2, 2]
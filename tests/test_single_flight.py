@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from single_flight import SingleFlight
+
+N_THREADS = 8
+TIMEOUT = 10
+
+
+def wait_for_waiters(flight, n):
+    """Menahan pemimpin sampai n pemanggil lain menunggu kunci yang sama."""
+    deadline = time.monotonic() + TIMEOUT
+    while flight.stats()['max_waiters'] < n:
+        assert time.monotonic() < deadline, 'penunggu tidak pernah terdaftar'
+        time.sleep(0.001)
+
+
+def run_concurrently(func, n=N_THREADS):
+    """func() di n thread sekaligus: daftar (hasil, exception) per thread."""
+    def call():
+        try:
+            return func(), None
+        except Exception as exc:
+            return None, exc
+
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        return [future.result(TIMEOUT) for future in [executor.submit(call) for _ in range(n)]]
+
+
+def test_concurrent_callers_compute_once():
+    flight = SingleFlight('test')
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        wait_for_waiters(flight, N_THREADS - 1)
+        return object()
+
+    results = run_concurrently(lambda: flight.do('key', compute))
+    assert len(calls) == 1
+    values = [value for value, exc in results]
+    assert all(exc is None for _, exc in results)
+    assert all(value is values[0] for value in values)
+
+    stats = flight.stats()
+    assert stats['coalesced'] == N_THREADS - 1
+    assert stats['max_waiters'] == N_THREADS - 1
+    assert stats['in_flight'] == 0 and stats['failed'] == 0
+
+
+def test_failure_reaches_every_waiter_and_key_retries():
+    flight = SingleFlight('test')
+    calls = []
+
+    def compute():
+        calls.append(threading.get_ident())
+        if len(calls) == 1:
+            wait_for_waiters(flight, N_THREADS - 1)
+        raise ValueError('gagal')
+
+    results = run_concurrently(lambda: flight.do('key', compute))
+    assert all(isinstance(exc, ValueError) for _, exc in results)
+    # Penunggu mencoba lagi sebagai pemimpin baru: tidak ada yang menerima hasil kosong
+    assert 1 < len(calls) <= N_THREADS
+    stats = flight.stats()
+    assert stats['failed'] == len(calls) and stats['coalesced'] == 0
+    assert stats['in_flight'] == 0
+
+    # Kunci tidak "teracuni": panggilan berikutnya menghitung ulang
+    assert flight.do('key', lambda: 42) == 42
+    assert flight.stats()['failed'] == len(calls)
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight('test')
+    results = run_concurrently(lambda: flight.do(threading.get_ident(), threading.get_ident))
+    assert all(exc is None for _, exc in results)
+    assert flight.stats()['coalesced'] == 0
+
+
+def test_disabled_computes_every_call():
+    flight = SingleFlight('test', enabled=False)
+    calls = []
+    barrier = threading.Barrier(N_THREADS)
+
+    def compute():
+        calls.append(1)
+        barrier.wait(TIMEOUT)
+        return len(calls)
+
+    run_concurrently(lambda: flight.do('key', compute))
+    assert len(calls) == N_THREADS
+    assert flight.stats()['coalesced'] == 0 and flight.stats()['in_flight'] == 0
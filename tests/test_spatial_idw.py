@@ -0,0 +1,95 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial_idw import (
+    KM_PER_DEG, MAX_FRAMES, MIN_DISTANCE_KM, IdwGrid, SpatialFields, hourly_matrix, station_table,
+)
+
+
+def naive_idw(grid, values):
+    """Satu medan per frame dengan loop per sel (referensi)."""
+    station_lat = grid.coords['lat'].to_numpy()
+    station_lon = grid.coords['lon'].to_numpy()
+    lon_scale = np.cos(np.radians(station_lat.mean()))
+    fields = []
+    for frame_values in np.atleast_2d(values):
+        valid = ~np.isnan(frame_values)
+        field = np.full(grid.shape, np.nan)
+        if valid.any():
+            for i in range(grid.shape[0]):
+                for j in range(grid.shape[1]):
+                    dy = (grid.lat[i] - station_lat) * KM_PER_DEG
+                    dx = (grid.lon[j] - station_lon) * KM_PER_DEG * lon_scale
+                    w = np.maximum(np.hypot(dx, dy), MIN_DISTANCE_KM) ** -grid.power
+                    field[i, j] = np.sum(w[valid] * frame_values[valid]) / np.sum(w[valid])
+        fields.append(field)
+    return np.array(fields)
+
+
+@pytest.fixture(scope='module')
+def grid():
+    return IdwGrid(['Dingling', 'Changping', 'Dongsi', 'Tiantan'], shape=(12, 15))
+
+
+def test_fields_match_per_cell_loop(grid):
+    values = np.array([[10.0, 20.0, 30.0, 40.0], [np.nan, 5.0, np.nan, 50.0], [np.nan] * 4])
+    got = grid.fields(values)
+    assert got.shape == (3,) + grid.shape
+    np.testing.assert_allclose(got, naive_idw(grid, values), rtol=1e-5, equal_nan=True)
+    assert np.isnan(got[2]).all()
+
+
+def test_fields_are_convex_combinations(grid, rng):
+    values = rng.uniform(20, 300, size=(5, len(grid.stations)))
+    fields = grid.fields(values)
+    assert (fields.min(axis=(1, 2)) >= values.min(axis=1) - 1e-3).all()
+    assert (fields.max(axis=(1, 2)) <= values.max(axis=1) + 1e-3).all()
+
+
+def test_single_station_gives_constant_field(grid):
+    values = np.array([np.nan, 42.0, np.nan, np.nan])
+    np.testing.assert_allclose(grid.fields(values), 42.0)
+
+
+def test_pickled_grid_recomputes_weights(grid, rng):
+    # Job render per frame mengirim grid ke worker tanpa matriks bobot
+    payload = pickle.dumps(grid)
+    assert len(payload) < grid.weights.nbytes
+    restored = pickle.loads(payload)
+    np.testing.assert_array_equal(restored.weights, grid.weights)
+    assert 'weights' in grid.__dict__
+    values = rng.uniform(20, 300, size=(2, len(grid.stations)))
+    np.testing.assert_array_equal(restored.fields(values), grid.fields(values))
+
+
+def test_unknown_station_rejected():
+    with pytest.raises(KeyError):
+        station_table(['Dongsi', 'Atlantis'])
+
+
+def test_window_mean_field(store_frame):
+    fields = SpatialFields(store_frame, shape=(10, 12))
+    times, got, values = fields.window('PM2.5', '2014-01-10 05:30', 24)
+
+    # Jendela dimulai di jam penuh; nilai stasiun = rata-rata 24 jam
+    hourly = hourly_matrix(store_frame, 'PM2.5', fields.grid.stations)
+    expected_values = hourly.loc['2014-01-10 05:00':'2014-01-11 04:00'].mean()
+    np.testing.assert_allclose(values.iloc[0].to_numpy(), expected_values.to_numpy(), rtol=1e-5)
+    assert list(times) == [pd.Timestamp('2014-01-10 05:00')]
+    np.testing.assert_allclose(got, fields.grid.fields(expected_values.to_numpy()), rtol=1e-5)
+
+
+def test_window_hourly_frames_and_cache(store_frame):
+    fields = SpatialFields(store_frame, shape=(10, 12))
+    times, got, values = fields.window('NO2', '2014-07-01', 500, hourly=True, stations=['Dongsi', 'Dingling'])
+    assert len(times) == MAX_FRAMES and got.shape == (MAX_FRAMES, 10, 12)
+    # Stasiun di luar pilihan tidak ikut diinterpolasi
+    assert values['Changping'].isna().all()
+    np.testing.assert_allclose(got, fields.grid.fields(values.to_numpy()), rtol=1e-5, equal_nan=True)
+
+    again = fields.window('NO2', '2014-07-01', 500, hourly=True, stations=['Dingling', 'Dongsi'])
+    assert again[1] is got
+    assert fields.stats()['hits'] == 1 and fields.stats()['misses'] == 1
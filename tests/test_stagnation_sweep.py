@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stagnation_sweep import MIN_HOURS, stagnation_sweep, stagnation_sweep_totals, threshold_grid
+
+
+def naive_sweep(wspm, pm25, thresholds):
+    """Satu filter boolean per ambang (cara PB 4 untuk satu ambang, diulang)."""
+    wspm = np.asarray(wspm, dtype='float64')
+    pm25 = np.asarray(pm25, dtype='float64')
+    rows = []
+    for threshold in thresholds:
+        stagnant = wspm < np.float64(np.asarray(threshold, dtype=wspm.dtype))
+        valid = ~np.isnan(pm25)
+        rows.append({
+            'n_stagnant': int((stagnant & valid).sum()),
+            'n_normal': int((~stagnant & valid).sum()),
+            'pm25_stagnant': pm25[stagnant & valid].mean() if (stagnant & valid).any() else np.nan,
+            'pm25_normal': pm25[~stagnant & valid].mean() if (~stagnant & valid).any() else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+def test_matches_per_threshold_loop(frame):
+    thresholds = threshold_grid()
+    wspm = frame['WSPM'].to_numpy('float64')
+    pm25 = frame['PM2.5'].to_numpy('float64')
+    got = stagnation_sweep(wspm, pm25, thresholds)
+    expected = naive_sweep(wspm, pm25, thresholds)
+
+    np.testing.assert_array_equal(got['n_stagnant'].to_numpy(), expected['n_stagnant'].to_numpy())
+    np.testing.assert_array_equal(got['n_normal'].to_numpy(), expected['n_normal'].to_numpy())
+    for col in ['pm25_stagnant', 'pm25_normal']:
+        np.testing.assert_allclose(got[col].to_numpy(), expected[col].to_numpy(), rtol=1e-9, err_msg=col)
+    ratio = (expected['pm25_stagnant'] / expected['pm25_normal']).where(
+        (expected['n_stagnant'] >= MIN_HOURS) & (expected['n_normal'] >= MIN_HOURS)
+    )
+    np.testing.assert_allclose(got['ratio'].to_numpy(), ratio.to_numpy(), rtol=1e-9)
+
+
+def test_default_threshold_matches_is_stagnant(frame):
+    sweep = stagnation_sweep(frame['WSPM'].to_numpy(), frame['PM2.5'].to_numpy(), [3.2])
+    stagnant = frame.loc[frame['Is_Stagnant'], 'PM2.5'].astype('float64')
+    assert sweep['n_stagnant'].iloc[0] == stagnant.count()
+    assert sweep['pm25_stagnant'].iloc[0] == pytest.approx(stagnant.mean(), rel=1e-9)
+
+
+def test_float32_threshold_uses_data_precision():
+    # WSPM float32 3.3 sedikit di atas 3.3 (float64): tidak dihitung stagnan pada ambang 3.3
+    wspm = np.array([3.2, 3.3, 3.4], dtype='float32')
+    sweep = stagnation_sweep(wspm, [10.0, 20.0, 30.0], [3.3, 3.31])
+    assert sweep['n_stagnant'].tolist() == [1, 2]
+
+
+def test_nan_wspm_counts_as_normal():
+    sweep = stagnation_sweep([np.nan, 1.0, 5.0], [10.0, 20.0, 30.0], [2.0, 100.0])
+    assert sweep['n_stagnant'].tolist() == [1, 2]
+    assert sweep['n_normal'].tolist() == [2, 1]
+
+
+def test_totals_per_wspm_value_match_rows(frame):
+    # Sapuan dari total per nilai WSPM (GROUP BY di backend SQL) sama dengan sapuan per baris
+    pm25 = frame['PM2.5'].astype('float64')
+    grouped = pd.DataFrame({'n': pm25.notna(), 'sum': pm25.fillna(0.0)}).groupby(frame['WSPM'], dropna=False).sum()
+    wspm = grouped.index.to_numpy('float32')
+    got = stagnation_sweep_totals(wspm, grouped['n'], grouped['sum'], threshold_grid())
+    expected = stagnation_sweep(frame['WSPM'].to_numpy(), frame['PM2.5'].to_numpy(), threshold_grid())
+    pd.testing.assert_frame_equal(got, expected, rtol=1e-9)
+
+
+def test_threshold_grid_matches_slider_steps():
+    grid = threshold_grid()
+    assert grid[0] == 0.5 and grid[-1] == 8.0
+    assert len(grid) == 76
+    assert 3.2 in grid
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stats_cube import (
+    CUBE_COLS, CUBE_PAIRS, annual_means, build_cube, caap_evaluation, correlation_by, means, pearson,
+    reduce_cube, select_cube, stagnation_means,
+)
+
+
+def as_float64(frame):
+    """Kolom polutan sebagai float64 (cube menjumlahkan dalam float64, bukan dtype float32 skema)."""
+    return frame.astype({col: 'float64' for col in CUBE_COLS})
+
+
+def test_means_match_pandas_groupby(frame):
+    cube = build_cube(frame)
+    expected = as_float64(frame).groupby('year')[CUBE_COLS].mean()
+    got = annual_means(cube, CUBE_COLS)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_names=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize('x, y', CUBE_PAIRS)
+def test_pearson_matches_pairwise_complete_corr(frame, x, y):
+    # Nilai kosong di salah satu kolom: korelasi hanya atas baris yang valid di keduanya
+    cube = build_cube(frame)
+    expected = as_float64(frame)[x].corr(as_float64(frame)[y])
+    assert pearson(reduce_cube(cube), x, y).iloc[0] == pytest.approx(expected, abs=1e-9)
+    # Urutan pasangan tidak berpengaruh
+    assert pearson(reduce_cube(cube), y, x).iloc[0] == pytest.approx(expected, abs=1e-9)
+
+
+def test_correlation_by_year_with_filter(frame):
+    cube = build_cube(frame)
+    summer = as_float64(frame[frame['Season'] == 'Summer'])
+    expected = summer.groupby('year')[['O3', 'NO2']].corr().xs('O3', level=1)['NO2']
+    got = correlation_by(cube, 'O3', 'NO2', ['year'], {'Season': 'Summer'})
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), atol=1e-9)
+    assert got.index.tolist() == expected.index.tolist()
+
+
+def test_select_cube_filters_match_row_filters(frame):
+    cube = build_cube(frame)
+    filters = {'Area_Type': ['Urban', 'Rural'], 'Season': 'Winter', 'year': 'Overall', 'station': None}
+    mask = frame['Area_Type'].isin(['Urban', 'Rural']) & (frame['Season'] == 'Winter')
+    expected = as_float64(frame).loc[mask, CUBE_COLS].mean()
+    got = means(reduce_cube(select_cube(cube, filters))).iloc[0]
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+
+def test_caap_evaluation_matches_baseline_formula(frame):
+    cols = ['PM2.5', 'NO2', 'SO2']
+    cube = build_cube(frame)
+    post, pre, change = caap_evaluation(cube, cols, {'Area_Type': 'Urban'})
+
+    urban = as_float64(frame[frame['Area_Type'] == 'Urban'])
+    expected_post = urban[~urban['Pre_CAAP']].groupby('year')[cols].mean()
+    expected_pre = urban.loc[urban['Pre_CAAP'], cols].mean()
+    expected_change = (expected_post - expected_pre) / expected_pre * 100
+
+    np.testing.assert_allclose(post.to_numpy(), expected_post.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(pre.iloc[0].to_numpy(), expected_pre.to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(change.to_numpy(), expected_change.to_numpy(), rtol=1e-9)
+    assert pre.index.tolist() == [2013]
+
+
+def test_stagnation_means(frame):
+    cube = build_cube(frame)
+    expected = as_float64(frame).groupby('Is_Stagnant')[['PM2.5', 'WSPM']].mean()
+    got = stagnation_means(cube)
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert got.index.tolist() == [False, True]
+
+
+def test_all_nan_group_has_nan_mean(frame):
+    df = frame.copy()
+    df.loc[df['year'] == 2014, 'SO2'] = np.nan
+    got = annual_means(build_cube(df), ['SO2'])
+    assert np.isnan(got.loc[2014, 'SO2'])
+    assert not got.drop(index=2014)['SO2'].isna().any()
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from ts_pyramid import LEVEL_OVERSAMPLE, PYRAMID_LEVELS, build_pyramid, lttb, query_pyramid
+
+
+def naive_lttb(x, y, n_out):
+    """LTTB dengan loop per bucket dan per titik (referensi)."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        if i == n_out - 3:
+            hi = n - 1
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            next_hi = n - 1 if i + 1 == n_out - 3 else int((i + 2) * every) + 1
+            avg_x = sum(x[hi:next_hi]) / (next_hi - hi)
+            avg_y = sum(y[hi:next_hi]) / (next_hi - hi)
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return selected + [n - 1]
+
+
+@pytest.fixture(scope='module')
+def pyramid(store_frame):
+    return build_pyramid(store_frame, ['PM2.5', 'O3'])
+
+
+@pytest.mark.parametrize('n, n_out', [(1000, 50), (997, 100), (50, 49), (10, 3)])
+def test_lttb_matches_loop(rng, n, n_out):
+    x = np.sort(rng.uniform(0, 1e4, n))
+    y = rng.normal(0, 1, n).cumsum()
+    got = lttb(x, y, n_out)
+    assert len(got) == n_out
+    assert got[0] == 0 and got[-1] == n - 1
+    assert (np.diff(got) > 0).all()
+    assert got.tolist() == naive_lttb(x.tolist(), y.tolist(), n_out)
+
+
+def test_lttb_keeps_all_points_when_small(rng):
+    y = rng.normal(size=20)
+    assert lttb(np.arange(20), y, 20).tolist() == list(range(20))
+    assert lttb(np.arange(20), y, 2).tolist() == list(range(20))
+
+
+@pytest.mark.parametrize('start, end, max_points', [
+    (None, None, 100),
+    ('2014-01-01', '2014-01-20', 100),
+    ('2013-06-01', '2014-06-01', 100),
+    (None, None, 5),
+])
+def test_query_picks_finest_level_within_budget(pyramid, start, end, max_points):
+    line, _, level = query_pyramid(pyramid, 'Dongsi', 'PM2.5', start, end, max_points=max_points)
+    levels = list(PYRAMID_LEVELS)
+    sizes = [len(pyramid[name]['Dongsi'].loc[start:end]) for name in levels]
+    budget = max_points * LEVEL_OVERSAMPLE
+    chosen = levels.index(level)
+
+    # Semua level yang lebih halus melampaui anggaran; level terpilih memadai (kecuali level terkasar)
+    assert all(size > budget for size in sizes[:chosen])
+    assert sizes[chosen] <= budget or level == levels[-1]
+    assert len(line) == min(sizes[chosen], max_points)
+
+
+def test_envelope_bounds_raw_samples(pyramid):
+    line, envelope, level = query_pyramid(pyramid, 'Changping', 'PM2.5', max_points=100)
+    assert level == 'Harian' and envelope is not None
+    assert len(line) == 100
+
+    raw = pyramid['Per Jam']['Changping']['PM2.5']
+    bounds = list(envelope.index[1:]) + [raw.index.max() + np.timedelta64(1, 'h')]
+    for (start, row), end in zip(envelope.iterrows(), bounds):
+        bucket = raw[(raw.index >= start) & (raw.index < end)].dropna()
+        assert len(bucket) > 0
+        assert row['min'] <= bucket.min() and bucket.max() <= row['max']
+    # Setiap titik garis LTTB berada di dalam envelope bucket-nya
+    positions = envelope.index.searchsorted(line.index, side='right') - 1
+    assert (envelope['min'].to_numpy()[positions] <= line.to_numpy()).all()
+    assert (line.to_numpy() <= envelope['max'].to_numpy()[positions]).all()
+
+
+def test_hourly_window_has_no_envelope(pyramid):
+    line, envelope, level = query_pyramid(pyramid, 'Dongsi', 'O3', '2014-03-01', '2014-03-03')
+    assert level == 'Per Jam' and envelope is None
+    assert len(line) == 72
+
+
+def test_unknown_station_returns_empty(pyramid):
+    line, envelope, _ = query_pyramid(pyramid, 'Atlantis', 'PM2.5')
+    assert line.empty and envelope is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from windrose.windrose import histogram
+
+from windrose_hist import (
+    CARDINAL16, N_SECTORS, PM25_CONDITIONS, SPEED_BINS, WD_NA_CODE, build_windrose_hist, encode_wd,
+    sector_degrees, windrose_table,
+)
+
+FILTERS = [
+    None,
+    {'year': 2014},
+    {'Area_Type': 'Urban', 'Season': 'Winter'},
+    {'station': ['Dingling', 'Changping'], 'Season': 'Overall'},
+]
+
+
+def windrose_counts(frame, filters, lower, upper):
+    """Tabel [kecepatan, sektor] langsung dari data per baris dengan windrose.histogram (cara plot baseline)."""
+    mask = np.ones(len(frame), dtype=bool)
+    for col, val in (filters or {}).items():
+        if val != 'Overall':
+            mask &= frame[col].isin(val if isinstance(val, list) else [val]).to_numpy()
+    pm25 = frame['PM2.5'].to_numpy('float64')
+    if lower is not None:
+        mask &= pm25 > lower
+    if upper is not None:
+        mask &= pm25 < upper
+    mask &= (frame['wd_sector'].to_numpy() != WD_NA_CODE) & frame['WSPM'].notna().to_numpy()
+
+    direction = sector_degrees()[frame['wd_sector'].to_numpy()[mask]]
+    speed = frame['WSPM'].to_numpy('float64')[mask]
+    _, _, table = histogram(direction, speed, SPEED_BINS, N_SECTORS, total=len(speed))
+    return table
+
+
+@pytest.mark.parametrize('condition', list(PM25_CONDITIONS))
+@pytest.mark.parametrize('filters', FILTERS)
+def test_table_matches_windrose_histogram(frame, filters, condition):
+    lower, upper = PM25_CONDITIONS[condition]
+    hist = build_windrose_hist(frame)
+    got = windrose_table(hist, filters, lower, upper)
+    expected = windrose_counts(frame, filters, lower, upper)
+    assert got.shape == (len(SPEED_BINS), N_SECTORS)
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_threshold_on_grid_edge_is_exclusive():
+    # PM2.5 tepat di ambang (75, 200) tidak termasuk Normal (< 75) maupun Ekstrem (> 200)
+    pm25 = np.array([74.9, 75.0, 75.1, 199.9, 200.0, 200.1, np.nan])
+    df = pd.DataFrame({
+        'station': 'Dongsi', 'Area_Type': 'Urban', 'year': 2014, 'Season': 'Winter',
+        'PM2.5': pm25, 'WSPM': 1.5, 'wd': 'N',
+    })
+    hist = build_windrose_hist(df)
+    assert windrose_table(hist, None, *PM25_CONDITIONS['Normal']).sum() == 1
+    assert windrose_table(hist, None, *PM25_CONDITIONS['Extreme']).sum() == 1
+    assert windrose_table(hist, None, 75, 200).sum() == 2
+    assert windrose_table(hist).sum() == 6
+
+
+def test_threshold_off_grid_is_rejected(frame):
+    with pytest.raises(ValueError):
+        windrose_table(build_windrose_hist(frame), None, upper=80)
+
+
+def test_encode_wd_cardinal_and_degrees():
+    codes = encode_wd(pd.Series(CARDINAL16 + ['0', '11.24', '11.26', '350', None, 'XYZ'], dtype=object))
+    assert codes.dtype == np.uint8
+    assert codes[:N_SECTORS].tolist() == list(range(N_SECTORS))
+    assert codes[N_SECTORS:].tolist() == [0, 0, 1, 0, WD_NA_CODE, WD_NA_CODE]